@@ -52,6 +52,11 @@ def best_frame(seq, gc=1, allow_rc=False, require_stop=False):
     """
     gc = get_code(gc)
     translations = gc.sixframes(seq)
+    return _best_frame(translations, seq.name, allow_rc, require_stop)
+
+
+def _best_frame(translations, name, allow_rc, require_stop):
+    """returns best frame from the six-frame translations of sequence name"""
     if not allow_rc:
         translations = translations[:3]
 
@@ -66,7 +71,7 @@ def best_frame(seq, gc=1, allow_rc=False, require_stop=False):
     min_stops, frame = stops_in_frame[0]
     # if min_stops > 1, cannot be translated
     if min_stops > 1:
-        raise ValueError("%s cannot be robustly translated" % seq.name)
+        raise ValueError("%s cannot be robustly translated" % name)
     elif min_stops == 0 and require_stop:
         # find seq with 1 stop
         min_stops = 20  # nonsense value
@@ -77,9 +82,9 @@ def best_frame(seq, gc=1, allow_rc=False, require_stop=False):
 
     if 0 <= min_stops <= 1:
         if min_stops == 1 and not translations[frame].endswith("*"):
-            raise ValueError("%s cannot be robustly translated" % seq.name)
+            raise ValueError("%s cannot be robustly translated" % name)
     else:
-        raise ValueError("%s cannot be robustly translated" % seq.name)
+        raise ValueError("%s cannot be robustly translated" % name)
 
     frame += 1
     if allow_rc and frame > 3:
@@ -210,9 +215,15 @@ class select_translatable(ComposableSeq):
 
         translatable = []
         error_log = []
-        for seq in seqs.seqs:
+        all_frames = self._gc.sixframes_many(seqs.seqs)
+        for seq, translations in zip(seqs.seqs, all_frames):
             try:
-                frame = best_frame(seq, self._gc, allow_rc=self._allow_rc)
+                if 0 < len(seq) < 3:
+                    # as raised by sixframes
+                    raise ValueError("Translation starts after end of RNA")
+                frame = _best_frame(
+                    translations, seq.name, self._allow_rc, require_stop=False
+                )
                 if frame < 0:
                     seq = seq.rc()
                     frame *= -1
@@ -3,6 +3,10 @@
 
 upgma takes an dictionary of pair tuples mapped to distances as input.
 
+upgma_condensed takes a condensed distance vector (the upper triangle of the
+distance matrix) and the corresponding names as input. It uses the nearest
+neighbour chain algorithm, requiring O(n^2) time.
+
 UPGMA_cluster takes an array and a list of PhyloNode objects corresponding
 to the array as input. Can also generate this type of input from a DictArray using
 inputs_from_dict_array function.
@@ -36,12 +40,23 @@ BIG_NUM = 1e305
 def upgma(pairwise_distances):
     """Uses the UPGMA algorithm to cluster sequences
 
-    pairwise_distances: a dictionary with pair tuples mapped to a distance
+    pairwise_distances: a dictionary with pair tuples mapped to a distance,
+    or a CondensedDistanceMatrix
     returns a PhyloNode object of the UPGMA cluster
     """
+    if hasattr(pairwise_distances, "dists"):
+        # a CondensedDistanceMatrix
+        return upgma_condensed(pairwise_distances.dists, pairwise_distances.names)
+
     darr = DictArray(pairwise_distances)
     matrix_a, node_order = inputs_from_dict_array(darr)
     tree = UPGMA_cluster(matrix_a, node_order, BIG_NUM)
+    _name_edges(tree)
+    return tree
+
+
+def _name_edges(tree):
+    """names the root and unnamed internal nodes"""
     index = 0
     for node in tree.traverse():
         if not node.parent:
@@ -49,7 +64,6 @@ def upgma(pairwise_distances):
         elif not node.name:
             node.name = "edge." + str(index)
             index += 1
-    return tree
 
 
 def find_smallest_index(matrix):
@@ -105,9 +119,18 @@ def condense_node_order(matrix, smallest_index, node_order):
     index1, index2 = smallest_index
     node1 = node_order[index1]
     node2 = node_order[index2]
-    # get the distance between the nodes and assign 1/2 the distance to the
-    # lengthproperty of each node
-    distance = matrix[index1, index2]
+    # replace the object at index1 with the combined node
+    node_order[index1] = _join_nodes(node1, node2, matrix[index1, index2])
+    # replace the object at index2 with None
+    node_order[index2] = None
+    return node_order
+
+
+def _join_nodes(node1, node2, distance):
+    """returns a PhyloNode with node1 and node2 as children
+
+    Sets the branch length of the nodes to 1/2 of the distance between them,
+    less the branch length of any descendants"""
     nodes = [node1, node2]
     d = distance / 2.0
     for n in nodes:
@@ -122,11 +145,7 @@ def condense_node_order(matrix, smallest_index, node_order):
     new_node.children.append(node2)
     node1.parent = new_node
     node2.parent = new_node
-    # replace the object at index1 with the combined node
-    node_order[index1] = new_node
-    # replace the object at index2 with None
-    node_order[index2] = None
-    return node_order
+    return new_node
 
 
 def UPGMA_cluster(matrix, node_order, large_number):
@@ -161,3 +180,104 @@ def inputs_from_dict_array(darr):
     darr.array += numpy.eye(darr.shape[0]) * BIG_NUM
     nodes = list(map(PhyloNode, darr.keys()))
     return darr.array, nodes
+
+
+def _row_positions(num, index):
+    """returns the positions in a condensed distance vector of the distances
+    between index and all indices. The position for index itself is 0."""
+    others = numpy.arange(num)
+    first = numpy.minimum(index, others)
+    second = numpy.maximum(index, others)
+    positions = first * num - first * (first + 1) // 2 + second - first - 1
+    positions[index] = 0
+    return positions
+
+
+def nn_chain_merges(dists, num):
+    """returns the UPGMA merges of clusters from condensed distances, using
+    the nearest neighbour chain algorithm
+
+    Parameters
+    ----------
+    dists
+        condensed distances between num items, the upper triangle of the
+        distance matrix in row-major order. Not modified.
+    num
+        number of items
+
+    Returns
+    -------
+    list of (index1, index2, distance), where index1 < index2. Clusters are
+    identified by the lowest index of their members. As for UPGMA_cluster,
+    the distance from a merged cluster is the average of the distances from
+    its two parts.
+    """
+    dists = numpy.array(dists, dtype=float)
+    if len(dists) != num * (num - 1) // 2:
+        raise ValueError(f"{len(dists)} distances do not match {num} items")
+
+    active = numpy.ones(num, dtype=bool)
+    chain = []
+    merges = []
+    while len(merges) < num - 1:
+        if not chain:
+            chain.append(int(numpy.flatnonzero(active)[0]))
+
+        current = chain[-1]
+        row = dists[_row_positions(num, current)]
+        row[~active] = numpy.inf
+        row[current] = numpy.inf
+        nearest = int(row.argmin())
+        # ties are resolved in favour of the previous cluster in the chain,
+        # ensuring reciprocal nearest neighbours are found
+        if len(chain) > 1 and row[chain[-2]] <= row[nearest]:
+            nearest = chain[-2]
+
+        if len(chain) < 2 or nearest != chain[-2]:
+            chain.append(nearest)
+            continue
+
+        del chain[-2:]
+        index1, index2 = sorted((current, nearest))
+        merges.append((index1, index2, row[nearest]))
+        # the merged cluster replaces index1
+        active[index2] = False
+        others = active.copy()
+        others[index1] = False
+        positions1 = _row_positions(num, index1)[others]
+        positions2 = _row_positions(num, index2)[others]
+        dists[positions1] = (dists[positions1] + dists[positions2]) / 2
+
+    return merges
+
+
+def upgma_condensed(dists, names):
+    """Uses the UPGMA algorithm to cluster sequences
+
+    Parameters
+    ----------
+    dists
+        condensed distances, the upper triangle of the distance matrix in
+        row-major order, as returned by scipy.spatial.distance.squareform
+    names
+        names corresponding to rows of the distance matrix
+
+    Returns
+    -------
+    a PhyloNode object of the UPGMA cluster, as from upgma() with the same
+    distances. Branch lengths may differ by rounding error and tied
+    distances may be resolved differently, as clusters are merged in a
+    different order.
+    """
+    names = list(names)
+    if len(names) < 2:
+        raise ValueError("at least two names are required")
+
+    nodes = list(map(PhyloNode, names))
+    for index1, index2, distance in nn_chain_merges(dists, len(names)):
+        nodes[index1] = _join_nodes(nodes[index1], nodes[index2], distance)
+        nodes[index2] = None
+
+    tree = nodes[0]
+    _name_edges(tree)
+    return tree
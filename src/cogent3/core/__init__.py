@@ -4,12 +4,14 @@ __all__ = [
     "alignment",
     "alphabet",
     "annotation",
+    "array_tree",
     "genetic_code",
     "info",
     "location",
     "moltype",
     "profile",
     "sequence",
+    "sketch",
     "tree",
 ]
 
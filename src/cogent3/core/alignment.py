@@ -19,12 +19,13 @@
     passed in a stream of two-item label, sequence pairs. However, this can
     cause confusion when testing.
 """
+import hashlib
 import json
 import os
 import re
 import warnings
 
-from collections import Counter, defaultdict
+from collections import Counter, defaultdict, namedtuple
 from copy import deepcopy
 from functools import total_ordering
 from itertools import combinations
@@ -45,7 +46,6 @@ from numpy import (
     take,
     transpose,
     uint8,
-    vstack,
     zeros,
 )
 from numpy.random import choice, permutation, randint
@@ -55,6 +55,7 @@ import cogent3  # will use to get at cogent3.parse.fasta.MinimalFastaParser,
 from cogent3.core.annotation import Map, _Annotatable
 from cogent3.core.genetic_code import get_code
 from cogent3.core.info import Info as InfoClass
+from cogent3.core.location import GapPositions
 from cogent3.core.profile import PSSM, MotifCountsArray
 from cogent3.core.sequence import ArraySequence, Sequence, frac_same
 # which is a circular import otherwise.
@@ -63,7 +64,7 @@ from cogent3.format.fasta import alignment_to_fasta
 from cogent3.format.nexus import nexus_from_alignment
 from cogent3.format.phylip import alignment_to_phylip
 from cogent3.maths.stats.number import CategoryCounter
-from cogent3.maths.util import safe_log
+from cogent3.maths.util import safe_log, safe_p_log_p
 from cogent3.parse.gff import gff_parser
 from cogent3.util import progress_display as UI
 from cogent3.util.dict_array import DictArrayTemplate
@@ -97,6 +98,8 @@ __maintainer__ = "Gavin Huttley"
 __email__ = "Gavin.Huttley@anu.edu.au"
 __status__ = "Production"
 
+SitePatterns = namedtuple("SitePatterns", ["unique_columns", "counts", "column_index"])
+
 
 class DataError(Exception):
     pass
@@ -351,6 +354,150 @@ def seqs_from_empty(obj, *args, **kwargs):
     raise ValueError("Cannot create empty SequenceCollection.")
 
 
+def _masked_partners(data, masked):
+    """returns {row index: row indices} of rows equal at every position
+    unmasked in both
+
+    Parameters
+    ----------
+    data
+        2D array, or a series of 1D arrays of possibly different lengths
+    masked
+        bool arrays with the same shapes as data. Positions beyond the end of
+        a row match only masked positions.
+
+    Notes
+    -----
+    Rows are partitioned into cells one position at a time. A row goes to
+    the child cell for its value, while a masked row goes to every child of
+    its cell. Cells with a single row are dropped, so the rows sharing a
+    final cell are those that match each other.
+    """
+    num = len(data)
+    if isinstance(data, numpy.ndarray):
+        lengths = numpy.full(num, data.shape[1] if data.ndim == 2 else 0)
+        flat = data.ravel()
+        flat_masked = masked.ravel()
+    else:
+        lengths = numpy.array([len(row) for row in data], dtype=int)
+        flat = numpy.concatenate(data)
+        flat_masked = numpy.concatenate(masked).astype(bool)
+    offsets = numpy.cumsum(lengths) - lengths
+    # values for past the end of a row and for a masked only cell
+    past_end = int(flat.max()) + 1 if flat.size else 0
+    wild = past_end + 1
+    base = wild + 1
+
+    rows = numpy.arange(num)
+    cells = numpy.zeros(num, dtype=numpy.int64)
+    for col in range(lengths.max() if num else 0):
+        if not rows.size:
+            break
+        in_range = col < lengths[rows]
+        pos = numpy.where(in_range, offsets[rows] + col, 0)
+        values = numpy.where(in_range, flat[pos].astype(numpy.int64), past_end)
+        is_masked = in_range & flat_masked[pos]
+        keys = cells * base + values
+        unmasked_keys = keys[~is_masked]
+        fixed = numpy.unique(unmasked_keys)
+
+        # masked rows join every child of their cell
+        masked_cells = cells[is_masked]
+        lo = numpy.searchsorted(fixed, masked_cells * base)
+        counts = numpy.searchsorted(fixed, (masked_cells + 1) * base) - lo
+        alone = counts == 0
+        counts[alone] = 1
+        firsts = numpy.repeat(numpy.cumsum(counts) - counts, counts)
+        which = numpy.repeat(lo, counts) + numpy.arange(counts.sum()) - firsts
+        which = numpy.minimum(which, max(fixed.size - 1, 0))
+        joined = fixed[which] if fixed.size else numpy.zeros(which.size, int)
+        joined = numpy.where(
+            numpy.repeat(alone, counts),
+            numpy.repeat(masked_cells * base + wild, counts),
+            joined,
+        )
+
+        keys = numpy.concatenate((unmasked_keys, joined))
+        rows = numpy.concatenate(
+            (rows[~is_masked], numpy.repeat(rows[is_masked], counts))
+        )
+        cells = numpy.unique(keys, return_inverse=True)[1]
+        keep = numpy.bincount(cells)[cells] > 1
+        rows = rows[keep]
+        cells = numpy.unique(cells[keep], return_inverse=True)[1]
+
+    partners = defaultdict(set)
+    order = numpy.argsort(cells, kind="stable")
+    bounds = numpy.flatnonzero(numpy.diff(cells[order])) + 1
+    for members in numpy.split(rows[order], bounds):
+        members = members.tolist()
+        for i in members:
+            partners[i].update(members)
+    return partners
+
+
+def _identical_sets(names, data, masked=None):
+    """returns sets of names whose rows in data are identical
+
+    Parameters
+    ----------
+    names
+        series of names corresponding to rows of data
+    data : numpy.ndarray
+        2D array, one row per sequence. If masked is provided, can also be a
+        series of 1D arrays.
+    masked : numpy.ndarray
+        bool array with the same shape as data. If provided, two rows are
+        identical if they are equal at every position not masked in either.
+
+    Notes
+    -----
+    Without a mask, rows are binned by a digest and pairwise comparisons are
+    only made within bins. With a mask, matching rows are found by
+    _masked_partners. Each set is a row plus every later row, not already
+    in a set, that matches it.
+    """
+    if masked is not None:
+        partners = _masked_partners(data, masked)
+        groups = []
+        seen = set()
+        for i in range(len(names)):
+            if i in seen or i not in partners:
+                continue
+            group = sorted(j for j in partners[i] if j > i and j not in seen)
+            if group:
+                seen.update(group)
+                groups.append([i] + group)
+        return [set(names[i] for i in group) for group in groups]
+
+    data = numpy.ascontiguousarray(data)
+    bins = defaultdict(list)
+    for i, row in enumerate(data):
+        bins[hashlib.sha1(row.tobytes()).digest()].append(i)
+
+    groups = []
+    for members in bins.values():
+        if len(members) < 2:
+            continue
+
+        seen = set()
+        for index, i in enumerate(members):
+            if i in seen:
+                continue
+
+            group = [i]
+            for j in members[index + 1 :]:
+                if j not in seen and (data[i] == data[j]).all():
+                    seen.add(j)
+                    group.append(j)
+
+            if len(group) > 1:
+                groups.append(group)
+
+    groups.sort()
+    return [set(names[i] for i in group) for group in groups]
+
+
 @total_ordering
 class _SequenceCollectionBase:
     """
@@ -773,19 +920,11 @@ class _SequenceCollectionBase:
 
     def __ne__(self, other):
         """first tests as dict, then as str"""
-        c = self.named_seqs != other
-        if not c:
-            c = str(self) != str(other)
-
-        return c
+        return not self == other
 
     def __lt__(self, other):
-        """cmp first tests as dict, then as str."""
-        c = self.named_seqs < other
-        if not c:
-            return 0
-        else:
-            return str(self) < str(other)
+        """cmp tests as str, dicts being unordered."""
+        return str(self) < str(other)
 
     def iter_seqs(self, seq_order=None):
         """Iterates over values (sequences) in the alignment, in order.
@@ -903,79 +1042,34 @@ class _SequenceCollectionBase:
             if True, degenerate characters are ignored
 
         """
-        # TODO handle case of not strict by building mask of degen positions
-        # per seq
         if mask_degen and not hasattr(self.moltype, "alphabets"):
             UserWarning(
                 "in get_identical_sets, strict has no effect as moltype "
                 "has no degenerate characters"
             )
             mask_degen = False
-        elif mask_degen:
-            degens = list(self.moltype.degenerates) + [self.moltype.gap]
-
-        def reduced(seq, indices):
-            s = "".join(seq[i] for i in range(len(seq)) if i not in indices)
-            return s
 
-        identical_sets = []
-        mask_posns = {}
-        seen = []
-        # if strict, we do a sort and one pass through the list
         seqs = self.to_dict()
-        if not mask_degen:
-            seqs_names = [(s, n) for n, s in seqs.items()]
-            seqs_names.sort()
-            matched = None
-            dupes = defaultdict(set)
-            for i in range(len(seqs_names) - 1):
-                if seqs_names[i][0] == seqs_names[i + 1][0]:
-                    matched = seqs_names[i][1] if matched is None else matched
-                    dupes[matched].update([seqs_names[i + 1][1], matched])
-                else:
-                    matched = None
-            identical_sets = list(dupes.values())
-            return identical_sets
+        if not seqs:
+            return []
 
-        for i in range(len(self.names) - 1):
-            n1 = self.names[i]
-            if n1 in seen:
-                continue
-
-            seq1 = seqs[n1]
-            if n1 not in mask_posns:
-                pos = self.moltype.get_degenerate_positions(seq1, include_gap=True)
-                mask_posns[n1] = pos
-                # TODO separately implement for ArrayAlignment
-
-            group = set()
-            for j in range(i + 1, len(self.names)):
-                n2 = self.names[j]
-                if n2 in seen:
-                    continue
-
-                seq2 = seqs[n2]
-                if n2 not in mask_posns:
-                    pos = self.moltype.get_degenerate_positions(seq2, include_gap=True)
-                    mask_posns[n2] = pos
-
-                seq2 = seqs[n2]
-
-                s1, s2 = seq1, seq2
-
-                pos = mask_posns[n1] + mask_posns[n2]
-                if pos:
-                    s1 = reduced(seq1, pos)
-                    s2 = reduced(seq2, pos)
-
-                if s1 == s2:
-                    seen.append(n2)
-                    group.update([n1, n2])
-
-            if group:
-                identical_sets.append(group)
+        if not mask_degen:
+            groups = defaultdict(list)
+            for name in self.names:
+                groups[str(seqs[name])].append(name)
+            return [set(names) for names in groups.values() if len(names) > 1]
+
+        # sequences as arrays of character codes
+        degens = list(self.moltype.degenerates) + [self.moltype.gap]
+        degens = numpy.frombuffer("".join(degens).encode("utf-8"), dtype=numpy.uint8)
+        data = []
+        masked = []
+        for name in self.names:
+            seq = numpy.frombuffer(str(seqs[name]).encode("utf-8"), dtype=numpy.uint8)
+            data.append(seq)
+            masked.append(numpy.isin(seq, degens))
 
-        return identical_sets
+        return _identical_sets(self.names, data, masked=masked)
 
     def get_similar(
         self,
@@ -1508,6 +1602,95 @@ class _SequenceCollectionBase:
         )
         return per_seq.motif_totals()
 
+    def kmer_counts(self, k, step=1, include_ambiguity=False, parallel=False):
+        """returns counts of k-mers per sequence
+
+        Parameters
+        ----------
+        k
+            number of characters per k-mer
+        step
+            distance between successive k-mer start positions. The default
+            counts all overlapping k-mers, step=k counts non-overlapping ones.
+        include_ambiguity
+            if True, k-mers containing ambiguous characters from the moltype
+            are included. No expansion of those is attempted.
+        parallel
+            if True, sequences are distributed across processes
+
+        Returns
+        -------
+        MotifCountsArray with a row per sequence if there are at most 4**8
+        possible k-mers, otherwise a {name: CategoryCounter, ...} dict of the
+        observed k-mers
+
+        Notes
+        -----
+        k-mers containing gaps, or characters not in the moltype, are
+        excluded.
+        """
+        from cogent3.core.sequence import get_kmer_counter
+
+        counter = get_kmer_counter(
+            self.moltype, k, step=step, include_ambiguity=include_ambiguity
+        )
+        seqs = [str(self.named_seqs[name]) for name in self.names]
+        return self._kmer_counts(counter, counter, seqs, parallel)
+
+    def sketch(self, k, n_hashes=128, include_ambiguity=False, seed=0):
+        """returns MinHash sketches of the k-mers in each sequence
+
+        Parameters
+        ----------
+        k
+            number of characters per k-mer
+        n_hashes
+            number of hash functions, the signature length
+        include_ambiguity
+            if True, k-mers containing ambiguous characters from the moltype
+            are included. No expansion of those is attempted.
+        seed
+            seeds the hash functions. Sketches can only be compared if they
+            were computed with the same seed.
+
+        Returns
+        -------
+        MinHashSketch, which estimates Jaccard similarities or Mash distances
+        for all pairs, and finds candidate similar pairs
+
+        Notes
+        -----
+        k-mers containing gaps, or characters not in the moltype, are
+        excluded.
+        """
+        from cogent3.core.sequence import get_kmer_counter
+        from cogent3.core.sketch import MinHashSketch, min_hashes
+
+        counter = get_kmer_counter(self.moltype, k, include_ambiguity=include_ambiguity)
+        signatures = []
+        for name in self.names:
+            codes = counter.kmer_codes(counter.encode(str(self.named_seqs[name])))
+            signatures.append(min_hashes(codes, n_hashes, seed=seed))
+        signatures = numpy.array(signatures, dtype=numpy.uint32)
+        return MinHashSketch(
+            self.names, signatures.reshape((len(self.names), n_hashes)), k
+        )
+
+    def _kmer_counts(self, counter, count_func, data, parallel):
+        """applies count_func to data for each sequence"""
+        if parallel:
+            from cogent3.util import parallel as PAR
+
+            counts = list(PAR.imap(count_func, data, if_serial="ignore"))
+        else:
+            counts = [count_func(d) for d in data]
+
+        if not counter.dense:
+            return dict(zip(self.names, counts))
+
+        counts = numpy.array(counts, dtype=int).reshape((len(counts), -1))
+        return MotifCountsArray(counts, counter.motifs, row_indices=self.names)
+
     def get_motif_probs(
         self,
         alphabet=None,
@@ -2056,7 +2239,10 @@ class Aligned(object):
         # alignment coordinates, NOT a list of pairs of sequence coordinates
         if isinstance(map, list):
             map = Map(map, parent_length=length).inverse()
-        self.map = map
+        # a GapPositions instance is converted to a Map only when required
+        self._map, self._gaps = (
+            (None, map) if isinstance(map, GapPositions) else (map, None)
+        )
         self.data = data
         if hasattr(data, "info"):
             self.info = data.info
@@ -2079,9 +2265,30 @@ class Aligned(object):
 
     moltype = property(_get_moltype)
 
+    @property
+    def map(self):
+        if self._map is None:
+            self._map = self._gaps.to_map()
+        return self._map
+
+    @property
+    def gap_positions(self):
+        """GapPositions of self, or None if the map cannot be represented
+        that way"""
+        if self._gaps is None:
+            try:
+                self._gaps = GapPositions.from_map(self._map)
+            except ValueError:
+                self._gaps = False
+        return self._gaps or None
+
+    def _coords(self):
+        """the map, or gap positions if the map has not been created"""
+        return self._gaps if self._map is None else self._map
+
     def copy(self):
         """Returns a shallow copy of self"""
-        return self.__class__(self.map, self.data)
+        return self.__class__(self._coords(), self.data)
 
     def deepcopy(self, sliced=True):
         """
@@ -2145,13 +2352,21 @@ class Aligned(object):
 
     def get_gapped_seq(self, recode_gaps=False, moltype=None):
         """Returns sequence as an object, including gaps."""
-        return self.data.gapped_by_map(self.map, recode_gaps)
+        data = self.data
+        gaps = None if recode_gaps else self.gap_positions
+        if gaps is None or not isinstance(data, Sequence) or data.annotations:
+            return data.gapped_by_map(self.map, recode_gaps)
+
+        seq = str(data)[gaps.start : gaps.start + gaps.seq_length]
+        return data.__class__(
+            gaps.gapped(seq), name=data.name, check=False, info=data.info
+        )
 
     def __len__(self):
         # these make it look like Aligned should be a subclass of Map,
         # but then you have to be careful with __getitem__, __init__ and
         # inverse.
-        return len(self.map)
+        return len(self._coords())
 
     def __add__(self, other):
         if self.data is other.data:
@@ -2168,10 +2383,10 @@ class Aligned(object):
         return Aligned(self.map.reversed(), self.data)
 
     def to_rna(self):
-        return Aligned(self.map, self.data.to_rna())
+        return Aligned(self._coords(), self.data.to_rna())
 
     def to_dna(self):
-        return Aligned(self.map, self.data.to_dna())
+        return Aligned(self._coords(), self.data.to_dna())
 
     def to_rich_dict(self):
         coords = self.map.get_covering_span().get_coordinates()
@@ -2180,8 +2395,7 @@ class Aligned(object):
         start, end = coords[0]
         data = self.data[start:end]
         # drop any lost spans
-        for i, a in enumerate(data.annotations):
-            data.annotations[i] = a.without_lost_spans()
+        data.annotations = [a.without_lost_spans() for a in data.annotations]
         data = data.to_rich_dict()
         data["seq"] = str(self)
         data["version"] = __version__
@@ -2194,7 +2408,7 @@ class Aligned(object):
     def to_moltype(self, moltype):
         """returns copy of self with moltype seqs"""
         data = self.data.to_moltype(moltype)
-        return self.__class__(map=self.map, data=data)
+        return self.__class__(map=self._coords(), data=data)
 
     def remapped_to(self, map):
         result = Aligned(map[self.map.inverse()].inverse(), self.data)
@@ -2218,7 +2432,7 @@ class Aligned(object):
         and shadow masked."""
         new_data = self.data.with_masked_annotations(annot_types, mask_char, shadow)
         # we remove the mask annotations from self and new_data
-        return self.__class__(self.map, new_data)
+        return self.__class__(self._coords(), new_data)
 
     def strand_symmetry(self, motif_length=1):
         """returns G-test for strand symmetry"""
@@ -2765,6 +2979,128 @@ class AlignmentI(object):
             for pos in range(start, end, step):
                 yield self[pos : pos + window]
 
+    def window_stats(
+        self,
+        window,
+        step,
+        stats=None,
+        start=None,
+        end=None,
+        include_ambiguity=False,
+        allow_gap=False,
+    ):
+        """returns a Table of statistics for the windows of sliding_windows()
+
+        Parameters
+        ----------
+        window
+            The length of each window.
+        step
+            The interval between the start of successive windows.
+        stats
+            series of statistics to compute, one or more of
+            'counts' (one column per state), 'gc' (fraction of G+C among
+            canonical nucleotides), 'gap_frac' (fraction of gap characters),
+            'entropy' (mean per-position Shannon entropy) and 'variable'
+            (number of variable positions). Defaults to all of these, with
+            'gc' only for DNA and RNA.
+        start
+            first window start position
+        end
+            last window start position
+        include_ambiguity
+            if True, ambiguous characters are included as states for
+            'counts', 'entropy' and 'variable'
+        allow_gap
+            if True, the gap character is included as a state for 'counts',
+            'entropy' and 'variable'
+
+        Notes
+        -----
+        All statistics are derived from cumulative per-position state counts,
+        so the cost is linear in alignment length, independent of window
+        and step. Windows are the same as those from sliding_windows().
+        """
+        from cogent3.util.table import Table
+
+        if stats is None:
+            stats = ["counts", "gc", "gap_frac", "entropy", "variable"]
+            if self.moltype.label not in ("dna", "rna"):
+                stats.remove("gc")
+        stats = [stats] if isinstance(stats, str) else list(stats)
+        valid = {"counts", "gc", "gap_frac", "entropy", "variable"}
+        unknown = set(stats) - valid
+        if unknown:
+            raise ValueError(f"unknown stats {unknown}, choose from {valid}")
+
+        if "gc" in stats and self.moltype.label not in ("dna", "rna"):
+            raise ValueError(f"gc not defined for {self.moltype.label!r} moltype")
+
+        start = [start, 0][start is None]
+        end = [end, len(self) - window + 1][end is None]
+        end = min(len(self) - window + 1, end)
+        starts = arange(start, max(start, end), step)
+        stops = starts + window
+
+        aln = (
+            self if isinstance(self, ArrayAlignment) else self.to_type(array_align=True)
+        )
+        alpha = aln.alphabet
+        data = aln.array_seqs
+        num_seqs, length = data.shape
+        num_states = len(alpha)
+
+        # per position counts of every state, as positions x states
+        offsets = arange(length) * num_states
+        counts = numpy.bincount(
+            (data + offsets).ravel(), minlength=length * num_states
+        ).reshape((length, num_states))
+
+        def window_sum(values):
+            cumulative = numpy.zeros((length + 1,) + values.shape[1:], dtype=float)
+            cumulative[1:] = values.cumsum(axis=0)
+            return cumulative[stops] - cumulative[starts]
+
+        exclude = set()
+        if not allow_gap:
+            exclude.update(self.moltype.gaps)
+        if not include_ambiguity:
+            exclude.update(c for c, v in self.moltype.ambiguities.items() if len(v) > 1)
+        states = [c for c in alpha if c not in exclude]
+        state_counts = counts[:, [alpha.index(c) for c in states]]
+
+        result = dict(start=starts, end=stops)
+        if "counts" in stats:
+            win_counts = window_sum(state_counts).astype(int)
+            for i, state in enumerate(states):
+                result[state] = win_counts[:, i]
+
+        if "gc" in stats:
+            canonical = window_sum(counts[:, [alpha.index(c) for c in self.moltype]])
+            gc = window_sum(counts[:, [alpha.index(c) for c in "GC"]])
+            with numpy.errstate(divide="ignore", invalid="ignore"):
+                result["gc"] = gc.sum(axis=1) / canonical.sum(axis=1)
+
+        if "gap_frac" in stats:
+            gaps = [alpha.index(c) for c in self.moltype.gaps if c in alpha]
+            gaps = window_sum(counts[:, gaps].sum(axis=1))
+            result["gap_frac"] = gaps / (num_seqs * window)
+
+        if "entropy" in stats:
+            totals = state_counts.sum(axis=1)
+            has_data = totals > 0
+            probs = state_counts / numpy.where(has_data, totals, 1)[:, None]
+            entropy = safe_p_log_p(probs).sum(axis=1)
+            with numpy.errstate(divide="ignore", invalid="ignore"):
+                result["entropy"] = window_sum(entropy) / window_sum(has_data)
+
+        if "variable" in stats:
+            variable = (state_counts > 0).sum(axis=1) > 1
+            result["variable"] = window_sum(variable).astype(int)
+
+        header = list(result)
+        return Table(header=header, data=result, title="window stats")
+
     def _get_raw_pretty(self, name_order):
         """returns dict {name: seq, ...} for pretty print"""
         if name_order is not None:
@@ -3710,6 +4046,44 @@ def aln_from_empty(obj, *args, **kwargs):
     raise ValueError("Cannot create empty alignment.")
 
 
+def _array_digest(data):
+    """returns a digest of the shape, dtype and contents of a numpy array"""
+    digest = hashlib.sha1(repr((data.shape, data.dtype.str)).encode("utf-8"))
+    digest.update(numpy.ascontiguousarray(data).view(uint8))
+    return digest.digest()
+
+
+def _take_or_view(array, indices, axis):
+    """returns a view of array if indices are evenly spaced, else a copy
+
+    indices can be integer positions or a boolean mask"""
+    indices = numpy.array(indices)
+    size = array.shape[axis]
+    if indices.dtype == bool:
+        if indices.shape != (size,):
+            raise IndexError(
+                f"boolean index of shape {indices.shape} does not match "
+                f"dimension of length {size}"
+            )
+        indices = numpy.flatnonzero(indices)
+    indices = indices.astype(int)
+    if len(indices) == 0 or indices.min() < -size or indices.max() >= size:
+        # take() raises the appropriate IndexError
+        return array.take(indices, axis=axis)
+
+    indices[indices < 0] += size
+    step = 1
+    if len(indices) > 1:
+        steps = numpy.diff(indices)
+        step = steps[0]
+        if step <= 0 or (steps != step).any():
+            return array.take(indices, axis=axis)
+
+    index = [slice(None)] * array.ndim
+    index[axis] = slice(indices[0], indices[-1] + 1, step)
+    return array[tuple(index)]
+
+
 # Implementation of Alignment base class
 
 
@@ -3807,6 +4181,124 @@ class ArrayAlignment(AlignmentI, _SequenceCollectionBase):
         self.array_positions = data
         self.names = names or self._make_names(len(data[0]))
 
+    def _view(self, array_seqs, names=None):
+        """returns a new instance wrapping array_seqs without copying it
+
+        Parameters
+        ----------
+        array_seqs : numpy.ndarray
+            seq x pos array, typically a slice of self.array_seqs so it
+            shares memory (offset, strides) with the parent
+        names : list
+            sequence names, defaults to self.names
+
+        Notes
+        -----
+        The wrapped array is marked read-only so the parent cannot be
+        modified through the view. Use copy() or deepcopy() to obtain an
+        alignment that owns its data.
+        """
+        names = list(self.names if names is None else names)
+        if len(names) != array_seqs.shape[0]:
+            raise ValueError(f"{len(names)} names for {array_seqs.shape[0]} sequences")
+
+        if array_seqs.base is not None and array_seqs.flags.writeable:
+            array_seqs = array_seqs.view()
+            array_seqs.flags.writeable = False
+
+        result = object.__new__(self.__class__)
+        result.name = None
+        result.alphabet = self.alphabet
+        result.moltype = self.moltype
+        result.info = self.info
+        result.names = names
+        result.array_seqs = array_seqs
+        result.array_positions = transpose(array_seqs)
+        result.seq_data = array_seqs
+        result._seqs = array_seqs
+        result.seq_len = array_seqs.shape[1]
+        result._type = self._type
+        result._repr_policy = dict(self._repr_policy)
+        result._is_view = True
+        return result
+
+    @property
+    def is_view(self):
+        """True if the sequence data is shared with another alignment"""
+        return getattr(self, "_is_view", False)
+
+    def site_patterns(self):
+        """returns the distinct alignment columns and their counts
+
+        Returns
+        -------
+        SitePatterns with attributes unique_columns (a seq x pattern array),
+        counts (occurrences of each pattern) and column_index (the pattern
+        index of each alignment column). The result is cached, its arrays
+        are read-only.
+
+        Notes
+        -----
+        The cache is keyed by a digest of array_seqs, so it is recomputed if
+        the sequence data is replaced or modified in place. Checking the
+        digest is linear in the alignment size but much cheaper than finding
+        the patterns.
+        """
+        digest = _array_digest(self.array_seqs)
+        cached = getattr(self, "_site_patterns", None)
+        if cached is not None and cached[0] == digest:
+            return cached[1]
+
+        uniq, index, counts = numpy.unique(
+            self.array_seqs, axis=1, return_inverse=True, return_counts=True
+        )
+        for values in (uniq, index, counts):
+            values.flags.writeable = False
+        result = SitePatterns(uniq, counts, index)
+        self._site_patterns = digest, result
+        return result
+
+    def bootstrap_weights(self, n, seed=None):
+        """returns pattern counts for n column bootstrap replicates
+
+        Parameters
+        ----------
+        n : int
+            number of bootstrap replicates
+        seed
+            seed for the random number generator
+
+        Returns
+        -------
+        n x num patterns array of ints, each row sums to the alignment length.
+        Columns correspond to those of site_patterns().unique_columns.
+
+        Notes
+        -----
+        Resampling columns with replacement is equivalent to a multinomial
+        draw over the distinct columns, weighted by their frequency.
+        """
+        counts = self.site_patterns().counts
+        length = counts.sum()
+        rng = numpy.random.RandomState(seed)
+        if not length:
+            return zeros((n, len(counts)), dtype=int)
+        return rng.multinomial(length, counts / length, size=n)
+
+    def _seq_indices(self, seqs, negate=False):
+        """returns names and row indices of seqs, in the order of seqs"""
+        if isinstance(seqs, str):
+            seqs = [seqs]
+
+        # once built, named_seqs records the name of each row
+        row_names = list(getattr(self, "_named_seqs", self.names))
+        if negate:
+            exclude = set(seqs)
+            seqs = [n for n in self.names if n not in exclude]
+
+        lookup = {n: i for i, n in enumerate(row_names)}
+        return seqs, [lookup[n] for n in seqs]
+
     def _get_positions(self):
         """Override superclass positions to return positions as symbols."""
         return list(map(self.alphabet.from_indices, self.array_positions))
@@ -3836,20 +4328,20 @@ class ArrayAlignment(AlignmentI, _SequenceCollectionBase):
         return iter(self.positions)
 
     def __getitem__(self, item):
-        if not isinstance(item, slice):
+        """returns alignment of the selected positions
+
+        Slices (and single integer positions) return alignments that share
+        the sequence data with self.
+        """
+        if isinstance(item, (int, numpy.integer)):
+            item = range(self.seq_len)[item]
+            item = slice(item, item + 1)
+
+        if isinstance(item, slice):
             data = self.array_seqs[:, item]
-            data = vstack(data)
         else:
-            data = self.array_seqs[:, item]
-        result = self.__class__(
-            data.T,
-            list(map(str, self.names)),
-            self.alphabet,
-            conversion_f=aln_from_array,
-            info=self.info,
-        )
-        result._repr_policy.update(self._repr_policy)
-        return result
+            data = _take_or_view(self.array_seqs, item, axis=1)
+        return self._view(data, names=list(map(str, self.names)))
 
     def _coerce_seqs(self, seqs, is_array):
         """Controls how seqs are coerced in _names_seqs_order.
@@ -3872,36 +4364,51 @@ class ArrayAlignment(AlignmentI, _SequenceCollectionBase):
         invert_pos: if True (default False), gets everything _except_ the
         specified positions.
 
-        Unlike most of the other code that gets things out of an alignment,
-        this method returns a new alignment that does NOT share data with the
-        original alignment.
+        If the selected sequences and positions are each evenly spaced (e.g.
+        a contiguous block), the result shares data with the original
+        alignment, otherwise only the selected data is copied.
         """
+        data = self.array_seqs
         # figure out which positions to keep, and keep them
         if pos is not None:
             if invert_pos:
-                pos_mask = ones(len(self.array_positions))
+                pos_mask = ones(self.seq_len)
                 put(pos_mask, pos, 0)
                 pos = nonzero(pos_mask)[0]
-            data = take(self.array_positions, pos, axis=0)
-        else:
-            data = self.array_positions
+            data = _take_or_view(data, pos, axis=1)
         # figure out which sequences to keep, and keep them
+        names = self.names
         if seqs is not None:
             if invert_seqs:
                 seq_mask = ones(len(self.array_seqs))
                 put(seq_mask, seqs, 0)
                 seqs = nonzero(seq_mask)[0]
-            data = take(data, seqs, 1)
+            data = _take_or_view(data, seqs, axis=0)
             names = [self.names[i] for i in seqs]
-        else:
-            names = self.names
-        return self.__class__(
-            data,
-            list(map(str, names)),
-            self.alphabet,
-            conversion_f=aln_from_array,
-            info=self.info,
-        )
+        return self._view(data, names=list(map(str, names)))
+
+    def take_seqs(self, seqs, negate=False, **kwargs):
+        """Returns new alignment containing only specified seqs.
+
+        If the selected sequences are evenly spaced in self, the result shares
+        data with self, otherwise only the selected rows are copied.
+        """
+        if kwargs and kwargs != {"moltype": self.moltype}:
+            return super(ArrayAlignment, self).take_seqs(seqs, negate=negate, **kwargs)
+
+        names, indices = self._seq_indices(seqs, negate=negate)
+        if not indices:
+            return {}  # safe value; can't construct empty alignment
+        data = _take_or_view(self.array_seqs, indices, axis=0)
+        return self._view(data, names=names)
+
+    def take_positions(self, cols, negate=False):
+        """Returns new alignment containing only specified positions.
+
+        If the positions are evenly spaced (e.g. a range), the result shares
+        data with self, otherwise only the selected columns are copied.
+        """
+        return self.get_sub_alignment(pos=list(cols), invert_pos=negate)
 
     def __str__(self):
         """Returns FASTA-format string.
@@ -4002,6 +4509,77 @@ class ArrayAlignment(AlignmentI, _SequenceCollectionBase):
         )
         return result
 
+    def counts_per_pos(
+        self, motif_length=1, include_ambiguity=False, allow_gap=False, alert=False
+    ):
+        """return DictArray of counts per position
+
+        Parameters
+        ----------
+
+        alert
+            warns if motif_length > 1 and alignment trimmed to produce
+            motif columns
+        """
+        if motif_length != 1:
+            return super(ArrayAlignment, self).counts_per_pos(
+                motif_length=motif_length,
+                include_ambiguity=include_ambiguity,
+                allow_gap=allow_gap,
+                alert=alert,
+            )
+
+        # count states once for each distinct column
+        patterns = self.site_patterns()
+        num_states = len(self.alphabet)
+        offsets = arange(patterns.unique_columns.shape[1]) * num_states
+        pattern_counts = numpy.bincount(
+            (patterns.unique_columns + offsets).ravel(),
+            minlength=len(offsets) * num_states,
+        ).reshape(len(offsets), num_states)
+
+        alpha = self.moltype.alphabet.get_word_alphabet(1)
+        observed = pattern_counts.any(axis=0).nonzero()[0]
+        all_motifs = {self.alphabet[i] for i in observed}
+        if all_motifs:
+            alpha += tuple(sorted(set(alpha) ^ all_motifs))
+
+        exclude_chars = set()
+        if not allow_gap:
+            exclude_chars.update(self.moltype.gap)
+
+        if not include_ambiguity:
+            ambigs = [c for c, v in self.moltype.ambiguities.items() if len(v) > 1]
+            exclude_chars.update(ambigs)
+
+        if exclude_chars:
+            alpha = [m for m in alpha if not (set(m) & exclude_chars)]
+
+        # motifs not in the alphabet have zero counts
+        pattern_counts = numpy.hstack(
+            [pattern_counts, zeros((len(offsets), 1), pattern_counts.dtype)]
+        )
+        lookup = {c: i for i, c in enumerate(self.alphabet)}
+        cols = [lookup.get(m, num_states) for m in alpha]
+        result = pattern_counts[patterns.column_index][:, cols]
+        return MotifCountsArray(result, alpha)
+
+    @extend_docstring_from(_SequenceCollectionBase.kmer_counts)
+    def kmer_counts(self, k, step=1, include_ambiguity=False, parallel=False):
+        if self.alphabet.get_motif_len() != 1:
+            return super(ArrayAlignment, self).kmer_counts(
+                k, step=step, include_ambiguity=include_ambiguity, parallel=parallel
+            )
+
+        from cogent3.core.sequence import get_kmer_counter
+
+        counter = get_kmer_counter(
+            self.moltype, k, step=step, include_ambiguity=include_ambiguity
+        )
+        # recode all sequences at once, rather than via strings
+        indices = counter.recoder(self.alphabet)[self.array_seqs]
+        return self._kmer_counts(counter, counter.count_indices, indices, parallel)
+
     def filtered(self, predicate, motif_length=1, drop_remainder=True, **kwargs):
         """The alignment positions where predicate(column) is true.
 
@@ -4066,6 +4644,50 @@ class ArrayAlignment(AlignmentI, _SequenceCollectionBase):
                 s = s.replace(gapchar, ambig)
         return s
 
+    def get_translation(self, gc=None, incomplete_ok=False, **kwargs):
+        """translate from nucleic acid to protein
+
+        Parameters
+        ----------
+        gc
+            genetic code, either the number or name
+            (use cogent3.core.genetic_code.available_codes)
+        incomplete_ok : bool
+            codons that are mixes of nucleotide and gaps converted to '?'.
+            raises a ValueError if False
+        kwargs
+            related to construction of the resulting object
+
+        Returns
+        -------
+        A new instance of self translated into protein
+        """
+        alphabet = self.moltype.alphabets.degen_gapped
+        if self.moltype.label not in ("dna", "rna") or tuple(self.alphabet) != tuple(
+            alphabet
+        ):
+            return super(ArrayAlignment, self).get_translation(
+                gc=gc, incomplete_ok=incomplete_ok, **kwargs
+            )
+
+        gc = get_code(gc)
+        # all codons are translated with a single lookup
+        translator = gc.get_codon_translator(self.moltype, incomplete_ok)
+        names, indices = self._seq_indices(self.names)
+        data = self.array_seqs[indices]
+        codes = translator.codon_codes(data)
+        translated, failed = translator.translate(codes)
+        if failed.any():
+            row, posn = numpy.unravel_index(failed.argmax(), failed.shape)
+            codon = "".join(
+                self.alphabet.from_indices(data[row, posn * 3 : posn * 3 + 3])
+            )
+            raise translator.error(codes[row, posn], codon, names[row])
+
+        translated = [(n, "".join(aa)) for n, aa in zip(names, translated.tolist())]
+        kwargs["moltype"] = cogent3.PROTEIN
+        return self.__class__(translated, info=self.info, **kwargs)
+
     def trim_stop_codons(self, gc=1, allow_partial=False, **kwargs):
         """Removes any terminal stop codons from the sequences
 
@@ -4298,55 +4920,17 @@ class ArrayAlignment(AlignmentI, _SequenceCollectionBase):
             mask_degen = False
 
         if not mask_degen:
-            seqs_names = list(zip(self.array_seqs.tolist(), self.names))
-            seqs_names.sort()
-            matched = None
-            dupes = defaultdict(set)
-            for i in range(self.num_seqs - 1):
-                if seqs_names[i][0] == seqs_names[i + 1][0]:
-                    matched = seqs_names[i][1] if matched is None else matched
-                    dupes[matched].update([seqs_names[i + 1][1], matched])
-                else:
-                    matched = None
-            identical_sets = list(dupes.values())
-            return identical_sets
+            return _identical_sets(self.names, self.array_seqs)
 
         # we get the indexes range for non-degenerate characters
         indices = [self.alphabet.index(c) for c in self.moltype]
         # make sure they're all consecutive
         diffs = set([indices[i - 1] - indices[i] for i in range(1, len(indices))])
         assert diffs == set([-1]), diffs
-        start, end = min(indices), max(indices)
-        # identify non-masked positions
-        degen_masks = {}
-        for i in range(self.num_seqs):
-            s1 = self.array_seqs[i]
-            degen_masks[i] = logical_or(s1 <= start, s1 <= end)
-
-        identical_sets = []
-        seen = set()
-        for i in range(self.num_seqs - 1):
-            if i in seen:
-                continue
-
-            s1 = self.array_seqs[i]
-            m1 = degen_masks[i]
-            group = set()
-            for j in range(i + 1, self.num_seqs):
-                if j in seen:
-                    continue
-
-                s2 = self.array_seqs[j]
-                m2 = degen_masks[j]
-                valid_pos = logical_and(m1, m2)  # non-degen positions
-                if (s1[valid_pos] == s2[valid_pos]).all():
-                    seen.update([i, j])
-                    group.update([i, j])
-
-            if group:
-                identical_sets.append(set(self.names[i] for i in group))
-
-        return identical_sets
+        end = max(indices)
+        # degenerate characters and gaps are masked
+        masked = self.array_seqs > end
+        return _identical_sets(self.names, self.array_seqs, masked=masked)
 
     def deepcopy(self, sliced=True):
         """Returns deep copy of self."""
@@ -4457,10 +5041,16 @@ class Alignment(_Annotatable, AlignmentI, SequenceCollection):
 
     def _seq_to_aligned(self, seq, key):
         """Converts seq to Aligned object -- override in subclasses"""
-        (map, seq) = self.moltype.make_seq(
-            seq, key, preserve_case=True
-        ).parse_out_gaps()
-        return Aligned(map, seq)
+        seq = self.moltype.make_seq(seq, key, preserve_case=True)
+        if seq.annotations:
+            (map, seq) = seq.parse_out_gaps()
+            return Aligned(map, seq)
+
+        gaps, ungapped = GapPositions.from_gapped_seq(seq, gap="-")
+        seq = seq.__class__(
+            ungapped, name=seq.get_name(), info=seq.info, preserve_case=True
+        )
+        return Aligned(gaps, seq)
 
     def __repr__(self):
         seqs = []
@@ -4641,18 +5231,18 @@ class Alignment(_Annotatable, AlignmentI, SequenceCollection):
         tgp = template.alphabet.gap
         result = {}
         for name in self.names:
-            seq = self.get_gapped_seq(name)
+            seq = str(self.get_gapped_seq(name))
             if name not in template.names:
                 raise ValueError("Template alignment doesn't have a '%s'" % name)
-            gsq = template.get_gapped_seq(name)
+            gsq = str(template.get_gapped_seq(name))
             assert len(gsq) == len(seq)
-            combo = []
-            for (s, g) in zip(seq, gsq):
-                if g == tgp:
-                    combo.append(gap)
-                else:
-                    combo.append(s)
-            result[name] = combo
+            if not seq:
+                result[name] = seq
+                continue
+            seq = numpy.array([seq]).view("U1")
+            gsq = numpy.array([gsq]).view("U1")
+            combo = numpy.where(gsq == tgp, gap, seq)
+            result[name] = combo.view(f"U{len(combo)}")[0]
         return Alignment(result, alphabet=self.alphabet.with_gap_motif())
 
     def get_degapped_relative_to(self, name):
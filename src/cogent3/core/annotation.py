@@ -2,7 +2,8 @@ import copy
 import json
 
 from collections import defaultdict
-from fnmatch import fnmatch
+from fnmatch import filter as fnmatch_filter
+from os.path import normcase
 
 import numpy
 
@@ -21,6 +22,129 @@ __email__ = "gavin.huttley@anu.edu.au"
 __status__ = "Production"
 
 
+def _matching_keys(lookup, folded, pattern):
+    """keys of lookup matching the fnmatch pattern
+
+    folded maps os.path.normcase of each key to the keys, so literal
+    patterns follow the same case rules as fnmatch without a scan.
+    """
+    if not any(c in pattern for c in "*?["):
+        return folded.get(normcase(pattern), [])
+    return fnmatch_filter([k for k in lookup if isinstance(k, str)], pattern)
+
+
+def _folded_keys(lookup):
+    """maps os.path.normcase of each str key of lookup to those keys"""
+    folded = defaultdict(list)
+    for key in lookup:
+        if isinstance(key, str):
+            folded[normcase(key)].append(key)
+    return folded
+
+
+def _counts_changes(name):
+    """list method name, which also increments the version of the list"""
+    method = getattr(list, name)
+
+    def changed(self, *args, **kwargs):
+        self.version += 1
+        return method(self, *args, **kwargs)
+
+    changed.__name__ = name
+    changed.__doc__ = method.__doc__
+    return changed
+
+
+class _AnnotationList(list):
+    """list of annotations whose version increments on every in-place change,
+    so an index built from it can be checked for staleness in O(1)"""
+
+    version = 0
+
+    append = _counts_changes("append")
+    extend = _counts_changes("extend")
+    insert = _counts_changes("insert")
+    remove = _counts_changes("remove")
+    pop = _counts_changes("pop")
+    clear = _counts_changes("clear")
+    sort = _counts_changes("sort")
+    reverse = _counts_changes("reverse")
+    __setitem__ = _counts_changes("__setitem__")
+    __delitem__ = _counts_changes("__delitem__")
+    __iadd__ = _counts_changes("__iadd__")
+    __imul__ = _counts_changes("__imul__")
+
+
+class _AnnotationIndex:
+    """type, name and interval lookups for a list of annotations
+
+    Lookups return positions in the annotations list, in list order.
+    Intervals are grouped into bins of similar length, each sorted by
+    start, so a query only scans features that could reach it.
+    """
+
+    def __init__(self, annotations):
+        self._annotations = annotations
+        self._version = annotations.version
+        self.by_type = defaultdict(list)
+        self.by_name = defaultdict(list)
+        starts, ends, positions = [], [], []
+        for i, annot in enumerate(annotations):
+            self.by_type[annot.type].append(i)
+            self.by_name[annot.name].append(i)
+            if annot.map.useful:
+                starts.append(annot.map.start)
+                ends.append(annot.map.end)
+                positions.append(i)
+        self._folded_type = _folded_keys(self.by_type)
+        self._folded_name = _folded_keys(self.by_name)
+
+        starts = numpy.array(starts, dtype=int)
+        ends = numpy.array(ends, dtype=int)
+        positions = numpy.array(positions, dtype=int)
+        # bin by the power of 2 bounding the length
+        bins = numpy.frexp(numpy.maximum(ends - starts, 1))[1]
+        self._bins = []
+        for bin_ in numpy.unique(bins):
+            selected = numpy.flatnonzero(bins == bin_)
+            order = selected[numpy.argsort(starts[selected], kind="stable")]
+            max_length = (ends[order] - starts[order]).max()
+            self._bins.append(
+                (max_length, starts[order], ends[order], positions[order])
+            )
+
+    def is_current(self, annotations):
+        """True if built from annotations in their current state"""
+        return annotations is self._annotations and (
+            annotations.version == self._version
+        )
+
+    def matching(self, annotation_type, name=None):
+        """positions of annotations whose type (and name) match the patterns"""
+        positions = set()
+        for key in _matching_keys(self.by_type, self._folded_type, annotation_type):
+            positions.update(self.by_type[key])
+        if name is not None and positions:
+            named = set()
+            for key in _matching_keys(self.by_name, self._folded_name, name):
+                named.update(self.by_name[key])
+            positions &= named
+        return sorted(positions)
+
+    def overlapping(self, start, end):
+        """positions of annotations that overlap [start, end)"""
+        selected = []
+        for max_length, starts, ends, positions in self._bins:
+            lo = numpy.searchsorted(starts, start - max_length, side="right")
+            hi = numpy.searchsorted(starts, end, side="left")
+            selected.append(positions[lo:hi][ends[lo:hi] > start])
+        if not selected:
+            return []
+        selected = numpy.concatenate(selected)
+        selected.sort()
+        return selected.tolist()
+
+
 class _Annotatable:
     # default
     annotations = ()
@@ -38,18 +162,24 @@ class _Annotatable:
             #    print "Annotations dropped because %s" % detail
             #    return []
             if slicemap.useful:
-                for annot in self.annotations:
-                    if not annot.map.useful:
-                        continue
-                    if (
-                        annot.map.start < slicemap.end
-                        and annot.map.end > slicemap.start
-                    ):
-                        annot = annot.remapped_to(new, newmap)
-                        if annot.map.useful:
-                            result.append(annot)
+                index = self._get_annotation_index()
+                for i in index.overlapping(slicemap.start, slicemap.end):
+                    annot = self.annotations[i].remapped_to(new, newmap)
+                    if annot.map.useful:
+                        result.append(annot)
         return result
 
+    def _get_annotation_index(self):
+        """returns the index of annotations, rebuilding it if stale"""
+        if not isinstance(self.annotations, _AnnotationList):
+            # tracks in-place changes from here on
+            self.annotations = _AnnotationList(self.annotations)
+        index = getattr(self, "_annotation_index", None)
+        if index is None or not index.is_current(self.annotations):
+            index = _AnnotationIndex(self.annotations)
+            self._annotation_index = index
+        return index
+
     def _shifted_annotations(self, new, shift):
         result = []
         if self.annotations:
@@ -111,6 +241,7 @@ class _Annotatable:
 
     def clear_annotations(self):
         self.annotations = []
+        self._annotation_index = None
 
     def get_drawable(self, width=600, vertical=False):
         """returns Drawable instance"""
@@ -160,6 +291,7 @@ class _Annotatable:
         if self.annotations is self.__class__.annotations:
             self.annotations = []
         self.annotations.extend(annots)
+        self._annotation_index = None
         for annot in annots:
             annot.attached = True
 
@@ -171,6 +303,7 @@ class _Annotatable:
             if annot.attached:
                 self.annotations.remove(annot)
                 annot.attached = False
+        self._annotation_index = None
 
     def add_feature(self, type, name, spans):
         return self.add_annotation(Feature, type, name, spans)
@@ -193,17 +326,23 @@ class _Annotatable:
         result = []
         if len(self.annotations) == 0:
             return result
-        for annotation in self.annotations:
-            if fnmatch(annotation.type, annotation_type) and (
-                name is None or fnmatch(annotation.name, name)
-            ):
+        matched = self._get_annotation_index().matching(annotation_type, name)
+        if not extend_query:
+            return [self.annotations[i] for i in matched]
+
+        # sub-annotations are not indexed here, since they can change
+        # independently of this object
+        nested = [i for i, a in enumerate(self.annotations) if a.annotations]
+        matched = set(matched)
+        for i in sorted(matched.union(nested)):
+            annotation = self.annotations[i]
+            if i in matched:
                 result.append(annotation)
-            if extend_query:
-                result.extend(
-                    annotation.get_annotations_matching(
-                        annotation_type, name, extend_query=extend_query
-                    )
+            result.extend(
+                annotation.get_annotations_matching(
+                    annotation_type, name, extend_query=extend_query
                 )
+            )
         return result
 
     def get_region_covering_all(
@@ -0,0 +1,695 @@
+"""An immutable tree stored as numpy arrays, for very large phylogenies.
+
+Nodes are numbered in preorder, so the descendants of node i are the
+contiguous block of indices i to i + sizes[i] - 1 and every node follows its
+parent. Node attributes are arrays indexed by node number, while children are
+stored in compressed sparse row form.
+"""
+import re
+
+import numpy
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.7.2a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "Gavin.Huttley@anu.edu.au"
+__status__ = "Production"
+
+
+_needs_quotes = re.compile("""[]['"(),:;_]""").search
+
+
+def _newick_name(name, escape_name):
+    """returns name formatted for inclusion in a newick string"""
+    name = str(name)
+    if escape_name and not (name.startswith("'") and name.endswith("'")):
+        if _needs_quotes(name):
+            name = "'%s'" % name.replace("'", "''")
+        else:
+            name = name.replace(" ", "_")
+    return name
+
+
+def _read_only(data):
+    data.flags.writeable = False
+    return data
+
+
+def _sparse_table(keys):
+    """returns array whose row p holds the minima of keys over windows of
+    length 2**p starting at each position"""
+    num = len(keys)
+    table = numpy.empty((max(num.bit_length(), 1), num), dtype=keys.dtype)
+    table[0] = keys
+    for level in range(1, len(table)):
+        width = 1 << (level - 1)
+        previous = table[level - 1]
+        table[level] = previous
+        numpy.minimum(previous[:-width], previous[width:], out=table[level][:-width])
+    return table
+
+
+def _range_min(table, lo, hi):
+    """returns the minima of keys[lo:hi], for arrays lo < hi, from a sparse
+    table"""
+    level = numpy.frexp(hi - lo)[1] - 1
+    return numpy.minimum(table[level, lo], table[level, hi - (1 << level)])
+
+
+class ArrayTree:
+    """an immutable tree stored as arrays of node attributes
+
+    Attributes
+    ----------
+    names
+        node names, in preorder
+    parents
+        index of each node's parent, -1 for the root
+    lengths
+        branch lengths, nan where the length is not defined
+    sizes
+        number of nodes in the subtree rooted at each node
+    """
+
+    def __init__(
+        self,
+        parents,
+        names,
+        lengths=None,
+        name_loaded=None,
+        params=None,
+        node_class=None,
+    ):
+        """
+        Parameters
+        ----------
+        parents
+            parent index of each node, nodes must be in preorder so the root
+            is 0 and every other node follows its parent
+        names
+            series of node names
+        lengths
+            branch lengths, nan or None for undefined
+        name_loaded
+            whether each node name is written to newick, defaults to True for
+            named nodes
+        params
+            {node index: params dict} for nodes with parameters other than
+            length
+        node_class
+            the TreeNode class produced by to_tree(), defaults to PhyloNode
+        """
+        if node_class is None:
+            from cogent3.core.tree import PhyloNode
+
+            node_class = PhyloNode
+
+        parents = numpy.array(parents, dtype=numpy.int64)
+        num = len(parents)
+        if num == 0 or parents[0] != -1:
+            raise ValueError("the first node must be the root")
+        if (parents[1:] < 0).any() or (parents[1:] >= numpy.arange(1, num)).any():
+            raise ValueError("nodes must be in preorder")
+        if len(names) != num:
+            raise ValueError(f"{len(names)} names != {num} nodes")
+
+        if lengths is None:
+            lengths = numpy.full(num, numpy.nan)
+        else:
+            lengths = numpy.array(
+                [numpy.nan if l is None else l for l in lengths], dtype=float
+            )
+        if name_loaded is None:
+            name_loaded = [name is not None for name in names]
+
+        # children are grouped by parent, a stable sort keeps their order
+        order = numpy.argsort(parents[1:], kind="stable") + 1
+        counts = numpy.bincount(parents[1:], minlength=num)
+        offsets = numpy.zeros(num + 1, dtype=numpy.int64)
+        numpy.cumsum(counts, out=offsets[1:])
+
+        # parents precede children, so a reverse pass accumulates the sizes
+        sizes = [1] * num
+        for child, parent in zip(range(num - 1, 0, -1), parents[:0:-1].tolist()):
+            sizes[parent] += sizes[child]
+
+        self.names = tuple(names)
+        self.parents = _read_only(parents)
+        self.lengths = _read_only(lengths)
+        self.sizes = _read_only(numpy.array(sizes, dtype=numpy.int64))
+        self.name_loaded = _read_only(numpy.array(name_loaded, dtype=bool))
+        self._params = dict(params or {})
+        self._node_class = node_class
+        self._child_order = _read_only(order)
+        self._child_offsets = _read_only(offsets)
+        self._name_index = None
+        self._depths = None
+
+    @classmethod
+    def from_tree(cls, tree):
+        """returns an ArrayTree from a TreeNode, with tree as the root"""
+        from cogent3.core.tree import PhyloNode
+
+        index = {}
+        parents = []
+        names = []
+        lengths = []
+        name_loaded = []
+        params = {}
+        is_phylo = isinstance(tree, PhyloNode)
+        for i, node in enumerate(tree.preorder()):
+            index[id(node)] = i
+            parents.append(index[id(node.parent)] if i else -1)
+            names.append(node.name)
+            name_loaded.append(node.name_loaded)
+            # TreeNode instances may carry a length attribute too
+            lengths.append(getattr(node, "length", None))
+            node_params = node.params
+            if is_phylo:
+                if len(node_params) > 1 or "length" not in node_params:
+                    node_params = node_params.copy()
+                    node_params.pop("length", None)
+                    params[i] = node_params
+            elif node_params:
+                params[i] = node_params.copy()
+
+        return cls(
+            parents,
+            names,
+            lengths=lengths,
+            name_loaded=name_loaded,
+            params=params,
+            node_class=type(tree),
+        )
+
+    def to_tree(self):
+        """returns the equivalent TreeNode tree"""
+        from cogent3.core.tree import PhyloNode
+
+        is_phylo = issubclass(self._node_class, PhyloNode)
+        lengths = self.lengths.tolist()
+        name_loaded = self.name_loaded.tolist()
+        nodes = [None] * len(self)
+        for i in range(len(self) - 1, -1, -1):
+            params = dict(self._params.get(i, {}))
+            length = lengths[i]
+            length = None if length != length else length
+            if is_phylo:
+                params["length"] = length
+            children = [nodes[c] for c in self.children(i).tolist()]
+            nodes[i] = self._node_class(
+                name=self.names[i],
+                children=children,
+                params=params,
+                name_loaded=name_loaded[i],
+            )
+            if not is_phylo and length is not None:
+                nodes[i].length = length
+        return nodes[0]
+
+    def __len__(self):
+        return len(self.parents)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(num_nodes={len(self)}, num_tips={self.num_tips})"
+
+    @property
+    def num_tips(self):
+        return int((self.sizes == 1).sum())
+
+    def index(self, name):
+        """returns the index of the first node, in preorder, named name"""
+        if self._name_index is None:
+            index = {}
+            for i, n in enumerate(self.names):
+                index.setdefault(n, i)
+            self._name_index = index
+        try:
+            return self._name_index[name]
+        except KeyError:
+            raise ValueError(f"no node named {name!r}")
+
+    def params(self, index):
+        """returns params dict of node index, excluding length"""
+        return dict(self._params.get(index, {}))
+
+    def children(self, index):
+        """returns indices of the children of node index"""
+        offsets = self._child_offsets
+        return self._child_order[offsets[index] : offsets[index + 1]]
+
+    def num_children(self):
+        """returns the number of children of each node"""
+        return numpy.diff(self._child_offsets)
+
+    def is_tip(self):
+        """returns boolean array indicating the tip nodes"""
+        return self.sizes == 1
+
+    def tips(self, index=0):
+        """returns indices of the tips descended from node index, in the
+        order of get_tip_names()"""
+        block = numpy.arange(index, index + self.sizes[index])
+        return block[self.sizes[block] == 1]
+
+    def tip_names(self, index=0):
+        """returns the names of the tips descended from node index"""
+        return [self.names[i] for i in self.tips(index).tolist()]
+
+    def descendants(self, index, include_self=True):
+        """returns indices of nodes descended from node index, in preorder"""
+        start = index if include_self else index + 1
+        return numpy.arange(start, index + self.sizes[index])
+
+    def preorder(self):
+        """returns node indices in preorder"""
+        return numpy.arange(len(self))
+
+    def postorder(self):
+        """returns node indices in postorder"""
+        # nodes preceding node i in postorder are those preceding it in
+        # preorder which are not its ancestors, plus its descendants
+        position = numpy.arange(len(self)) - self.depths + self.sizes - 1
+        order = numpy.empty(len(self), dtype=numpy.int64)
+        order[position] = numpy.arange(len(self))
+        return order
+
+    def _accumulate(self, values):
+        """returns the sum of values over each node and its ancestors
+
+        Notes
+        -----
+        Uses pointer jumping, so takes O(log depth) vectorised passes.
+        """
+        total = numpy.array(values)
+        ancestors = self.parents.copy()
+        linked = ancestors >= 0
+        while linked.any():
+            indices = ancestors[linked]
+            total[linked] += total[indices]
+            ancestors[linked] = ancestors[indices]
+            linked = ancestors >= 0
+        return total
+
+    @property
+    def depths(self):
+        """number of edges between each node and the root"""
+        if self._depths is None:
+            steps = numpy.ones(len(self), dtype=numpy.int64)
+            steps[0] = 0
+            self._depths = _read_only(self._accumulate(steps))
+        return self._depths
+
+    def root_distances(self, default_length=0.0, dtype=float):
+        """returns the sum of branch lengths between each node and the root
+
+        Parameters
+        ----------
+        default_length
+            used for undefined branch lengths
+        dtype
+            of the result
+        """
+        lengths = numpy.where(numpy.isnan(self.lengths), default_length, self.lengths)
+        lengths = lengths.astype(dtype)
+        lengths[0] = 0
+        return self._accumulate(lengths)
+
+    def lca_index(self):
+        """returns an LCAIndex for lowest common ancestor queries"""
+        return LCAIndex(self)
+
+    def subtree_extractor(self):
+        """returns a SubtreeExtractor for repeated sub tree queries"""
+        return SubtreeExtractor(self)
+
+    def tip_to_tip_distances(
+        self, tips=None, default_length=1, condensed=False, dtype=float
+    ):
+        """returns the distances between pairs of tips
+
+        Parameters
+        ----------
+        tips
+            node indices of tips, defaults to all tips in preorder
+        default_length
+            used for undefined branch lengths
+        condensed
+            if True, returns the upper triangle as a condensed vector
+        dtype
+            of the result, float32 halves the memory for large trees
+
+        Returns
+        -------
+        array of distances in the order of tips
+
+        Notes
+        -----
+        The distance between two tips is the sum of their root distances minus
+        twice that of their lowest common ancestor. Sorted in preorder, the
+        lowest common ancestor of any two tips is the shallowest of those of
+        the consecutive tips between them. So each row is computed from a
+        running minimum over depths.
+        """
+        all_tips = self.tips()
+        if tips is None:
+            tips = all_tips
+        tips = numpy.asarray(tips, dtype=numpy.int64)
+        if len(tips) and (self.sizes[tips] != 1).any():
+            raise ValueError("not all indices are tips")
+
+        unique, inverse = numpy.unique(tips, return_inverse=True)
+        num_nodes = len(self)
+        # the lowest common ancestor of adjacent tips is the parent of the node
+        # following the first in preorder, encoded to sort by depth
+        ancestors = self.parents[all_tips[:-1] + 1]
+        keys = self.depths[ancestors] * num_nodes + ancestors
+        if len(unique) < len(all_tips) and len(unique) > 1:
+            positions = numpy.searchsorted(all_tips, unique)
+            keys = _range_min(_sparse_table(keys), positions[:-1], positions[1:])
+
+        # extended precision limits the rounding error from differencing
+        root_dists = self.root_distances(
+            default_length=default_length, dtype=numpy.longdouble
+        )
+        tip_dists = root_dists[unique]
+        num = len(unique)
+        in_order = num == len(tips) and (tips == unique).all()
+        if condensed and in_order:
+            result = numpy.zeros(num * (num - 1) // 2, dtype=dtype)
+        else:
+            result = numpy.zeros((num, num), dtype=dtype)
+
+        start = 0
+        for i in range(num - 1):
+            common = numpy.minimum.accumulate(keys[i:]) % num_nodes
+            row = tip_dists[i] + tip_dists[i + 1 :] - 2 * root_dists[common]
+            if result.ndim == 1:
+                result[start : start + len(row)] = row
+                start += len(row)
+            else:
+                result[i, i + 1 :] = row
+
+        if result.ndim == 1:
+            return result
+
+        result += result.T
+        if not in_order:
+            result = result[numpy.ix_(inverse, inverse)]
+        if condensed:
+            result = result[numpy.triu_indices(len(tips), k=1)]
+        return result
+
+    def _newick_chunks(
+        self, with_distances, escape_name, with_node_names, length_format, chunk_size
+    ):
+        """yields the newick string in pieces, each covering chunk_size nodes
+        in preorder"""
+        from cogent3.core.tree import PhyloNode
+
+        num = len(self)
+        names = self.names
+        write_name = self.name_loaded | with_node_names
+        if with_node_names:
+            write_name[0] = False
+        if with_distances and issubclass(self._node_class, PhyloNode):
+            defined = ~numpy.isnan(self.lengths)
+        else:
+            defined = numpy.zeros(num, dtype=bool)
+        fmt = str if length_format is None else length_format.__mod__
+
+        def labels(indices):
+            result = []
+            for i in indices:
+                label = ""
+                if write_name[i] and names[i] is not None:
+                    label = _newick_name(names[i], escape_name)
+                if defined[i]:
+                    label = "%s:%s" % (label, fmt(self.lengths[i]))
+                result.append(label)
+            return result
+
+        internal = self.sizes > 1
+        # nodes other than the first child of their parent follow a comma
+        first_child = numpy.zeros(num, dtype=bool)
+        first_child[0] = True
+        first_child[self._child_order[self._child_offsets[:-1][internal]]] = True
+
+        # the closing token of an internal node follows the last node of its
+        # subtree, closing tokens at the same position are deepest first
+        closing_nodes = numpy.flatnonzero(internal)
+        ends = closing_nodes + self.sizes[closing_nodes]
+        order = numpy.lexsort((-closing_nodes, ends))
+        closing_nodes, ends = closing_nodes[order], ends[order]
+
+        for begin in range(0, num, chunk_size):
+            stop = min(begin + chunk_size, num)
+            lo, hi = numpy.searchsorted(ends, [begin, stop])
+            closing = iter([")" + l for l in labels(closing_nodes[lo:hi].tolist())])
+            num_closed = numpy.bincount(ends[lo:hi] - begin, minlength=stop - begin)
+            nodes = range(begin, stop)
+            tokens = []
+            for n, first, is_internal, label in zip(
+                num_closed.tolist(),
+                first_child[begin:stop].tolist(),
+                internal[begin:stop].tolist(),
+                labels(nodes),
+            ):
+                tokens.extend(next(closing) for _ in range(n))
+                token = "(" if is_internal else label
+                tokens.append(token if first else "," + token)
+            if stop == num:
+                # subtrees ending with the last node, including the root
+                remaining = closing_nodes[hi:].tolist()
+                tokens.extend(")" + l for l in labels(remaining))
+            yield "".join(tokens)
+
+    def get_newick(
+        self,
+        with_distances=False,
+        semicolon=True,
+        escape_name=True,
+        with_node_names=False,
+        length_format=None,
+    ):
+        """returns the newick string for the tree, the same as produced by
+        TreeNode.get_newick() for the equivalent tree
+
+        Parameters
+        ----------
+        with_distances
+            whether branch lengths are included.
+        semicolon
+            end tree string with a semicolon
+        escape_name
+            if any of these characters []'"(),
+            nodes name, wrap the name in single quotes
+        with_node_names
+            includes internal node names (except 'root')
+        length_format
+            %-style format for branch lengths, e.g. "%.6g", defaults to str()
+        """
+        chunks = list(
+            self._newick_chunks(
+                with_distances, escape_name, with_node_names, length_format, len(self)
+            )
+        )
+        if semicolon:
+            chunks.append(";")
+        return "".join(chunks)
+
+    def write_newick(
+        self,
+        handle,
+        with_distances=True,
+        semicolon=True,
+        escape_name=True,
+        with_node_names=False,
+        length_format=None,
+        chunk_size=2 ** 16,
+    ):
+        """writes the newick string for the tree to an open file
+
+        Parameters
+        ----------
+        handle
+            a file like object opened for writing text
+        chunk_size
+            number of nodes written at once
+
+        Notes
+        -----
+        Other arguments are as for get_newick(). Each write covers chunk_size
+        nodes in preorder, and only the text of that chunk is built, so the
+        full string is never held in memory.
+        """
+        for chunk in self._newick_chunks(
+            with_distances, escape_name, with_node_names, length_format, chunk_size
+        ):
+            handle.write(chunk)
+        if semicolon:
+            handle.write(";")
+
+
+class LCAIndex:
+    """answers lowest common ancestor queries on a fixed tree
+
+    Notes
+    -----
+    Construction is O(n log n) in the number of nodes, after which each
+    pairwise query is O(1). For nodes u < v in preorder, where u is not an
+    ancestor of v, the lowest common ancestor is the parent of the shallowest
+    node in the preorder interval (u, v], found from a sparse table of depths.
+    """
+
+    def __init__(self, tree):
+        """
+        Parameters
+        ----------
+        tree
+            an ArrayTree
+        """
+        self.tree = tree
+        num = len(tree)
+        self._table = _sparse_table(tree.depths * num + numpy.arange(num))
+
+    def indices(self, nodes):
+        """returns node indices for nodes, which are names or indices"""
+        nodes = numpy.asarray(nodes)
+        if nodes.dtype.kind in "iu":
+            return nodes.astype(numpy.int64)
+        indices = [self.tree.index(n) for n in nodes.ravel().tolist()]
+        return numpy.array(indices, dtype=numpy.int64).reshape(nodes.shape)
+
+    def pairwise(self, first, second):
+        """returns the indices of the lowest common ancestors of pairs of nodes
+
+        Parameters
+        ----------
+        first, second
+            node names or indices, as scalars or arrays which are broadcast
+            against each other
+        """
+        first, second = numpy.broadcast_arrays(
+            self.indices(first), self.indices(second)
+        )
+        lo = numpy.minimum(first, second)
+        hi = numpy.maximum(first, second)
+        result = numpy.array(lo)
+        # hi is not descended from lo
+        apart = hi >= lo + self.tree.sizes[lo]
+        if apart.any():
+            shallowest = _range_min(self._table, lo[apart] + 1, hi[apart] + 1)
+            result[apart] = self.tree.parents[shallowest % len(self.tree)]
+        return result[()] if result.ndim == 0 else result
+
+    def common_ancestor(self, nodes):
+        """returns the index of the lowest common ancestor of a set of nodes
+
+        Notes
+        -----
+        This is the lowest common ancestor of the first and last of the nodes
+        in preorder.
+        """
+        nodes = self.indices(nodes)
+        return int(self.pairwise(nodes.min(), nodes.max()))
+
+
+class SubtreeExtractor:
+    """builds the sub trees induced by subsets of tips of a fixed tree
+
+    Notes
+    -----
+    The sub tree for k tips has at most 2k - 1 nodes, being the tips and the
+    lowest common ancestors of tips adjacent in preorder. Sorted in preorder,
+    the parent of each of these nodes is its lowest common ancestor with the
+    preceding node. So each query costs O(k log k), independent of the size
+    of the tree.
+    """
+
+    def __init__(self, tree):
+        """
+        Parameters
+        ----------
+        tree
+            an ArrayTree
+        """
+        self.tree = tree
+        self._lca = tree.lca_index()
+        # distances are differenced, extended precision limits rounding error
+        self._root_dists = tree.root_distances(dtype=numpy.longdouble)
+        self._num_undefined = tree._accumulate(numpy.isnan(tree.lengths).astype(int))
+        self._num_undefined -= int(numpy.isnan(tree.lengths[0]))
+
+    def get_sub_tree(self, names, ignore_missing=False):
+        """returns a new tree containing only the named nodes
+
+        Parameters
+        ----------
+        names
+            names of tips, or of internal nodes whose tips are all included
+        ignore_missing
+            if False, raises a ValueError if names contains names that aren't
+            nodes in the tree
+
+        Returns
+        -------
+        A tree of the same type as the original, rooted at the lowest common
+        ancestor of the tips and unrooted if the original tree was. Branch
+        lengths are the sums of those along the original paths, None if any
+        of them is undefined. Other params are those of the original nodes.
+        """
+        from cogent3.core.tree import TreeError
+
+        tree = self.tree
+        indices = []
+        for name in names:
+            try:
+                indices.append(tree.index(name))
+            except ValueError:
+                if not ignore_missing:
+                    raise ValueError("edge %s not found in tree" % name)
+        indices = numpy.array(indices, dtype=numpy.int64)
+        if (tree.sizes[indices] > 1).any():
+            indices = numpy.concatenate([tree.tips(i) for i in indices.tolist()])
+        tips = numpy.unique(indices)
+        if len(tips) == 0:
+            raise TreeError("no tree created in make sub tree")
+        elif len(tips) == 1:
+            raise TreeError("only a tip was returned from selecting sub tree")
+
+        lca = self._lca.pairwise
+        nodes = numpy.union1d(tips, lca(tips[:-1], tips[1:]))
+        parents = lca(nodes[:-1], nodes[1:])
+        lengths = self._root_dists[nodes[1:]] - self._root_dists[parents]
+        undefined = self._num_undefined[nodes[1:]] > self._num_undefined[parents]
+        lengths = [None if u else float(l) for u, l in zip(undefined.tolist(), lengths)]
+        parents = numpy.searchsorted(nodes, parents).tolist()
+
+        node_class = tree._node_class
+        name_loaded = tree.name_loaded
+        children = [[] for _ in nodes]
+        for i, parent in zip(range(len(nodes) - 1, 0, -1), parents[::-1]):
+            children[parent].append(i)
+
+        new_nodes = [None] * len(nodes)
+        for i, index in zip(range(len(nodes) - 1, -1, -1), nodes[::-1].tolist()):
+            params = tree.params(index)
+            params["length"] = lengths[i - 1] if i else None
+            new_nodes[i] = node_class(
+                name=tree.names[index],
+                children=[new_nodes[c] for c in children[i][::-1]],
+                params=params,
+                name_loaded=bool(name_loaded[index]),
+            )
+
+        result = new_nodes[0]
+        result.name = "root"
+        # keep unrooted
+        if tree.num_children()[0] > 2 and len(result.children) < 3:
+            result = result.unrooted()
+        return result
@@ -9,6 +9,9 @@ import re
 
 from itertools import product
 
+import numpy
+
+from cogent3.core.alphabet import AlphabetError
 from cogent3.util.table import Table
 
 
@@ -46,6 +49,112 @@ def _simple_rc(seq):
 
 _bases = "TCAG"
 
+# maps the byte value of a nucleotide to its index in _bases, everything
+# that is not an unambiguous base maps to 4
+_nt_to_index = numpy.full(256, 4, dtype=numpy.uint8)
+for _i, _b in enumerate(_bases + "U"):
+    _nt_to_index[[ord(_b), ord(_b.lower())]] = _i % 4
+
+# complement in index space, 4 is its own complement
+_complement_index = numpy.array([2, 3, 0, 1, 4], dtype=numpy.uint8)
+
+
+def _nt_indices(dna):
+    """returns dna as array of indices into TCAG, 4 for any other character"""
+    data = numpy.frombuffer(str(dna).encode("ascii", "replace"), dtype=numpy.uint8)
+    return _nt_to_index[data]
+
+
+class CodonTranslator:
+    """translates codons represented as indices on a nucleic acid alphabet
+
+    Codons are looked up by code, (i * n + j) * n + k for the indices i, j, k
+    of the codon positions. n is the alphabet length plus one, the extra
+    index representing any character not in the alphabet. Codes are resolved
+    the first time they are encountered.
+    """
+
+    def __init__(self, gc, alphabet, codon_alphabet, protein, incomplete_ok):
+        self._gc = gc
+        self._codon_alphabet = codon_alphabet
+        self._protein = protein
+        self._incomplete_ok = incomplete_ok
+        # NUL is never a valid character, so stands in for unknown ones
+        self._chars = list(alphabet) + ["\0"]
+        self._base = n = len(self._chars)
+        self._char_to_index = numpy.full(129, n - 1, dtype=numpy.int32)
+        for i, char in enumerate(alphabet):
+            self._char_to_index[ord(char)] = i
+        self._aa = numpy.full(n ** 3, "", dtype="U1")
+        self._resolved = numpy.zeros(n ** 3, dtype=bool)
+        self._failed = numpy.zeros(n ** 3, dtype=bool)
+        self._errors = {}
+
+    def encode(self, seq):
+        """returns codon codes for str seq, a trailing partial codon is
+        ignored"""
+        data = numpy.frombuffer(seq.encode("utf-32-le"), dtype=numpy.uint32)
+        return self.codon_codes(self._char_to_index[numpy.minimum(data, 128)])
+
+    def codon_codes(self, indices):
+        """returns codon codes from alphabet indices along the last axis"""
+        n = self._base
+        num_codons = indices.shape[-1] // 3
+        shape = indices.shape[:-1] + (num_codons, 3)
+        codons = indices[..., : num_codons * 3].reshape(shape).astype(numpy.int32)
+        return (codons[..., 0] * n + codons[..., 1]) * n + codons[..., 2]
+
+    def translate(self, codes):
+        """returns the amino acids for codes and a mask of failed codes"""
+        todo = ~self._resolved[codes]
+        if todo.any():
+            for code in numpy.unique(codes[todo]):
+                self._resolve(code)
+        return self._aa[codes], self._failed[codes]
+
+    def error(self, code, codon, name):
+        """returns the exception for a failed code"""
+        exc_class, template = self._errors[code]
+        return exc_class(template.format(codon=codon, name=name))
+
+    def _fail(self, code, exc_class, template):
+        self._errors[code] = exc_class, template
+        self._failed[code] = True
+        self._resolved[code] = True
+
+    def _resolve(self, code):
+        """applies the per codon translation rules to code"""
+        n = self._base
+        indices = code // n ** 2, code // n % n, code % n
+        orig_codon = "".join(self._chars[i] for i in indices)
+        try:
+            resolved = self._codon_alphabet.resolve_ambiguity(orig_codon)
+        except AlphabetError:
+            if not self._incomplete_ok or "-" not in orig_codon:
+                self._fail(code, AlphabetError, "{codon}")
+                return
+            resolved = (orig_codon,)
+        trans = []
+        for codon in resolved:
+            if codon == "---":
+                aa = "-"
+            elif "-" in codon:
+                aa = "?"
+                if not self._incomplete_ok:
+                    template = f"incomplete codon {codon} in {{name}}"
+                    self._fail(code, AlphabetError, template)
+                    return
+            else:
+                aa = self._gc[codon]
+                if aa == "*":
+                    continue
+            trans.append(aa)
+        if not trans:
+            self._fail(code, ValueError, "{codon}")
+            return
+        self._aa[code] = self._protein.what_ambiguity(trans)
+        self._resolved[code] = True
+
 
 class GeneticCode:
     """Holds codon to amino acid mapping, and vice versa.
@@ -126,6 +235,45 @@ class GeneticCode:
         for aa, codons in list(self.synonyms.items()):
             ac[aa] = list(map(_simple_rc, codons))
         self.anticodons = ac
+        # lookup of amino acid byte values indexed by 25 * i + 5 * j + k for
+        # the base indices of a codon, 'X' for any codon that's not ACGT
+        table = numpy.full(125, ord("X"), dtype=numpy.uint8)
+        for codon, aa in codon_lookup.items():
+            i, j, k = (_bases.index(b) for b in codon)
+            table[25 * i + 5 * j + k] = ord(aa)
+        self._codon_table = table
+        # codon translators, keyed by alphabet, see get_codon_translator
+        self._translators = {}
+
+    def get_codon_translator(self, moltype, incomplete_ok=False):
+        """returns a CodonTranslator for sequences of a nucleic acid moltype
+
+        Parameters
+        ----------
+        moltype
+            DNA or RNA MolType, codons are indexed on its degenerate gapped
+            alphabet
+        incomplete_ok : bool
+            codons that are mixes of nucleotide and gaps translate to '?',
+            otherwise they fail
+
+        Notes
+        -----
+        Translators are cached on self.
+        """
+        from cogent3.core.moltype import PROTEIN, CodonAlphabet
+
+        alphabet = moltype.alphabets.degen_gapped
+        key = tuple(alphabet), incomplete_ok
+        if key not in self._translators:
+            self._translators[key] = CodonTranslator(
+                self,
+                alphabet,
+                CodonAlphabet(self).with_gap_motif(),
+                PROTEIN,
+                incomplete_ok,
+            )
+        return self._translators[key]
 
     def _analyze_quartet(self, codons, aa):
         """Analyzes a quartet of codons and amino acids: returns list of lists.
@@ -274,7 +422,15 @@ class GeneticCode:
             return ""
         if start + 1 > len(dna):
             raise ValueError("Translation starts after end of RNA")
-        return "".join([self[dna[i : i + 3]] for i in range(start, len(dna) - 2, 3)])
+        return self._translate_indices(_nt_indices(dna))[start::3].decode("ascii")
+
+    def _translate_indices(self, indices):
+        """returns amino acid bytes for the codon starting at every position
+        of an array of TCAG indices"""
+        codes = 25 * indices[:-2].astype(numpy.int16)
+        codes += 5 * indices[1:-1]
+        codes += indices[2:]
+        return self._codon_table[codes].tobytes()
 
     def get_stop_indices(self, dna, start=0):
         """returns indexes for stop codons in the specified frame"""
@@ -288,10 +444,47 @@ class GeneticCode:
 
     def sixframes(self, dna):
         """Returns six-frame translation as dict containing {frame:translation}"""
-        reverse = dna.rc()
-        return [self.translate(dna, start) for start in range(3)] + [
-            self.translate(reverse, start) for start in range(3)
-        ]
+        if 0 < len(dna) < 3:
+            raise ValueError("Translation starts after end of RNA")
+        forward = _nt_indices(dna)
+        reverse = _complement_index[forward[::-1]]
+        translations = []
+        for indices in (forward, reverse):
+            aa = self._translate_indices(indices).decode("ascii")
+            translations.extend(aa[start::3] for start in range(3))
+        return translations
+
+    def sixframes_many(self, seqs):
+        """Returns the six-frame translation of each of seqs
+
+        Notes
+        -----
+        The sequences are concatenated and translated with a single lookup,
+        which is much faster than calling sixframes on each sequence.
+        Unlike sixframes, sequences shorter than a codon give empty frames
+        rather than raising a ValueError.
+        """
+        seqs = [str(seq) for seq in seqs]
+        lengths = [len(seq) for seq in seqs]
+        # two spacer characters keep codons from spanning sequences
+        forward = _nt_indices("NN".join(seqs))
+        reverse = _complement_index[forward[::-1]]
+        forward = self._translate_indices(forward).decode("ascii")
+        reverse = self._translate_indices(reverse).decode("ascii")
+        total = len(forward) + 2
+        translations = []
+        offset = 0
+        for length in lengths:
+            rc_offset = total - offset - length
+            frames = []
+            for aa, begin in ((forward, offset), (reverse, rc_offset)):
+                for start in range(3):
+                    num_codons = max(0, (length - start) // 3)
+                    begin_ = begin + start
+                    frames.append(aa[begin_ : begin_ + 3 * num_codons : 3])
+            translations.append(frames)
+            offset += length + 2
+        return translations
 
     def is_start(self, codon):
         """Returns True if codon is a start codon, False otherwise."""
@@ -43,6 +43,8 @@ from bisect import bisect_left, bisect_right
 from functools import total_ordering
 from itertools import chain
 
+import numpy
+
 from cogent3.util.misc import (
     ClassChecker,
     ConstrainedList,
@@ -550,8 +552,66 @@ class TerminalPadding(_LostSpan):
         return "?%s?" % (self.length)
 
 
+# columns of the array holding a Map's spans, one row per span
+_START, _END, _LENGTH, _REVERSE, _LOST, _TERMINAL, _TIDY_START, _TIDY_END = range(8)
+_NUM_COLS = 8
+# maps with at most this many spans have attributes computed without numpy
+_SMALL_MAP = 32
+
+
+def _spans_to_rows(spans):
+    """returns the span array rows and list of span values"""
+    rows = [
+        (0, 0, s.length, 0, 1, s.terminal, 0, 0)
+        if s.lost
+        else (s.start, s.end, s.length, s.reverse, 0, 0, s.tidy_start, s.tidy_end)
+        for s in spans
+    ]
+    values = [s.value for s in spans]
+    return rows, values
+
+
+def _lost_rows(lengths):
+    """returns span array rows for lost spans of the given lengths"""
+    data = numpy.zeros((len(lengths), _NUM_COLS), dtype=numpy.int64)
+    data[:, _LENGTH] = lengths
+    data[:, _LOST] = 1
+    return data
+
+
+def _sliced_row(row, lo, hi):
+    """the span row sliced as span[lo:hi]"""
+    row = row.copy()
+    if not row[_LOST]:
+        row[_TIDY_START] = row[_TIDY_START] and lo == 0
+        row[_TIDY_END] = row[_TIDY_END] and hi == row[_LENGTH]
+        if row[_REVERSE]:
+            row[_START], row[_END] = row[_END] - hi, row[_END] - lo
+        else:
+            row[_START], row[_END] = row[_START] + lo, row[_START] + hi
+    row[_LENGTH] = hi - lo
+    return row
+
+
+def _reversed_rows(data):
+    """the span rows in reverse order, each span reversed"""
+    data = data[::-1].copy()
+    found = data[:, _LOST] == 0
+    data[found, _REVERSE] = 1 - data[found, _REVERSE]
+    data[found, _TIDY_START], data[found, _TIDY_END] = (
+        data[found, _TIDY_END],
+        data[found, _TIDY_START],
+    )
+    return data
+
+
 class Map(object):
-    """A map holds a list of spans.  """
+    """A map holds a list of spans.
+
+    The spans are stored as parallel integer arrays (start, end, length,
+    strand, lost, terminal and tidy flags), from which the Span objects in
+    Map.spans are created on demand.
+    """
 
     def __init__(
         self,
@@ -593,36 +653,132 @@ class Map(object):
                 else:
                     spans += [span]
 
-        self.offsets = []
+        if termini_unknown:
+            if spans[0].lost:
+                spans[0] = TerminalPadding(spans[0].length)
+            if spans[-1].lost:
+                spans[-1] = TerminalPadding(spans[-1].length)
+
+        rows, values = _spans_to_rows(spans)
+        self._set_values(values)
+        self._set_attrs_from_rows(rows)
+        # the span array is created when first needed
+        self._data = None
+        self._rows = rows
+        self._spans = spans
+        self.parent_length = parent_length
+
+    @classmethod
+    def _from_array(cls, data, values, parent_length):
+        """returns a new instance from a span array and span values"""
+        result = object.__new__(cls)
+        result._serialisable = dict(
+            locations=None,
+            spans=None,
+            tidy=False,
+            parent_length=parent_length,
+            termini_unknown=False,
+        )
+        result._set_span_data(data, values)
+        result._spans = None
+        result.parent_length = parent_length
+        return result
+
+    def _set_span_data(self, data, values):
+        """sets the span array and the attributes derived from it"""
+        self._data = data
+        self._set_values(values)
+        if len(data) <= _SMALL_MAP:
+            # numpy call overhead dominates for the common case of few spans
+            self._set_attrs_from_rows(data.tolist())
+        else:
+            self._set_attrs_from_array(data)
+
+    def _set_values(self, values):
+        # values are rarely set, so are only kept if one is not None
+        if values is not None and all(v is None for v in values):
+            values = None
+        self._values = values
+        self.__inverse = None
+
+    @property
+    def _span_data(self):
+        """array of spans, one row per span"""
+        if self._data is None:
+            num = len(self._rows)
+            self._data = numpy.array(self._rows, dtype=numpy.int64).reshape(
+                (num, _NUM_COLS)
+            )
+            self._rows = None
+        return self._data
+
+    def _set_attrs_from_rows(self, rows):
+        offsets = []
+        posn = 0
         self.useful = False
         self.complete = True
         self.reverse = None
-        posn = 0
-        for span in spans:
-            self.offsets.append(posn)
-            posn += span.length
-            if span.lost:
+        for row in rows:
+            offsets.append(posn)
+            posn += row[_LENGTH]
+            if row[_LOST]:
                 self.complete = False
             elif not self.useful:
                 self.useful = True
-                (self.start, self.end) = (span.start, span.end)
-                self.reverse = span.reverse
+                self.start, self.end = row[_START], row[_END]
+                self.reverse = bool(row[_REVERSE])
             else:
-                self.start = min(self.start, span.start)
-                self.end = max(self.end, span.end)
-                if self.reverse is not None and (span.reverse != self.reverse):
+                self.start = min(self.start, row[_START])
+                self.end = max(self.end, row[_END])
+                if self.reverse is not None and row[_REVERSE] != self.reverse:
                     self.reverse = None
+        self._offsets = offsets
+        self.length = posn
 
-        if termini_unknown:
-            if spans[0].lost:
-                spans[0] = TerminalPadding(spans[0].length)
-            if spans[-1].lost:
-                spans[-1] = TerminalPadding(spans[-1].length)
+    def _set_attrs_from_array(self, data):
+        lengths = data[:, _LENGTH]
+        self._offsets = numpy.concatenate(([0], lengths.cumsum()[:-1]))
+        self.length = int(lengths.sum())
+        found = data[:, _LOST] == 0
+        self.complete = bool(found.all())
+        self.useful = bool(found.any())
+        self.reverse = None
+        if self.useful:
+            self.start = int(data[found, _START].min())
+            self.end = int(data[found, _END].max())
+            strands = data[found, _REVERSE]
+            if (strands == strands[0]).all():
+                self.reverse = bool(strands[0])
+
+    def _span_values(self):
+        return self._values or [None] * len(self._offsets)
+
+    @property
+    def spans(self):
+        if self._spans is None:
+            spans = []
+            rows = self._span_data.tolist()
+            for row, value in zip(rows, self._span_values()):
+                if row[_LOST]:
+                    klass = TerminalPadding if row[_TERMINAL] else LostSpan
+                    span = klass(row[_LENGTH], value)
+                else:
+                    span = Span(
+                        row[_START],
+                        row[_END],
+                        bool(row[_TIDY_START]),
+                        bool(row[_TIDY_END]),
+                        value,
+                        reverse=bool(row[_REVERSE]),
+                    )
+                spans.append(span)
+            self._spans = spans
+        return self._spans
 
-        self.spans = spans
-        self.length = posn
-        self.parent_length = parent_length
-        self.__inverse = None
+    @property
+    def offsets(self):
+        offsets = self._offsets
+        return offsets if type(offsets) == list else offsets.tolist()
 
     def __len__(self):
         return self.length
@@ -633,10 +789,79 @@ class Map(object):
     def __getitem__(self, slice):
         # A possible shorter map at the same level
         slice = as_map(slice, len(self))
-        new_parts = []
-        for span in slice.spans:
-            new_parts.extend(span.remap_with(self))
-        return Map(spans=new_parts, parent_length=self.parent_length)
+        if len(self._offsets) <= _SMALL_MAP:
+            # creating few Span instances is cheaper than the array operations
+            new_parts = []
+            for span in slice.spans:
+                new_parts.extend(span.remap_with(self))
+            return Map(spans=new_parts, parent_length=self.parent_length)
+
+        parts = []
+        values = []
+        for row, value in zip(slice._span_data, slice._span_values()):
+            part, part_values = self._remapped_row(row, value)
+            parts.append(part)
+            values.append(part_values or [None] * len(part))
+        if any(v is not None for part_values in values for v in part_values):
+            values = [v for part_values in values for v in part_values]
+        else:
+            values = None
+        data = numpy.concatenate(parts)
+        return Map._from_array(data, values, self.parent_length)
+
+    def _remapped_row(self, row, value):
+        """the span rows on self's parent covered by a span of self, see
+        Span.remap_with"""
+        if row[_LOST]:
+            return row[None, :], [value]
+
+        start, end = int(row[_START]), int(row[_END])
+        data = self._span_data
+        offsets = numpy.asarray(self._offsets)
+        map_length = self.length
+
+        # don't try to remap any non-corresponding end region(s)
+        zlo, zhi = max(0, start), min(map_length, end)
+        first = max(int(offsets.searchsorted(zlo, "right")) - 1, 0)
+        last = int(offsets[first:].searchsorted(zhi, "left")) + first - 1
+        result = data[first : last + 1].copy()
+        values = self._values and self._values[first : last + 1]
+
+        # cut off something at either end to get the same position and
+        # length as row
+        if len(result):
+            end_trim = offsets[last] + result[-1, _LENGTH] - zhi
+            start_trim = zlo - offsets[first]
+            if end_trim > 0:
+                result[-1] = _sliced_row(result[-1], 0, result[-1, _LENGTH] - end_trim)
+            if start_trim > 0:
+                result[0] = _sliced_row(result[0], start_trim, result[0, _LENGTH])
+
+        # add a lost part at either end if the span did not lie entirely
+        # within self
+        if start < 0:
+            result = numpy.concatenate((_lost_rows([-start]), result))
+            values = values and [None] + values
+        if end > map_length:
+            result = numpy.concatenate((result, _lost_rows([end - map_length])))
+            values = values and values + [None]
+
+        # if the ends of the span are meaningful then so are the new ends,
+        # but not any new internal breaks.
+        if len(result):
+            if row[_TIDY_START]:
+                result[0, _TIDY_START] = 1
+            if row[_TIDY_END]:
+                result[-1, _TIDY_END] = 1
+
+        if row[_REVERSE]:
+            result = _reversed_rows(result)
+            values = values and values[::-1]
+
+        if value is not None:
+            values = [value] * len(result)
+
+        return result, values
 
     def __mul__(self, scale):
         # For Protein -> DNA
@@ -655,7 +880,9 @@ class Map(object):
     def __add__(self, other):
         if other.parent_length != self.parent_length:
             raise ValueError("Those maps belong to different sequences")
-        return Map(spans=self.spans + other.spans, parent_length=self.parent_length)
+        data = numpy.concatenate((self._span_data, other._span_data))
+        values = self._span_values() + other._span_values()
+        return Map._from_array(data, values, self.parent_length)
 
     def with_termini_unknown(self):
         return Map(
@@ -704,43 +931,46 @@ class Map(object):
 
     def reversed(self):
         """Reversed location on same parent"""
-        spans = [s.reversed() for s in self.spans]
-        spans.reverse()
-        return Map(spans=spans, parent_length=self.parent_length)
+        data = _reversed_rows(self._span_data)
+        values = self._span_values()[::-1]
+        return Map._from_array(data, values, self.parent_length)
 
     def nucleic_reversed(self):
         """Same location on reversed parent"""
-        spans = [s.reversed_relative_to(self.parent_length) for s in self.spans]
-        return Map(spans=spans, parent_length=self.parent_length)
+        data = self._span_data.copy()
+        found = data[:, _LOST] == 0
+        start = self.parent_length - data[found, _END]
+        assert (start >= 0).all()
+        data[found, _START] = start
+        data[found, _END] = start + data[found, _LENGTH]
+        data[found, _REVERSE] = 1 - data[found, _REVERSE]
+        data[found, _TIDY_START] = 0
+        data[found, _TIDY_END] = 0
+        return Map._from_array(data, self._values, self.parent_length)
+
+    def _located(self, lost):
+        """aligned coordinates of the lost, or not lost, spans"""
+        data = self._span_data
+        selected = (data[:, _LOST] == 1) == lost
+        starts = numpy.asarray(self._offsets, dtype=numpy.int64)[selected]
+        ends = starts + data[selected, _LENGTH]
+        return list(zip(starts.tolist(), ends.tolist()))
 
     def gaps(self):
         """The gaps (lost spans) in this map"""
-        locations = []
-        offset = 0
-        for s in self.spans:
-            if s.lost:
-                locations.append((offset, offset + s.length))
-            offset += s.length
-        return Map(locations, parent_length=len(self))
+        return Map(self._located(True), parent_length=len(self))
 
     def shadow(self):
         """The 'negative' map of the spans not included in this map"""
         return self.inverse().gaps()
 
     def nongap(self):
-        locations = []
-        offset = 0
-        for s in self.spans:
-            if not s.lost:
-                locations.append((offset, offset + s.length))
-            offset += s.length
-        return Map(locations, parent_length=len(self))
+        return Map(self._located(False), parent_length=len(self))
 
     def without_gaps(self):
-        return Map(
-            spans=[s for s in self.spans if not s.lost],
-            parent_length=self.parent_length,
-        )
+        found = self._span_data[:, _LOST] == 0
+        values = [v for v, f in zip(self._span_values(), found) if f]
+        return Map._from_array(self._span_data[found], values, self.parent_length)
 
     def inverse(self):
         if self.__inverse is None:
@@ -752,46 +982,55 @@ class Map(object):
         # tidy ends don't survive inversion
         if self.parent_length is None:
             raise ValueError("Uninvertable. parent length not known")
-        posn = 0
-        temp = []
-        for span in self.spans:
-            if not span.lost:
-                if span.reverse:
-                    temp.append((span.start, span.end, posn + span.length, posn))
-                else:
-                    temp.append((span.start, span.end, posn, posn + span.length))
-            posn += span.length
-
-        temp.sort()
-        new_spans = []
-        last_hi = 0
-        for (lo, hi, start, end) in temp:
-            if lo > last_hi:
-                new_spans.append(LostSpan(lo - last_hi))
-            elif lo < last_hi:
-                raise ValueError("Uninvertable. Overlap: %s < %s" % (lo, last_hi))
-            new_spans.append(Span(start, end, reverse=start > end))
-            last_hi = hi
-        if self.parent_length > last_hi:
-            new_spans.append(LostSpan(self.parent_length - last_hi))
-        return Map(spans=new_spans, parent_length=len(self))
+        data = self._span_data
+        found = data[:, _LOST] == 0
+        lo = data[found, _START]
+        hi = data[found, _END]
+        posn = numpy.asarray(self._offsets, dtype=numpy.int64)[found]
+        lengths = data[found, _LENGTH]
+        reverse = data[found, _REVERSE] == 1
+        start = numpy.where(reverse, posn + lengths, posn)
+        end = numpy.where(reverse, posn, posn + lengths)
+
+        order = numpy.lexsort((end, start, hi, lo))
+        lo, hi, start, end = lo[order], hi[order], start[order], end[order]
+        last_hi = numpy.concatenate(([0], hi[:-1]))
+        overlaps = lo < last_hi
+        if overlaps.any():
+            i = overlaps.argmax()
+            raise ValueError("Uninvertable. Overlap: %s < %s" % (lo[i], last_hi[i]))
+
+        # a lost span precedes each span not abutting the one before
+        has_gap = lo > last_hi
+        num = len(lo)
+        span_index = numpy.arange(num) + has_gap.cumsum()
+        end_gap = self.parent_length - (hi[-1] if num else 0)
+        total = num + int(has_gap.sum()) + int(end_gap > 0)
+        new = numpy.zeros((total, _NUM_COLS), dtype=numpy.int64)
+        gap_index = span_index[has_gap] - 1
+        new[gap_index, _LENGTH] = (lo - last_hi)[has_gap]
+        new[gap_index, _LOST] = 1
+        new[span_index, _START] = numpy.minimum(start, end)
+        new[span_index, _END] = numpy.maximum(start, end)
+        new[span_index, _LENGTH] = numpy.abs(end - start)
+        new[span_index, _REVERSE] = start > end
+        if end_gap > 0:
+            new[-1, _LENGTH] = end_gap
+            new[-1, _LOST] = 1
+        return Map._from_array(new, None, len(self))
 
     def get_coordinates(self):
         """returns span coordinates as [(v1, v2), ...]
 
         v1/v2 are (start, end) unless the map is reversed, in which case it will
         be (end, start)"""
-
+        data = self._span_data
+        found = data[:, _LOST] == 0
+        starts = data[found, _START].tolist()
+        ends = data[found, _END].tolist()
         if self.reverse:
-            order_func = lambda x: (max(x), min(x))
-        else:
-            order_func = lambda x: x
-
-        coords = list(
-            map(order_func, [(s.start, s.end) for s in self.spans if not s.lost])
-        )
-
-        return coords
+            return list(zip(ends, starts))
+        return list(zip(starts, ends))
 
     def to_rich_dict(self):
         """returns dicts for contained spans [dict(), ..]"""
@@ -813,21 +1052,213 @@ class Map(object):
         the original parent is being deliberately broken as in the
         Sequence.deepcopy(sliced=True) case.
         """
-        # todo there's probably a more efficient way to do this
-        # create the new instance
-        from cogent3.util.deserialise import deserialise_map_spans
-
-        data = self.to_rich_dict()
-        zeroed = deserialise_map_spans(data)
-        zeroed.parent_length = len(zeroed.get_covering_span())
-        min_val = min(zeroed.start, zeroed.end)
-        for span in zeroed.spans:
+        data = self._span_data.copy()
+        found = data[:, _LOST] == 0
+        data[found, _START] -= self.start
+        data[found, _END] -= self.start
+        values = self._values and self._values[:]
+        return Map._from_array(data, values, self.end - self.start)
+
+
+class GapPositions:
+    """Compact record of the gaps in an aligned sequence.
+
+    The gaps are stored as two integer arrays, the (ungapped) sequence
+    positions at which gaps are inserted and the gap lengths. Conversions
+    between aligned and sequence coordinates are binary searches on these
+    arrays.
+
+    Only maps that are a forward, contiguous segment of the parent sequence
+    with gaps inserted can be represented.
+    """
+
+    __slots__ = ("gap_pos", "gap_lengths", "start", "seq_length", "parent_length")
+
+    def __init__(self, gap_pos, gap_lengths, seq_length, start=0, parent_length=None):
+        """
+        Parameters
+        ----------
+        gap_pos
+            positions in the ungapped sequence where gaps are inserted,
+            sorted and unique. A gap at position i precedes the i'th residue.
+        gap_lengths
+            length of each gap
+        seq_length
+            length of the ungapped sequence segment
+        start
+            position of the segment on the parent sequence
+        parent_length
+            length of the parent sequence, defaults to start + seq_length
+        """
+        self.gap_pos = numpy.array(gap_pos, dtype=int)
+        self.gap_lengths = numpy.array(gap_lengths, dtype=int)
+        if self.gap_pos.shape != self.gap_lengths.shape:
+            raise ValueError("gap_pos and gap_lengths must have the same length")
+        self.seq_length = int(seq_length)
+        self.start = int(start)
+        if parent_length is None:
+            parent_length = self.start + self.seq_length
+        self.parent_length = int(parent_length)
+
+    def __repr__(self):
+        gaps = list(zip(self.gap_pos.tolist(), self.gap_lengths.tolist()))
+        return f"{self.__class__.__name__}(gaps={gaps}, seq_length={self.seq_length})"
+
+    def __len__(self):
+        """length in aligned coordinates"""
+        return self.seq_length + int(self.gap_lengths.sum())
+
+    @classmethod
+    def from_map(cls, map):
+        """returns instance equivalent to a Map from aligned to sequence
+        coordinates, raises ValueError if the map cannot be represented"""
+        gap_pos = []
+        gap_lengths = []
+        start = None
+        seq_length = 0
+        for span in map.spans:
             if span.lost:
+                if span.terminal:
+                    raise ValueError("terminal padding cannot be represented")
+                if gap_pos and gap_pos[-1] == seq_length:
+                    gap_lengths[-1] += span.length
+                elif span.length:
+                    gap_pos.append(seq_length)
+                    gap_lengths.append(span.length)
                 continue
-            span.start -= min_val
-            span.end -= min_val
 
-        return zeroed
+            if span.reverse:
+                raise ValueError("reversed spans cannot be represented")
+
+            if start is None:
+                start = span.start
+            elif span.start != start + seq_length:
+                raise ValueError("discontiguous spans cannot be represented")
+            seq_length += span.length
+
+        return cls(
+            gap_pos,
+            gap_lengths,
+            seq_length,
+            start=start or 0,
+            parent_length=map.parent_length,
+        )
+
+    @classmethod
+    def from_gapped_seq(cls, seq, gap="-"):
+        """returns instance and the ungapped sequence string
+
+        Parameters
+        ----------
+        seq : str
+            the gapped sequence
+        gap : str
+            the gap character
+        """
+        seq = str(seq)
+        chars = numpy.array([seq]).view("U1") if seq else numpy.array([], "U1")
+        is_gap = (chars == gap).astype(numpy.int8)
+        # gap runs start where is_gap steps up, and end where it steps down
+        steps = numpy.diff(numpy.concatenate(([0], is_gap, [0])))
+        run_starts = numpy.flatnonzero(steps == 1)
+        gap_lengths = numpy.flatnonzero(steps == -1) - run_starts
+        preceding = numpy.concatenate(([0], gap_lengths.cumsum()[:-1]))
+        gap_pos = run_starts - preceding
+        ungapped = seq.replace(gap, "")
+        return cls(gap_pos, gap_lengths, len(ungapped)), ungapped
+
+    def to_map(self):
+        """returns the Map from aligned to sequence coordinates"""
+        spans = []
+        prev = 0
+        offset = self.start
+        for pos, length in zip(self.gap_pos.tolist(), self.gap_lengths.tolist()):
+            if pos > prev:
+                spans.append(Span(offset + prev, offset + pos))
+            spans.append(LostSpan(length))
+            prev = pos
+        if self.seq_length > prev:
+            spans.append(Span(offset + prev, offset + self.seq_length))
+        return Map(spans=spans, parent_length=self.parent_length)
+
+    def _cumulative_lengths(self):
+        return numpy.concatenate(([0], self.gap_lengths.cumsum()))
+
+    def seq_to_aligned(self, positions):
+        """returns aligned coordinates of sequence positions
+
+        Parameters
+        ----------
+        positions
+            int or series of ints, positions in the ungapped segment
+        """
+        positions = numpy.asarray(positions)
+        index = numpy.searchsorted(self.gap_pos, positions, side="right")
+        return positions + self._cumulative_lengths()[index]
+
+    def aligned_to_seq(self, positions):
+        """returns sequence coordinates of aligned positions
+
+        Parameters
+        ----------
+        positions
+            int or series of ints, aligned positions
+
+        Notes
+        -----
+        An aligned position within a gap maps to the sequence position
+        following the gap.
+        """
+        positions = numpy.asarray(positions)
+        cumulative = self._cumulative_lengths()
+        # aligned coordinates of the first position of each gap
+        gap_starts = self.gap_pos + cumulative[:-1]
+        index = numpy.searchsorted(gap_starts, positions, side="right") - 1
+        valid = index >= 0
+        index = numpy.where(valid, index, 0)
+        within = numpy.clip(
+            positions - gap_starts.take(index, mode="clip"),
+            0,
+            self.gap_lengths.take(index, mode="clip"),
+        )
+        gapped = numpy.where(valid, cumulative[index] + within, 0)
+        return positions - gapped
+
+    def gap_mask(self):
+        """returns bool array of aligned length, True where gapped"""
+        mask = numpy.zeros(len(self), dtype=bool)
+        starts = self.gap_pos + self._cumulative_lengths()[:-1]
+        indices = numpy.repeat(starts, self.gap_lengths) + _run_offsets(
+            self.gap_lengths
+        )
+        mask[indices] = True
+        return mask
+
+    def gapped(self, seq, gap="-"):
+        """returns seq with the gaps inserted
+
+        Parameters
+        ----------
+        seq : str
+            the ungapped sequence segment, must have length seq_length
+        gap : str
+            the gap character
+        """
+        seq = str(seq)
+        if len(seq) != self.seq_length:
+            raise ValueError(f"length {len(seq)} != {self.seq_length}")
+        if not len(self.gap_pos):
+            return seq
+        chars = numpy.array([seq]).view("U1") if seq else numpy.array([], "U1")
+        chars = numpy.insert(chars, numpy.repeat(self.gap_pos, self.gap_lengths), gap)
+        return chars.view(f"U{len(chars)}")[0]
+
+
+def _run_offsets(lengths):
+    """returns concatenated aranges of each length, e.g. [2, 3] -> [0, 1, 0, 1, 2]"""
+    total = lengths.sum()
+    starts = numpy.repeat(numpy.concatenate(([0], lengths.cumsum()[:-1])), lengths)
+    return numpy.arange(total) - starts
 
 
 class SpansOnly(ConstrainedList):
@@ -30,7 +30,8 @@ class _MotifNumberArray(DictArray):
         # todo validate that motifs are strings and row_indices are ints or
         # strings
         # todo change row_indices argument name to row_keys
-        some_data = data.any() if isinstance(data, numpy.ndarray) else any(data)
+        # an array of zeros is valid, e.g. counts when no motif was observed
+        some_data = data.size if isinstance(data, numpy.ndarray) else any(data)
         if not some_data or len(data) == 0:
             raise ValueError("Must provide data")
 
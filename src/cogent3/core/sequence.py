@@ -24,20 +24,31 @@ from random import shuffle
 from numpy import (
     arange,
     array,
+    asarray,
+    ascontiguousarray,
+    bincount,
     compress,
+    frombuffer,
+    full,
+    int32,
+    int64,
     logical_not,
     logical_or,
+    minimum,
     nonzero,
     put,
     ravel,
     take,
+    uint8,
+    uint32,
+    uint64,
+    unique,
     zeros,
 )
 from numpy.random import permutation
 
 import cogent3
 
-from cogent3.core.alphabet import AlphabetError
 from cogent3.core.genetic_code import get_code
 from cogent3.core.info import Info as InfoClass
 from cogent3.format.fasta import alignment_to_fasta
@@ -82,6 +93,156 @@ ARRAY_TYPE = type(array(1))
 frac_same = for_seq(f=eq, aggregator=sum, normalizer=per_shortest)
 frac_diff = for_seq(f=ne, aggregator=sum, normalizer=per_shortest)
 
+# k-mer counts with more possible k-mers than this are returned as dicts
+_MAX_DENSE_KMERS = 4 ** 8
+
+
+def _kmer_alphabet(moltype, include_ambiguity):
+    """the alphabet k-mers are defined on"""
+    alphabets = getattr(moltype, "alphabets", None)
+    if include_ambiguity and alphabets is not None:
+        return alphabets.degen
+    return moltype.alphabet
+
+
+class _KmerCounter:
+    """counts the k-mers in sequences represented as strings or as indices
+
+    k-mers are identified by their word code, sum(i_j * n**(k - j - 1)) for
+    the alphabet indices i_j of the k-mer and alphabet length n. If there
+    are at most _MAX_DENSE_KMERS possible k-mers, counts are an array indexed
+    by code. Otherwise, the observed k-mers are counted as rows of indices.
+    """
+
+    def __init__(self, alphabet, k, step=1):
+        if k < 1 or step < 1:
+            raise ValueError(f"k={k} and step={step} must be positive")
+        self._alphabet = alphabet
+        self.k = k
+        self.step = step
+        self._base = n = len(alphabet)
+        self.dense = n ** k <= _MAX_DENSE_KMERS
+        # indices >= n flag characters not in the alphabet
+        self._char_to_index = full(129, n, dtype=int32)
+        for i, char in enumerate(alphabet):
+            if ord(char) < 128:
+                self._char_to_index[ord(char)] = i
+
+    @property
+    def motifs(self):
+        """all k-mers, in code order"""
+        motifs = [""]
+        for _ in range(self.k):
+            motifs = [m + c for m in motifs for c in self._alphabet]
+        return motifs
+
+    def encode(self, seq):
+        """returns alphabet indices for str seq"""
+        data = frombuffer(seq.encode("utf-32-le"), dtype=uint32)
+        return self._char_to_index[minimum(data, 128)]
+
+    def recoder(self, alphabet):
+        """returns array mapping indices on alphabet to indices on self's
+        alphabet"""
+        lookup = {c: i for i, c in enumerate(self._alphabet)}
+        return array([lookup.get(c, self._base) for c in alphabet], dtype=int32)
+
+    def _kmer_starts(self, indices):
+        """start positions of k-mers composed only of alphabet elements"""
+        k = self.k
+        num = len(indices) - k + 1
+        if num < 1:
+            return arange(0)
+        invalid = zeros(len(indices) + 1, dtype=int32)
+        invalid[1:] = (indices >= self._base).cumsum()
+        starts = arange(0, num, self.step)
+        return starts[invalid[starts + k] == invalid[starts]]
+
+    def _word_codes(self, indices, dtype=int64):
+        """codes of the k-mers starting at every position"""
+        num = max(len(indices) - self.k + 1, 0)
+        indices = indices.astype(dtype)
+        codes = zeros(num, dtype=dtype)
+        base = codes.dtype.type(self._base)
+        for j in range(self.k):
+            codes *= base
+            codes += indices[j : j + num]
+        return codes
+
+    def kmer_codes(self, indices):
+        """returns the uint64 codes of k-mers composed only of alphabet
+        elements, in order of occurrence
+
+        Notes
+        -----
+        Codes wrap around if there are 2**64 or more possible k-mers, so are
+        then hashes of the k-mers.
+        """
+        indices = asarray(indices)
+        starts = self._kmer_starts(indices)
+        return self._word_codes(indices, dtype=uint64)[starts]
+
+    def count_indices(self, indices):
+        """counts k-mers in an array of alphabet indices
+
+        Returns
+        -------
+        counts per k-mer code if self.dense, otherwise a CategoryCounter
+        """
+        indices = asarray(indices)
+        starts = self._kmer_starts(indices)
+        num_kmers = self._base ** self.k
+        chars = array([ord(c) for c in self._alphabet], dtype=uint8)
+        if num_kmers < 2 ** 63:
+            codes = self._word_codes(indices)[starts]
+            if self.dense:
+                return bincount(codes, minlength=num_kmers)
+            codes, counts = unique(codes, return_counts=True)
+            # convert codes back to characters, last position first
+            words = zeros((len(codes), self.k), dtype=uint8)
+            for j in range(self.k - 1, -1, -1):
+                words[:, j] = chars[codes % self._base]
+                codes //= self._base
+        else:
+            words = indices[starts[:, None] + arange(self.k)].astype(uint8)
+            words, counts = unique(
+                ascontiguousarray(words).view(f"V{self.k}"), return_counts=True
+            )
+            words = chars[words.view(uint8).reshape((-1, self.k))]
+
+        words = words.view(f"S{self.k}").ravel()
+        return CategoryCounter.from_counts(
+            zip(words.astype(f"U{self.k}").tolist(), counts.tolist())
+        )
+
+    def __call__(self, seq):
+        """counts k-mers in str seq"""
+        return self.count_indices(self.encode(seq))
+
+
+def get_kmer_counter(moltype, k, step=1, include_ambiguity=False):
+    """returns a k-mer counter for sequences of moltype
+
+    Parameters
+    ----------
+    moltype
+        MolType instance
+    k
+        number of characters per k-mer
+    step
+        distance between the starts of successive k-mers
+    include_ambiguity
+        if True, k-mers are defined on the degenerate alphabet of moltype
+
+    Notes
+    -----
+    Calling the counter with a str returns the k-mer counts, as an array
+    indexed by k-mer code if the counter is dense, otherwise as a
+    CategoryCounter.
+    """
+    alphabet = _kmer_alphabet(moltype, include_ambiguity)
+    return _KmerCounter(alphabet, k, step=step)
+
 
 @total_ordering
 class SequenceI(object):
@@ -236,6 +397,40 @@ class SequenceI(object):
 
         return counts
 
+    def kmer_counts(self, k, step=1, include_ambiguity=False):
+        """returns counts of k-mers
+
+        Parameters
+        ----------
+        k
+            number of characters per k-mer
+        step
+            distance between successive k-mer start positions. The default
+            counts all overlapping k-mers, step=k counts non-overlapping ones.
+        include_ambiguity
+            if True, k-mers containing ambiguous characters from the seq
+            moltype are included. No expansion of those is attempted.
+
+        Returns
+        -------
+        MotifCountsArray of all possible k-mers if there are at most
+        4**8 of them, otherwise a CategoryCounter of the observed k-mers
+
+        Notes
+        -----
+        k-mers containing gaps, or characters not in the moltype, are
+        excluded.
+        """
+        from cogent3.core.profile import MotifCountsArray
+
+        counter = get_kmer_counter(
+            self.moltype, k, step=step, include_ambiguity=include_ambiguity
+        )
+        counts = counter(str(self))
+        if counter.dense:
+            counts = MotifCountsArray(counts, counter.motifs)
+        return counts
+
     def __lt__(self, other):
         """compares based on the sequence string."""
         return self._seq < str(other)
@@ -1302,34 +1497,13 @@ class NucleicAcidSequence(Sequence):
         sequence of PROTEIN moltype
         """
         gc = get_code(gc)
-        codon_alphabet = self.codon_alphabet(gc).with_gap_motif()
-        # translate the codons
-        translation = []
-        for posn in range(0, len(self._seq) - 2, 3):
-            orig_codon = self._seq[posn : posn + 3]
-            try:
-                resolved = codon_alphabet.resolve_ambiguity(orig_codon)
-            except AlphabetError:
-                if not incomplete_ok or "-" not in orig_codon:
-                    raise
-                resolved = (orig_codon,)
-            trans = []
-            for codon in resolved:
-                if codon == "---":
-                    aa = "-"
-                elif "-" in codon:
-                    aa = "?"
-                    if not incomplete_ok:
-                        raise AlphabetError(f"incomplete codon {codon} in {self.name}")
-                else:
-                    aa = gc[codon]
-                    if aa == "*":
-                        continue
-                trans.append(aa)
-            if not trans:
-                raise ValueError(orig_codon)
-            aa = self.protein.what_ambiguity(trans)
-            translation.append(aa)
+        translator = gc.get_codon_translator(self.moltype, incomplete_ok)
+        codes = translator.encode(str(self._seq))
+        translation, failed = translator.translate(codes)
+        if failed.any():
+            posn = failed.argmax()
+            codon = self._seq[posn * 3 : posn * 3 + 3]
+            raise translator.error(codes[posn], codon, self.name)
 
         translation = self.protein.make_seq(seq="".join(translation), name=self.name)
 
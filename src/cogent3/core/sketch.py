@@ -0,0 +1,180 @@
+"""MinHash sketches for estimating the similarity of sequences from their
+k-mers, without comparing the sequences themselves."""
+
+from collections import defaultdict
+from functools import lru_cache
+
+import numpy
+
+from cogent3.util.dict_array import DictArrayTemplate
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.7.2a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "Gavin.Huttley@anu.edu.au"
+__status__ = "Production"
+
+# number of k-mers hashed at once, bounds memory use for long sequences
+_CHUNK_SIZE = 2 ** 14
+# maximum number of elements compared at once when estimating similarities
+_BLOCK_SIZE = 2 ** 24
+_EMPTY = numpy.iinfo(numpy.uint32).max
+
+
+def _mix(codes):
+    """returns well distributed uint64 values for codes, the splitmix64
+    finaliser"""
+    codes = codes ^ (codes >> numpy.uint64(30))
+    codes *= numpy.uint64(0xBF58476D1CE4E5B9)
+    codes ^= codes >> numpy.uint64(27)
+    codes *= numpy.uint64(0x94D049BB133111EB)
+    codes ^= codes >> numpy.uint64(31)
+    return codes
+
+
+@lru_cache(maxsize=16)
+def _hash_params(n_hashes, seed):
+    """returns odd multipliers and increments for n_hashes multiply-shift
+    hash functions"""
+    rng = numpy.random.RandomState(seed)
+    params = []
+    for _ in range(2):
+        hi, lo = rng.randint(0, 2 ** 32, size=(2, n_hashes), dtype=numpy.uint64)
+        params.append((hi << numpy.uint64(32)) | lo)
+    mult, incr = params
+    return mult | numpy.uint64(1), incr
+
+
+def min_hashes(codes, n_hashes, seed=0):
+    """returns the MinHash signature of a set of k-mers
+
+    Parameters
+    ----------
+    codes
+        uint64 k-mer codes
+    n_hashes
+        number of hash functions
+    seed
+        seeds the hash functions, signatures can only be compared if they
+        were computed with the same seed
+
+    Returns
+    -------
+    uint32 array of the minimum value of each hash function. If codes is
+    empty, all values are the maximum uint32.
+    """
+    mult, incr = _hash_params(n_hashes, seed)
+    codes = _mix(numpy.unique(numpy.asarray(codes, dtype=numpy.uint64)))
+    minima = numpy.full(n_hashes, numpy.iinfo(numpy.uint64).max, dtype=numpy.uint64)
+    for i in range(0, len(codes), _CHUNK_SIZE):
+        hashes = codes[i : i + _CHUNK_SIZE, None] * mult
+        hashes += incr
+        numpy.minimum(minima, hashes.min(axis=0), out=minima)
+    # the high bits of the product are the hash values
+    signature = (minima >> numpy.uint64(32)).astype(numpy.uint32)
+    if not len(codes):
+        signature[:] = _EMPTY
+    return signature
+
+
+class MinHashSketch:
+    """MinHash signatures of the k-mers in a collection of sequences
+
+    Attributes
+    ----------
+    names
+        sequence names
+    signatures
+        array with a row of minimum hash values per sequence
+    k
+        k-mer length
+    """
+
+    def __init__(self, names, signatures, k):
+        self.names = list(names)
+        self.signatures = numpy.asarray(signatures, dtype=numpy.uint32)
+        if self.signatures.shape[0] != len(self.names):
+            raise ValueError(
+                f"{len(self.names)} names != {self.signatures.shape[0]} signatures"
+            )
+        self.k = k
+        # sequences with no k-mers are similar to nothing
+        self._empty = (self.signatures == _EMPTY).all(axis=1)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __repr__(self):
+        n_hashes = self.signatures.shape[1]
+        return f"{self.__class__.__name__}(num_seqs={len(self)}, k={self.k}, n_hashes={n_hashes})"
+
+    def jaccard(self):
+        """returns estimated Jaccard similarities of the k-mer sets as a
+        DictArray"""
+        num, n_hashes = self.signatures.shape
+        result = numpy.empty((num, num), dtype=float)
+        block = max(_BLOCK_SIZE // max(num * n_hashes, 1), 1)
+        for i in range(0, num, block):
+            rows = self.signatures[i : i + block, None, :]
+            result[i : i + block] = (rows == self.signatures[None]).mean(axis=2)
+        result[self._empty, :] = 0
+        result[:, self._empty] = 0
+        numpy.fill_diagonal(result, 1)
+        return DictArrayTemplate(self.names, self.names).wrap(result)
+
+    def mash_distance(self):
+        """returns the Mash distance, an estimate of the per-site mutation
+        rate from the Jaccard similarity
+
+        Notes
+        -----
+        From Ondov et al. (2016) Genome Biology 17:132. Distances are 1 for
+        sequences sharing no k-mers.
+        """
+        from cogent3.evolve.fast_distance import DistanceMatrix
+
+        jaccard = self.jaccard().array
+        with numpy.errstate(divide="ignore"):
+            dists = numpy.log((1 + jaccard) / (2 * jaccard)) / self.k
+        dists = numpy.minimum(dists, 1)
+        darr = DictArrayTemplate(self.names, self.names).wrap(dists)
+        return DistanceMatrix(darr)
+
+    def candidate_pairs(self, bands):
+        """returns pairs of sequences likely to be similar, by locality
+        sensitive hashing
+
+        Parameters
+        ----------
+        bands
+            signatures are split into this many bands, sequences are
+            candidates if all hash values in any band are equal. More bands
+            detects less similar pairs.
+
+        Returns
+        -------
+        sorted list of (name1, name2) pairs, with name1 preceding name2 in
+        self.names
+        """
+        num, n_hashes = self.signatures.shape
+        if bands < 1 or n_hashes % bands:
+            raise ValueError(f"{n_hashes} hashes cannot be split into {bands} bands")
+        width = n_hashes // bands
+        keep = numpy.flatnonzero(~self._empty)
+        pairs = set()
+        for band in range(bands):
+            values = self.signatures[keep, band * width : (band + 1) * width]
+            values = numpy.ascontiguousarray(values).view(f"V{4 * width}").ravel()
+            _, groups = numpy.unique(values, return_inverse=True)
+            shared = numpy.bincount(groups)[groups] > 1
+            members = defaultdict(list)
+            for index, group in zip(keep[shared].tolist(), groups[shared].tolist()):
+                members[group].append(index)
+            for indices in members.values():
+                for i, first in enumerate(indices):
+                    pairs.update((first, second) for second in indices[i + 1 :])
+        return [(self.names[i], self.names[j]) for i, j in sorted(pairs)]
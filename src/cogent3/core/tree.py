@@ -664,6 +664,16 @@ class TreeNode(object):
 
     lca = last_common_ancestor  # for convenience
 
+    def lca_index(self):
+        """returns an index for repeated lowest common ancestor queries
+
+        Notes
+        -----
+        Queries return node indices, with names given by the ArrayTree
+        index.tree. See cogent3.core.array_tree.LCAIndex.
+        """
+        return self.to_array_tree().lca_index()
+
     # support for more advanced tree operations
 
     def separation(self, other):
@@ -844,6 +854,12 @@ class TreeNode(object):
         )
         return result
 
+    def to_array_tree(self):
+        """returns an immutable, array based, copy of self as an ArrayTree"""
+        from cogent3.core.array_tree import ArrayTree
+
+        return ArrayTree.from_tree(self)
+
     def to_json(self):
         """returns json formatted string {'newick': with edges and distances, 'edge_attributes': }"""
         return json.dumps(self.to_rich_dict())
@@ -1296,6 +1312,17 @@ class TreeNode(object):
                 new_tree = new_tree.unrooted()
             return new_tree
 
+    def subtree_extractor(self):
+        """returns an object for repeatedly extracting sub trees
+
+        Notes
+        -----
+        Each call of its get_sub_tree(names) method costs O(k log k) for k
+        names, rather than copying the whole tree. See
+        cogent3.core.array_tree.SubtreeExtractor.
+        """
+        return self.to_array_tree().subtree_extractor()
+
     def _edgecount(self, parent, cache):
         """ "The number of edges beyond 'parent' in the direction of 'self',
         unrooted"""
@@ -1685,50 +1712,20 @@ class TreeNode(object):
             return 1
         return 1 - 2 * intersection_length / float(total_subsets)
 
-    def tip_to_tip_distances(self, default_length=1):
+    def tip_to_tip_distances(self, default_length=1, condensed=False, dtype=float):
         """Returns distance matrix between all pairs of tips, and a tip order.
 
-        Warning: .__start and .__stop added to self and its descendants.
-
         tip_order contains the actual node objects, not their names (may be
-        confusing in some cases).
+        confusing in some cases). If condensed, the distance matrix is
+        returned as its upper triangle. See ArrayTree.tip_to_tip_distances.
         """
-        # linearize the tips in postorder.
-        # .__start, .__stop compose the slice in tip_order.
         tip_order = list(self.tips())
-        for i, tip in enumerate(tip_order):
-            tip.__start, tip.__stop = i, i + 1
-
-        num_tips = len(tip_order)
-        result = zeros((num_tips, num_tips), float)  # tip by tip matrix
-        # distances from tip to curr node
-        tipdistances = zeros((num_tips), float)
-
-        def update_result():
-            # set tip_tip distance between tips of different child
-            for child1, child2 in combinations(node.children, 2):
-                for tip1 in range(child1.__start, child1.__stop):
-                    for tip2 in range(child2.__start, child2.__stop):
-                        result[tip1, tip2] = tipdistances[tip1] + tipdistances[tip2]
-
-        for node in self.traverse(self_before=False, self_after=True):
-            if not node.children:
-                continue
-            # subtree with solved child wedges
-            starts, stops = [], []  # to calc ._start and ._stop for curr node
-            for child in node.children:
-                if hasattr(child, "length") and child.length is not None:
-                    child_len = child.length
-                else:
-                    child_len = default_length
-                tipdistances[child.__start : child.__stop] += child_len
-                starts.append(child.__start)
-                stops.append(child.__stop)
-            node.__start, node.__stop = min(starts), max(stops)
-            # update result if nessessary
-            if len(node.children) > 1:  # not single child
-                update_result()
-        return result + result.T, tip_order
+        if not tip_order:
+            return zeros((0, 0), dtype), tip_order
+        result = self.to_array_tree().tip_to_tip_distances(
+            default_length=default_length, condensed=condensed, dtype=dtype
+        )
+        return result, tip_order
 
     def compare_by_tip_distances(self, other, dist_f=distance_from_r):
         """Compares self to other using tip-to-tip distance matrices.
@@ -2209,68 +2206,38 @@ class PhyloNode(TreeNode):
         (root_dists, endpoint_dists) = self._get_distances(endpoints)
         return endpoint_dists
 
-    def tip_to_tip_distances(self, endpoints=None, default_length=1):
+    def tip_to_tip_distances(
+        self, endpoints=None, default_length=1, condensed=False, dtype=float
+    ):
         """Returns distance matrix between all pairs of tips, and a tip order.
 
-        Warning: .__start and .__stop added to self and its descendants.
-
         tip_order contains the actual node objects, not their names (may be
-        confusing in some cases).
+        confusing in some cases). If condensed, the distance matrix is
+        returned as its upper triangle. See ArrayTree.tip_to_tip_distances.
         """
         all_tips = self.tips()
         if endpoints is None:
             tip_order = list(all_tips)
+        elif isinstance(endpoints[0], PhyloNode):
+            tip_order = endpoints
         else:
-            if isinstance(endpoints[0], PhyloNode):
-                tip_order = endpoints
-            else:
-                tip_order = [self.get_node_matching_name(n) for n in endpoints]
-
-        # linearize all tips in postorder
-        # .__start, .__stop compose the slice in tip_order.
-        for i, node in enumerate(all_tips):
-            node.__start, node.__stop = i, i + 1
-
-        # the result map provides index in the result matrix
-        result_map = dict([(n.__start, i) for i, n in enumerate(tip_order)])
-        num_all_tips = len(all_tips)  # total number of tips
-        num_tips = len(tip_order)  # total number of tips in result
-        result = zeros((num_tips, num_tips), float)  # tip by tip matrix
-        # dist from tip to curr node
-        tipdistances = zeros((num_all_tips), float)
-
-        def update_result():
-            # set tip_tip distance between tips of different child
-            for child1, child2 in combinations(node.children, 2):
-                for tip1 in range(child1.__start, child1.__stop):
-                    if tip1 not in result_map:
-                        continue
-                    res_tip1 = result_map[tip1]
-                    for tip2 in range(child2.__start, child2.__stop):
-                        if tip2 not in result_map:
-                            continue
-                        result[res_tip1, result_map[tip2]] = (
-                            tipdistances[tip1] + tipdistances[tip2]
-                        )
-
-        for node in self.traverse(self_before=False, self_after=True):
-            if not node.children:
-                continue
-            # subtree with solved child wedges
-            starts, stops = [], []  # to calc ._start and ._stop for curr node
-            for child in node.children:
-                if hasattr(child, "length") and child.length is not None:
-                    child_len = child.length
-                else:
-                    child_len = default_length
-                tipdistances[child.__start : child.__stop] += child_len
-                starts.append(child.__start)
-                stops.append(child.__stop)
-            node.__start, node.__stop = min(starts), max(stops)
-            # update result if nessessary
-            if len(node.children) > 1:  # not single child
-                update_result()
-        return result + result.T, tip_order
+            tips = {}
+            for tip in all_tips:
+                tips.setdefault(tip.name, tip)
+            tip_order = [
+                tips[n] if n in tips else self.get_node_matching_name(n)
+                for n in endpoints
+            ]
+        if not tip_order:
+            return zeros((0, 0), dtype), tip_order
+
+        array = self.to_array_tree()
+        positions = {id(tip): i for i, tip in enumerate(all_tips)}
+        indices = array.tips()[[positions[id(n)] for n in tip_order]]
+        result = array.tip_to_tip_distances(
+            indices, default_length=default_length, condensed=condensed, dtype=dtype
+        )
+        return result, tip_order
 
     def compare_by_tip_distances(
         self, other, sample=None, dist_f=distance_from_r, shuffle_f=shuffle
@@ -2367,3 +2334,34 @@ class TreeBuilder(object):
         )
         self._known_edges[id(node)] = node
         return node
+
+
+def write_trees(trees, filename, with_distances=True, length_format=None):
+    """writes trees to filename in newick format, one tree per line
+
+    Parameters
+    ----------
+    trees
+        series of TreeNode or ArrayTree instances, which may be a generator
+    filename
+        path to write to
+    with_distances
+        whether branch lengths are included
+    length_format
+        %-style format for branch lengths, e.g. "%.6g", defaults to str()
+
+    Notes
+    -----
+    Each tree is converted to an ArrayTree and streamed to the file, so only
+    one tree is held in memory at a time.
+    """
+    from cogent3.core.array_tree import ArrayTree
+
+    with atomic_write(filename, mode="wt") as outfile:
+        for tree in trees:
+            if not isinstance(tree, ArrayTree):
+                tree = tree.to_array_tree()
+            tree.write_newick(
+                outfile, with_distances=with_distances, length_format=length_format
+            )
+            outfile.write("\n")
@@ -1,5 +1,4 @@
 from collections import defaultdict, namedtuple
-from numbers import Number
 
 import numpy
 
@@ -11,7 +10,7 @@ from cogent3.util.dict_array import DictArray
 from cogent3.util.misc import get_object_provenance
 from cogent3.util.progress_display import display_wrap
 
-from .pairwise_distance_numba import fill_diversity_matrix
+from .pairwise_distance_numba import fill_diversity_matrices
 
 
 __author__ = "Gavin Huttley, Yicheng Zhu and Ben Kaehler"
@@ -270,6 +269,169 @@ def _logdet(matrix, use_tk_adjustment=True):
     return total, p, d_xy, var
 
 
+def _with_invalid(invalid, *stats):
+    """returns float arrays of stats, with invalid elements set to nan"""
+    result = []
+    for stat in stats:
+        stat = numpy.array(stat, dtype=float64)
+        stat[invalid] = numpy.nan
+        result.append(stat)
+    return tuple(result)
+
+
+def _hamming_from_matrices(matrices):
+    """_hamming for a series of diversity matrices, invalid results are nan"""
+    total = matrices.sum(axis=(1, 2))
+    dist = total - matrices.diagonal(axis1=1, axis2=2).sum(axis=1)
+    invalid = total == 0
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        p = dist / total
+    var = numpy.full(len(matrices), numpy.nan)
+    return _with_invalid(invalid, total, p, dist, var)
+
+
+def _jc69_from_matrices(matrices):
+    """_jc69_from_matrix for a series of diversity matrices, invalid results
+    are nan"""
+    total = matrices.sum(axis=(1, 2))
+    diffs = total - matrices.diagonal(axis1=1, axis2=2).sum(axis=1)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        p = diffs / total
+        invalid = (total == 0) | (p >= 0.75)
+        factor = 1 - (4 / 3) * p
+        dist = -3.0 * log(factor) / 4
+        var = p * (1 - p) / (factor * factor * total)
+    return _with_invalid(invalid, total, p, dist, var)
+
+
+def _tn93_from_matrices(
+    matrices, freqs, pur_indices, pyr_indices, pur_coords, pyr_coords, tv_coords
+):
+    """_tn93_from_matrix for a series of diversity matrices, invalid results
+    are nan. freqs is ignored."""
+    num = len(matrices)
+    flat = matrices.reshape((num, -1))
+    total = flat.sum(axis=1)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        freqs = matrices.sum(axis=1) + matrices.sum(axis=2)
+        freqs /= 2 * total[:, None]
+
+        p = flat[:, pur_coords + pyr_coords + tv_coords].sum(axis=1) / total
+
+        freq_purs = freqs[:, pur_indices].sum(axis=1)
+        prod_purs = freqs[:, pur_indices].prod(axis=1)
+        freq_pyrs = freqs[:, pyr_indices].sum(axis=1)
+        prod_pyrs = freqs[:, pyr_indices].prod(axis=1)
+
+        pur_ts_diffs = flat[:, pur_coords].sum(axis=1) / total
+        pyr_ts_diffs = flat[:, pyr_coords].sum(axis=1) / total
+        tv_diffs = flat[:, tv_coords].sum(axis=1) / total
+
+        coeff1 = 2 * prod_purs / freq_purs
+        coeff2 = 2 * prod_pyrs / freq_pyrs
+        coeff3 = 2 * (
+            freq_purs * freq_pyrs
+            - (prod_purs * freq_pyrs / freq_purs)
+            - (prod_pyrs * freq_purs / freq_pyrs)
+        )
+
+        term1 = 1 - pur_ts_diffs / coeff1 - tv_diffs / (2 * freq_purs)
+        term2 = 1 - pyr_ts_diffs / coeff2 - tv_diffs / (2 * freq_pyrs)
+        term3 = 1 - tv_diffs / (2 * freq_purs * freq_pyrs)
+        invalid = (total == 0) | (term1 <= 0) | (term2 <= 0) | (term3 <= 0)
+
+        dist = -coeff1 * log(term1) - coeff2 * log(term2) - coeff3 * log(term3)
+        v1 = 1 / term1
+        v2 = 1 / term2
+        v3 = 1 / term3
+        v4 = (
+            (coeff1 * v1 / (2 * freq_purs))
+            + (coeff2 * v2 / (2 * freq_pyrs))
+            + (coeff3 * v3 / (2 * freq_purs * freq_pyrs))
+        )
+        var = (
+            v1 ** 2 * pur_ts_diffs
+            + v2 ** 2 * pyr_ts_diffs
+            + v4 ** 2 * tv_diffs
+            - (v1 * pur_ts_diffs + v2 * pyr_ts_diffs + v4 * tv_diffs) ** 2
+        )
+        var /= total
+
+    return _with_invalid(invalid, total, p, dist, var)
+
+
+def _logdetcommon_from_matrices(matrices):
+    """_logdetcommon for a series of diversity matrices
+
+    Returns
+    -------
+    invalid, total, p, frequency, freqs, var_term, det. frequency, freqs,
+    var_term and det are only for the valid matrices.
+    """
+    total = matrices.sum(axis=(1, 2))
+    diffs = total - matrices.diagonal(axis1=1, axis2=2).sum(axis=1)
+    invalid = (total == 0) | (diffs == 0)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        p = diffs / total
+
+    # we replace the missing diagonal states with a frequency of 0.5,
+    # then normalise
+    frequency = matrices[~invalid]
+    dim = matrices.shape[-1]
+    diagonal = frequency[:, range(dim), range(dim)]
+    diagonal[diagonal == 0] = 0.5
+    frequency[:, range(dim), range(dim)] = diagonal
+    frequency /= frequency.sum(axis=(1, 2))[:, None, None]
+
+    dets = det(frequency)
+    # if the result is nan
+    invalid[~invalid] = dets <= 0
+    valid = dets > 0
+    frequency = frequency[valid]
+    dets = dets[valid]
+
+    # the inverse matrix of frequency, every element is squared
+    M_matrix = inv(frequency) ** 2
+    freqs = [frequency.sum(axis=axis) for axis in (1, 2)]
+    var_term = numpy.einsum("kij,kji->k", M_matrix, frequency)
+    return invalid, total, p, frequency, freqs, var_term, dets
+
+
+def _paralinear_from_matrices(matrices):
+    """_paralinear for a series of diversity matrices, invalid results are
+    nan"""
+    invalid, total, p, frequency, freqs, var_term, dets = _logdetcommon_from_matrices(
+        matrices
+    )
+    valid = ~invalid
+    dist = numpy.full(len(matrices), numpy.nan)
+    var = dist.copy()
+    r = matrices.shape[-1]
+    product = freqs[0] * freqs[1]
+    dist[valid] = -log(dets / sqrt(product.prod(axis=1))) / r
+    var[valid] = (var_term - (1 / sqrt(product)).sum(axis=1)) / (r ** 2 * total[valid])
+    return _with_invalid(invalid, total, p, dist, var)
+
+
+def _logdet_from_matrices(matrices, use_tk_adjustment=True):
+    """_logdet for a series of diversity matrices, invalid results are nan"""
+    invalid, total, p, frequency, freqs, var_term, dets = _logdetcommon_from_matrices(
+        matrices
+    )
+    valid = ~invalid
+    dist = numpy.full(len(matrices), numpy.nan)
+    var = dist.copy()
+    r = matrices.shape[-1]
+    if use_tk_adjustment:
+        coeff = (((freqs[0] + freqs[1]) ** 2).sum(axis=1) / 4 - 1) / (r - 1)
+        product = (freqs[0] * freqs[1]).prod(axis=1)
+        dist[valid] = coeff * log(dets / sqrt(product))
+    else:
+        dist[valid] = -log(dets) / r - log(r)
+        var[valid] = (var_term / r ** 2 - 1) / total[valid]
+    return _with_invalid(invalid, total, p, dist, var)
+
+
 def _number_formatter(template):
     """flexible number formatter"""
 
@@ -308,10 +470,70 @@ def _make_stat_table(stats, names, **kwargs):
     return table
 
 
+# maximum number of diversity matrix elements filled at once
+_BLOCK_ELEMENTS = 2 ** 22
+
+
+def _row_starts(num):
+    """returns the condensed index of the first pair in each row, for the
+    condensed (row-major upper triangle) ordering of num sequences"""
+    starts = numpy.arange(num, dtype=numpy.int64)
+    return starts * num - starts * (starts + 1) // 2
+
+
+def _condensed_pairs(num, pairs):
+    """returns indices of the first and second sequences for positions in the
+    condensed ordering of num sequences"""
+    starts = _row_starts(num)
+    rows = numpy.searchsorted(starts, pairs, side="right") - 1
+    cols = pairs - starts[rows] + rows + 1
+    return rows, cols
+
+
+def _take_condensed(dists, num, indices, out):
+    """fills out with the condensed distances between indices
+
+    Parameters
+    ----------
+    dists
+        condensed distances between num sequences
+    indices
+        sequence indices, may be repeated. Distances between equal indices
+        are 0.
+    out
+        condensed array for len(indices) sequences
+    """
+    indices = numpy.asarray(indices, dtype=numpy.int64)
+    starts = _row_starts(num)
+    new_starts = _row_starts(len(indices))
+    for a in range(len(indices) - 1):
+        others = indices[a + 1 :]
+        lo = numpy.minimum(indices[a], others)
+        hi = numpy.maximum(indices[a], others)
+        same = lo == hi
+        positions = starts[lo] + hi - lo - 1
+        positions[same] = 0
+        values = dists[positions] if len(dists) else numpy.zeros(len(others))
+        values[same] = 0
+        out[new_starts[a] : new_starts[a] + len(others)] = values
+    return out
+
+
+def _pair_blocks(num, size):
+    """yields indices of the first and second sequences of pairs, in blocks of
+    size pairs and in condensed order"""
+    num_pairs = num * (num - 1) // 2
+    for begin in range(0, num_pairs, size):
+        pairs = numpy.arange(begin, min(begin + size, num_pairs), dtype=numpy.int64)
+        yield _condensed_pairs(num, pairs)
+
+
 class _PairwiseDistance(object):
     """base class for computing pairwise distances"""
 
     valid_moltypes = ()
+    # the Stats field reported as the distance
+    _dist_field = "dist"
 
     def __init__(self, moltype, invalid=-9, alignment=None, invalid_raises=False):
         super(_PairwiseDistance, self).__init__()
@@ -327,9 +549,12 @@ class _PairwiseDistance(object):
         self.moltype = moltype
         self.char_to_indices = get_moltype_index_array(moltype, invalid=invalid)
         self._dim = len(list(moltype))
-        self._dists = None
+        # Stats of condensed arrays, one element per pair of sequences
+        self._stats = None
         self._dupes = None
         self._duped = None
+        # index of the sequence each sequence is a duplicate of
+        self._alias = None
         self._invalid_raises = invalid_raises
 
         self.names = None
@@ -339,13 +564,14 @@ class _PairwiseDistance(object):
             self._convert_seqs_to_indices(alignment)
 
         self._func_args = []
+        self._block_func = None
 
     def _convert_seqs_to_indices(self, alignment):
         assert isinstance(
             alignment.moltype, type(self.moltype)
         ), "Alignment does not have correct MolType"
 
-        self._dists = {}
+        self._stats = None
         self.names = alignment.names[:]
         indexed_seqs = []
         for name in self.names:
@@ -365,75 +591,163 @@ class _PairwiseDistance(object):
     def func():
         pass  # over ride in subclasses
 
+    def _block_stats(self, matrices):
+        """returns total, p, dist, var arrays for a series of diversity
+        matrices, invalid results are nan"""
+        if self._block_func is not None:
+            return self._block_func(matrices, *self._func_args)
+
+        stats = numpy.full((len(matrices), 4), numpy.nan)
+        for k, matrix in enumerate(matrices):
+            result = self.func(matrix, *self._func_args)
+            stats[k] = [numpy.nan if v is None else v for v in result]
+        return tuple(stats.T)
+
     @display_wrap
-    def run(self, alignment=None, ui=None):
-        """computes the pairwise distances"""
+    def run(self, alignment=None, stats=True, dtype=float64, path=None, ui=None):
+        """computes the pairwise distances
+
+        Parameters
+        ----------
+        alignment
+            the sequences, if not provided at construction
+        stats : bool
+            if False, only the distances are stored and lengths, proportions,
+            variances and stderr are None
+        dtype
+            float32 or float64, for the condensed distances
+        path
+            file for memory-mapping the condensed distances
+
+        Notes
+        -----
+        The distances are written directly into a condensed array of
+        n * (n - 1) / 2 values, so with stats=False and dtype=float32 the
+        memory required is 4 bytes per pair of sequences. stats=True adds
+        three float64 condensed arrays.
+        """
         self._dupes = None
         self._duped = None
 
-        dupes = set()
-        duped = defaultdict(list)
-
         if alignment is not None:
             self._convert_seqs_to_indices(alignment)
 
         names = self.names[:]
-        matrix = zeros((self._dim, self._dim), float64)
-        off_diag = [
-            (i, j) for i in range(self._dim) for j in range(self._dim) if i != j
-        ]
-        off_diag = tuple([tuple(a) for a in zip(*off_diag)])
-
-        done = 0.0
-        to_do = (len(names) * len(names) - 1) / 2
-        for i in range(len(names) - 1):
-            if i in dupes:
-                continue
-
-            name_1 = names[i]
-            s1 = self.indexed_seqs[i]
-            for j in range(i + 1, len(names)):
-                if j in dupes:
-                    continue
+        num = len(names)
+        num_pairs = num * (num - 1) // 2
+        dtype = numpy.dtype(dtype)
+        if dtype not in (numpy.float32, numpy.float64):
+            raise ValueError(f"dtype must be float32 or float64, not {dtype}")
+        if path is None or num_pairs == 0:
+            dists = numpy.empty(num_pairs, dtype=dtype)
+        else:
+            dists = numpy.memmap(path, dtype=dtype, mode="w+", shape=num_pairs)
 
-                name_2 = names[j]
-                ui.display("%s vs %s" % (name_1, name_2), done / to_do)
-                done += 1
-                matrix.fill(0)
-                s2 = self.indexed_seqs[j]
-                fill_diversity_matrix(matrix, s1, s2)
-                if not (matrix[off_diag] > 0).any():
-                    # j is a duplicate of i
-                    dupes.update([j])
-                    duped[i].append(j)
-                    continue
+        dist_index = Stats._fields.index(self._dist_field)
+        if stats:
+            values = [numpy.empty(num_pairs) for _ in Stats._fields]
+            values[dist_index] = dists
+        else:
+            values = [None] * len(Stats._fields)
+            values[dist_index] = dists
+
+        # sequences identical to an earlier unique sequence are duplicates,
+        # marked_by records the row at which this is established. Pairs are
+        # visited in condensed order, so this is resolved block by block.
+        alias = numpy.arange(num)
+        marked_by = numpy.full(num, num)
+        duped = defaultdict(list)
 
-                total, p, dist, var = self.func(matrix, *self._func_args)
-                if self._invalid_raises and not isinstance(dist, Number):
+        seqs = numpy.ascontiguousarray(self.indexed_seqs)
+        size = max(_BLOCK_ELEMENTS // self._dim ** 2, 1)
+        done = 0
+        for rows, cols in _pair_blocks(num, size):
+            ui.display("%s vs %s" % (names[rows[0]], names[cols[0]]), done / num_pairs)
+            matrices = zeros((len(rows), self._dim, self._dim), float64)
+            fill_diversity_matrices(matrices, seqs, rows, cols)
+            block = slice(done, done + len(rows))
+            block_stats = self._block_stats(matrices)
+            for stat, block_values in zip(values, block_stats):
+                if stat is not None:
+                    stat[block] = block_values
+            done += len(rows)
+
+            totals = matrices.sum(axis=(1, 2))
+            identical = numpy.flatnonzero(totals == matrices.trace(axis1=1, axis2=2))
+            for i, j in zip(rows[identical].tolist(), cols[identical].tolist()):
+                if alias[i] != i or alias[j] != j:
+                    continue
+                alias[j] = i
+                marked_by[j] = i
+                duped[i].append(j)
+
+            if self._invalid_raises:
+                invalid = numpy.isnan(block_stats[0])
+                # only pairs of unique sequences at the time of comparison
+                compared = invalid & (alias[rows] == rows) & (marked_by[cols] > rows)
+                if compared.any():
+                    k = compared.argmax()
+                    name_1, name_2 = names[rows[k]], names[cols[k]]
                     msg = f"distance could not be calculated for {name_1} - {name_2}"
                     raise ArithmeticError(msg)
-                result = Stats(total, p, dist, var)
-                self._dists[(name_1, name_2)] = result
-                self._dists[(name_2, name_1)] = result
 
-        self._dupes = [names[i] for i in dupes] or None
+        self._stats = Stats(*values)
+        self._alias = alias
         if duped:
-            self._duped = {}
-            for k, v in duped.items():
-                key = names[k]
-                vals = [names[i] for i in v]
-                self._duped[key] = vals
-
-            # clean the distances so only unique seqs included
-            remove = set(self._dupes)
-            keys = list(self._dists.keys())
-            for key in keys:
-                if set(key) & remove:
-                    del self._dists[key]
+            self._dupes = [
+                names[i] for i in numpy.flatnonzero(alias != numpy.arange(num))
+            ]
+            self._duped = {names[k]: [names[i] for i in v] for k, v in duped.items()}
 
     __call__ = run
 
-    def get_pairwise_distances(self, include_duplicates=True):
+    def _pairwise_stat(self, field, include_duplicates=True, nan_as_none=False):
+        """returns {(name1, name2): value, ..} for a Stats field
+
+        Parameters
+        ----------
+        field : str
+            name of the Stats field
+        include_duplicates : bool
+            all seqs included, with values of the sequence they duplicate,
+            otherwise only unique sequences are included.
+        nan_as_none : bool
+            values that could not be calculated are None, otherwise nan
+        """
+        indices = self._stat_indices(include_duplicates)
+        values = getattr(self._stats, field)
+        values = _take_condensed(
+            values,
+            len(self.names),
+            self._alias[indices],
+            numpy.empty(len(indices) * (len(indices) - 1) // 2),
+        )
+        square = numpy.zeros((len(indices),) * 2)
+        square[numpy.triu_indices(len(indices), k=1)] = values
+        square += square.T
+
+        names = [self.names[i] for i in indices]
+        result = {}
+        for i, name_1 in enumerate(names):
+            for j, name_2 in enumerate(names):
+                if i == j:
+                    continue
+                val = square[i, j]
+                if nan_as_none and numpy.isnan(val):
+                    val = None
+                result[(name_1, name_2)] = val
+        return result
+
+    def _stat_indices(self, include_duplicates):
+        """returns indices of the sequences to report statistics for"""
+        num = len(self.names)
+        if include_duplicates:
+            return numpy.arange(num)
+        return numpy.flatnonzero(self._alias == numpy.arange(num))
+
+    def get_pairwise_distances(
+        self, include_duplicates=True, condensed=False, dtype=None, path=None
+    ):
         """returns a matrix of pairwise distances.
 
         Parameters
@@ -441,66 +755,76 @@ class _PairwiseDistance(object):
         include_duplicates : bool
             all seqs included in the distances, otherwise only unique sequences
             are included.
+        condensed : bool
+            returns a CondensedDistanceMatrix, which stores only the upper
+            triangle of the matrix
+        dtype
+            float32 or float64, applies when condensed. Defaults to the dtype
+            given to run().
+        path
+            file for memory-mapping the distances, applies when condensed
+
+        Notes
+        -----
+        If condensed, include_duplicates, there are no duplicate sequences
+        and neither dtype nor path require a copy, the result shares the
+        distances computed by run(), so setting its values changes them.
         """
-        if self._dists is None:
+        if self._stats is None:
             return None
 
-        dists = {k: self._dists[k].dist for k in self._dists}
-        if include_duplicates:
-            dists = self._expand(dists)
-
-        result = DistanceMatrix(dists)
+        if not condensed:
+            dists = self._pairwise_stat(
+                self._dist_field,
+                include_duplicates=include_duplicates,
+                nan_as_none=True,
+            )
+            return DistanceMatrix(dists)
+
+        dists = getattr(self._stats, self._dist_field)
+        dtype = dists.dtype if dtype is None else numpy.dtype(dtype)
+        names = self.names
+        # duplicates take the distances of the sequence they duplicate, which
+        # requires a copy
+        no_dupes = self._duped is None
+        if no_dupes and include_duplicates and dtype == dists.dtype and path is None:
+            return CondensedDistanceMatrix(names, dists=dists, copy=False)
+
+        indices = self._stat_indices(include_duplicates)
+        result = CondensedDistanceMatrix(
+            [names[i] for i in indices], dtype=dtype, path=path
+        )
+        _take_condensed(dists, len(names), self._alias[indices], result.dists)
         return result
 
-    def _expand(self, pwise):
-        """returns a pwise statistic dict that includes duplicates"""
-        if not self.duplicated:
-            # no duplicates, nothing to do
-            return pwise
-
-        redundants = {}
-        for k in self.duplicated:
-            for r in self.duplicated[k]:
-                redundants[r] = k
-
-        names = self.names[:]
-        for add, alias in redundants.items():
-            for name in names:
-                if name == add:
-                    continue
-                if name == alias:
-                    val = 0
-                else:
-                    val = pwise.get((alias, name), None)
-                pwise[(add, name)] = pwise[(name, add)] = val
-
-        return pwise
+    def _has_stat(self, field):
+        """True if run() has stored the Stats field"""
+        return self._stats is not None and getattr(self._stats, field) is not None
 
     @property
     def dists(self):
-        if self._dists is None:
+        if self._stats is None:
             return None
 
         return self.get_pairwise_distances(include_duplicates=True)
 
     @property
     def stderr(self):
-        if self._dists is None:
+        if not self._has_stat("variance"):
             return None
 
-        stats = {k: sqrt(self._dists[k].variance) for k in self._dists}
-        stats = self._expand(stats)
+        stats = self._pairwise_stat("variance")
+        stats = {k: sqrt(v) for k, v in stats.items()}
         kwargs = dict(title="Standard Error of Pairwise Distances", digits=4)
         t = _make_stat_table(stats, self.names, **kwargs)
         return t
 
     @property
     def variances(self):
-        if self._dists is None:
+        if not self._has_stat("variance"):
             return None
 
-        stats = {k: self._dists[k].variance for k in self._dists}
-        stats = self._expand(stats)
+        stats = self._pairwise_stat("variance")
         kwargs = dict(title="Variances of Pairwise Distances", digits=4)
         t = _make_stat_table(stats, self.names, **kwargs)
         var_formatter = _number_formatter("%.2e")
@@ -510,22 +834,20 @@ class _PairwiseDistance(object):
 
     @property
     def proportions(self):
-        if self._dists is None:
+        if not self._has_stat("fraction_variable"):
             return None
 
-        stats = {k: self._dists[k].fraction_variable for k in self._dists}
-        stats = self._expand(stats)
+        stats = self._pairwise_stat("fraction_variable")
         kwargs = dict(title="Proportion variable sites", digits=4)
         t = _make_stat_table(stats, self.names, **kwargs)
         return t
 
     @property
     def lengths(self):
-        if self._dists is None:
+        if not self._has_stat("length"):
             return None
 
-        stats = {k: self._dists[k].length for k in self._dists}
-        stats = self._expand(stats)
+        stats = self._pairwise_stat("length")
         kwargs = dict(title="Pairwise Aligned Lengths", digits=0)
         t = _make_stat_table(stats, self.names, **kwargs)
         return t
@@ -540,36 +862,20 @@ class HammingPair(_PairwiseDistance):
         """states: the valid sequence states"""
         super(HammingPair, self).__init__(moltype, *args, **kwargs)
         self.func = _hamming
+        self._block_func = _hamming_from_matrices
 
 
 class PercentIdentityPair(_PairwiseDistance):
     """Percent identity distance calculator for pairwise alignments"""
 
     valid_moltypes = ("dna", "rna", "protein", "text", "bytes")
+    _dist_field = "fraction_variable"
 
     def __init__(self, moltype="text", *args, **kwargs):
         """states: the valid sequence states"""
         super(PercentIdentityPair, self).__init__(moltype, *args, **kwargs)
         self.func = _hamming
-
-    def get_pairwise_distances(self, include_duplicates=True):
-        """returns a matrix of pairwise distances.
-
-        Parameters
-        ----------
-        include_duplicates : bool
-            all seqs included in the distances, otherwise only unique sequences
-            are included.
-        """
-        if self._dists is None:
-            return None
-
-        dists = {k: self._dists[k].fraction_variable for k in self._dists}
-        if include_duplicates:
-            dists = self._expand(dists)
-
-        result = DistanceMatrix(dists)
-        return result
+        self._block_func = _hamming_from_matrices
 
 
 class _NucleicSeqPair(_PairwiseDistance):
@@ -592,6 +898,7 @@ class JC69Pair(_NucleicSeqPair):
         """states: the valid sequence states"""
         super(JC69Pair, self).__init__(moltype, *args, **kwargs)
         self.func = _jc69_from_matrix
+        self._block_func = _jc69_from_matrices
 
 
 class TN93Pair(_NucleicSeqPair):
@@ -618,6 +925,7 @@ class TN93Pair(_NucleicSeqPair):
         self.tv_coords = [i * 4 + j for i, j in self.tv_coords]
 
         self.func = _tn93_from_matrix
+        self._block_func = _tn93_from_matrices
         self._func_args = [
             self._freqs,
             self.pur_indices,
@@ -640,6 +948,7 @@ class LogDetPair(_PairwiseDistance):
         """
         super(LogDetPair, self).__init__(moltype, *args, **kwargs)
         self.func = _logdet
+        self._block_func = _logdet_from_matrices
         self._func_args = [use_tk_adjustment]
 
     def run(self, use_tk_adjustment=None, *args, **kwargs):
@@ -657,6 +966,7 @@ class ParalinearPair(_PairwiseDistance):
     def __init__(self, moltype="dna", *args, **kwargs):
         super(ParalinearPair, self).__init__(moltype, *args, **kwargs)
         self.func = _paralinear
+        self._block_func = _paralinear_from_matrices
 
 
 _calculators = {
@@ -827,10 +1137,252 @@ class DistanceMatrix(DictArray):
         an estimated Neighbour Joining Tree, note that invalid distances are dropped
         prior to building the tree
         """
-        from cogent3.phylo.nj import nj
+        from cogent3.phylo.nj import fast_nj
 
         dists = self.drop_invalid()
         if not dists or dists.shape[0] == 1:
             raise ValueError("Too few distances to build a treenj")
-        dists = dists.to_dict()
-        return nj(dists, show_progress=show_progress)
+        return fast_nj(dists, show_progress=show_progress)
+
+    def to_condensed(self, dtype=float64, path=None):
+        """returns a CondensedDistanceMatrix of the upper triangle
+
+        Parameters
+        ----------
+        dtype
+            float32 or float64
+        path
+            file for memory-mapping the distances
+        """
+        num = len(self.names)
+        result = CondensedDistanceMatrix(
+            self.names, dtype=dtype, path=path, invalid=self._invalid
+        )
+        result.dists[:] = self.array[numpy.triu_indices(num, k=1)]
+        return result
+
+
+class CondensedDistanceMatrix(object):
+    """pairwise distance matrix stored as its condensed upper triangle
+
+    Notes
+    -----
+    The distance between names[i] and names[j], i < j, is dists[k] with
+    k = i * n - i * (i + 1) // 2 + j - i - 1, the same ordering as
+    scipy.spatial.distance.squareform. Storing n * (n - 1) / 2 float32 or
+    float64 values, optionally memory-mapped, makes tens of thousands of
+    names feasible.
+    """
+
+    def __init__(
+        self, names, dists=None, dtype=float64, path=None, invalid=None, copy=True
+    ):
+        """
+        Parameters
+        ----------
+        names
+            series of names
+        dists
+            condensed distances, if not provided distances are uninitialised
+        dtype
+            float32 or float64
+        path
+            file for memory-mapping the distances, which are stored in memory
+            if None
+        invalid
+            value used for invalid distances
+        copy : bool
+            if False, dists must be a float32 or float64 numpy array, which
+            is used as the storage. dtype and path are ignored.
+        """
+        self.names = list(names)
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("names must be unique")
+
+        if not copy:
+            if not isinstance(dists, numpy.ndarray):
+                raise ValueError("dists must be a numpy array if copy is False")
+            dtype = dists.dtype
+            path = None
+
+        dtype = numpy.dtype(dtype)
+        if dtype not in (numpy.float32, numpy.float64):
+            raise ValueError(f"dtype must be float32 or float64, not {dtype}")
+
+        num = len(self.names)
+        num_pairs = num * (num - 1) // 2
+        if dists is not None and len(dists) != num_pairs:
+            raise ValueError(
+                f"{len(dists)} distances != {num_pairs} pairs of {num} names"
+            )
+
+        if not copy:
+            self.dists = dists
+        elif path is None or num_pairs == 0:
+            self.dists = numpy.empty(num_pairs, dtype=dtype)
+        else:
+            self.dists = numpy.memmap(path, dtype=dtype, mode="w+", shape=num_pairs)
+
+        if dists is not None and copy:
+            if not isinstance(dists, numpy.ndarray):
+                # None becomes nan
+                dists = numpy.array(dists, dtype=float64)
+            self.dists[:] = dists
+
+        self._invalid = invalid
+        self._index = {n: i for i, n in enumerate(self.names)}
+
+    def __repr__(self):
+        num = len(self.names)
+        return f"{self.__class__.__name__}(num_names={num}, dtype={self.dtype})"
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def shape(self):
+        return (len(self.names),) * 2
+
+    @property
+    def dtype(self):
+        return self.dists.dtype
+
+    def _position(self, name_1, name_2):
+        """returns the index of the distance between names in self.dists,
+        None if the names are the same"""
+        i, j = sorted((self._index[name_1], self._index[name_2]))
+        if i == j:
+            return None
+        return i * len(self.names) - i * (i + 1) // 2 + j - i - 1
+
+    def _row(self, i):
+        """returns the distances from the i'th name to all names"""
+        num = len(self.names)
+        starts = _row_starts(num)
+        result = numpy.zeros(num, dtype=self.dtype)
+        result[i + 1 :] = self.dists[starts[i] : starts[i] + num - i - 1]
+        result[:i] = self.dists[starts[:i] + i - numpy.arange(i) - 1]
+        return result
+
+    def __getitem__(self, names):
+        """a distance for (name_1, name_2), or the distances from a name to
+        all names"""
+        if isinstance(names, str):
+            return self._row(self._index[names])
+
+        position = self._position(*names)
+        return 0 if position is None else self.dists[position]
+
+    def __setitem__(self, names, value):
+        position = self._position(*names)
+        if position is None:
+            raise ValueError("cannot set the distance of a name to itself")
+        self.dists[position] = value
+
+    def to_dense(self):
+        """returns a DistanceMatrix"""
+        from cogent3.util.dict_array import DictArrayTemplate
+
+        num = len(self.names)
+        array = numpy.zeros((num, num), dtype=self.dtype)
+        array[numpy.triu_indices(num, k=1)] = self.dists
+        array += array.T
+        darr = DictArrayTemplate(self.names, self.names).wrap(array)
+        return DistanceMatrix(darr, invalid=self._invalid)
+
+    def to_table(self):
+        """converted to a Table"""
+        from cogent3.util.table import Table
+
+        data = {"names": self.names}
+        for i, name in enumerate(self.names):
+            data[name] = self._row(i)
+        header = ["names"] + list(self.names)
+        table = Table(header=header, data=data, index_name="names")
+        return table
+
+    def to_dict(self, **kwargs):
+        """Returns a flattened dict with diagonal elements removed"""
+        result = {}
+        for (i, j), value in zip(
+            zip(*numpy.triu_indices(len(self.names), k=1)), self.dists.tolist()
+        ):
+            name_1, name_2 = self.names[i], self.names[j]
+            result[(name_1, name_2)] = result[(name_2, name_1)] = value
+        return result
+
+    def to_rich_dict(self):
+        data = dict(
+            names=self.names,
+            dists=[None if numpy.isnan(d) else d for d in self.dists.tolist()],
+            dtype=self.dtype.name,
+            invalid=self._invalid,
+            type=get_object_provenance(self),
+            version=__version__,
+        )
+        return data
+
+    def to_json(self):
+        import json
+
+        return json.dumps(self.to_rich_dict())
+
+    def take_dists(self, names, negate=False, path=None):
+        """
+        Parameters
+        ----------
+        names
+            series of names
+        negate : bool
+            if True, elements in names will be excluded
+        path
+            file for memory-mapping the distances of the result
+        Returns
+        -------
+        CondensedDistanceMatrix for names x names, None if fewer than two
+        names are retained
+        """
+        if type(names) == str:
+            names = [names]
+
+        names = set(names)
+        keep = [i for i, n in enumerate(self.names) if (n in names) != negate]
+        if len(keep) < 2:
+            return None
+
+        result = self.__class__(
+            [self.names[i] for i in keep],
+            dtype=self.dtype,
+            path=path,
+            invalid=self._invalid,
+        )
+        _take_condensed(self.dists, len(self.names), keep, result.dists)
+        return result
+
+    def drop_invalid(self):
+        """drops all rows / columns with an invalid entry"""
+        num = len(self.names)
+        invalid = numpy.zeros(num, dtype=bool)
+        size = _BLOCK_ELEMENTS
+        for begin in range(0, len(self.dists), size):
+            positions = numpy.flatnonzero(numpy.isnan(self.dists[begin : begin + size]))
+            rows, cols = _condensed_pairs(num, positions + begin)
+            invalid[rows] = True
+            invalid[cols] = True
+
+        keep = [n for n, drop in zip(self.names, invalid) if not drop]
+        return self.take_dists(keep)
+
+    def quick_tree(self, show_progress=False):
+        """returns a neighbour joining tree
+        Returns
+        -------
+        an estimated Neighbour Joining Tree, note that invalid distances are dropped
+        prior to building the tree
+        """
+        from cogent3.phylo.nj import fast_nj
+
+        dists = self.drop_invalid()
+        if not dists:
+            raise ValueError("Too few distances to build a treenj")
+        return fast_nj(dists, show_progress=show_progress)
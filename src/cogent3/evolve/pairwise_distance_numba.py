@@ -1,4 +1,4 @@
-from numba import njit
+from numba import njit, prange
 
 
 __author__ = "Gavin Huttley, Yicheng Zhu and Ben Kaehler"
@@ -24,3 +24,20 @@ def fill_diversity_matrix(matrix, seq1, seq2):
         if seq1[i] < 0 or seq2[i] < 0:
             continue
         matrix[seq1[i], seq2[i]] += 1.0
+
+
+@njit(parallel=True, cache=True)
+def fill_diversity_matrices(matrices, seqs, rows, cols):
+    """fills a diversity matrix for each pair of sequences.
+
+    matrices[k] is filled from the sequences seqs[rows[k]] and seqs[cols[k]],
+    pairs are processed in parallel. Sequences must be converted to indices
+    as for fill_diversity_matrix."""
+
+    for k in prange(len(rows)):
+        seq1 = seqs[rows[k]]
+        seq2 = seqs[cols[k]]
+        for i in range(len(seq1)):
+            if seq1[i] < 0 or seq2[i] < 0:
+                continue
+            matrices[k, seq1[i], seq2[i]] += 1.0
@@ -70,16 +70,11 @@ from numpy import (
     logical_or,
     logical_xor,
     mean,
-    min,
-    multiply,
     nan_to_num,
-    nonzero,
     ravel,
-    seterr,
     shape,
     sqrt,
     square,
-    std,
     sum,
     take,
     where,
@@ -140,6 +135,41 @@ def _rankdata(a):
     return newarray
 
 
+# maximum number of elements in the arrays broadcast for a block of rows
+_BLOCK_ELEMENTS = 2 ** 22
+
+
+def _pairwise(datamtx, func):
+    """returns the symmetric matrix of distances between the rows of datamtx
+
+    func(i, j) returns the distances between datamtx[i] and datamtx[j], for
+    slices i and j, as an array of shape (len(datamtx[i]), len(datamtx[j])).
+    Rows are compared in blocks, bounding the memory used for broadcasting.
+    private helper function
+    """
+    numrows, numcols = shape(datamtx)
+    dists = zeros((numrows, numrows), "d")
+    size = _BLOCK_ELEMENTS // (numrows * numcols) or 1
+    for start in range(0, numrows, size):
+        stop = start + size
+        dists[start:stop, :stop] = func(slice(start, stop), slice(0, stop))
+    # only dist(row i, row j), i > j, is used
+    dists = numpy.tril(dists, -1)
+    return dists + dists.T
+
+
+def _set_empty_rows(dists, first, second):
+    """sets distances between an all zero row and a not all zero row to 1,
+    and between two all zero rows to 0
+
+    first and second are boolean arrays indicating all zero rows
+    private helper function
+    """
+    dists[first[:, None] != second[None, :]] = 1.0
+    dists[first[:, None] & second[None, :]] = 0.0
+    return dists
+
+
 def trans_chord(m):
     """perform a chord distance transformation on the rows of m
 
@@ -243,19 +273,15 @@ def dist_bray_curtis(datamtx, strict=True):
     if numrows == 0 or numcols == 0:
         return zeros((0, 0), "d")
 
-    dists = zeros((numrows, numrows), "d")
-    for i in range(numrows):
-        r1 = datamtx[i, :]
-        for j in range(i):
-            r2 = datamtx[j, :]
-            abs_v = float(sum(abs(r1 - r2)))
-            v = sum(r1 + r2)
-            cur_d = 0.0
-            if v > 0:
-                cur_d = abs_v / v
-
-            dists[i][j] = dists[j][i] = cur_d
-    return dists
+    rowsums = datamtx.sum(axis=1)
+
+    def func(i, j):
+        abs_v = numpy.abs(datamtx[i, None] - datamtx[None, j]).sum(axis=2)
+        v = rowsums[i, None] + rowsums[None, j]
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            return where(v > 0, abs_v / v, 0.0)
+
+    return _pairwise(datamtx, func)
 
 
 dist_bray_curtis_faith = dist_bray_curtis
@@ -299,21 +325,16 @@ def dist_bray_curtis_magurran(datamtx, strict=True):
     if numrows == 0 or numcols == 0:
         return numpy.zeros((0, 0), "d")
 
-    dists = numpy.zeros((numrows, numrows), "d")
-    for i in range(numrows):
-        r1 = datamtx[i, :]
-        r1sum = r1.sum()
-        for j in range(i):
-            r2 = datamtx[j, :]
-            r2sum = r2.sum()
-            minvals = numpy.min([r1, r2], axis=0)
-
-            if (r1sum + r2sum) == 0:
-                dists[i][j] = dists[j][i] = 0.0
-            else:
-                dissim = 1 - ((2 * minvals.sum()) / (r1sum + r2sum))
-                dists[i][j] = dists[j][i] = dissim
-    return dists
+    rowsums = datamtx.sum(axis=1)
+
+    def func(i, j):
+        minsums = numpy.minimum(datamtx[i, None], datamtx[None, j]).sum(axis=2)
+        totals = rowsums[i, None] + rowsums[None, j]
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            dissim = 1 - ((2 * minsums) / totals)
+        return where(totals == 0, 0.0, dissim)
+
+    return _pairwise(datamtx, func)
 
 
 def dist_canberra(datamtx, strict=True):
@@ -352,25 +373,17 @@ def dist_canberra(datamtx, strict=True):
         except ValueError:
             return zeros((0, 0), "d")
 
-    oldstate = seterr(invalid="ignore", divide="ignore")
     if numrows == 0 or numcols == 0:
         return zeros((0, 0), "d")
-    dists = zeros((numrows, numrows), "d")
-    for i in range(numrows):
-        r1 = datamtx[i]
-        for j in range(i):
-            r2 = datamtx[j]
-            dist = 0.0
-            net = abs(r1 - r2) / (r1 + r2)
-            num_nonzeros = 0
-            for k in range(r1.size):
-                num_nonzeros = num_nonzeros + (1 if (r1[k] > 0.0 or r2[k] > 0.0) else 0)
-            net = nan_to_num(net)
-
-            dists[i, j] = dists[j, i] = nan_to_num(net.sum() / num_nonzeros)
-
-    seterr(**oldstate)
-    return dists
+
+    def func(i, j):
+        r1, r2 = datamtx[i, None], datamtx[None, j]
+        with numpy.errstate(invalid="ignore", divide="ignore"):
+            net = nan_to_num(numpy.abs(r1 - r2) / (r1 + r2)).sum(axis=2)
+            num_nonzeros = logical_or(r1 > 0.0, r2 > 0.0).sum(axis=2)
+            return nan_to_num(net / num_nonzeros)
+
+    return _pairwise(datamtx, func)
 
 
 def dist_chisq(datamtx, strict=True):
@@ -412,30 +425,21 @@ def dist_chisq(datamtx, strict=True):
 
     if numrows == 0 or numcols == 0:
         return zeros((0, 0), "d")
-    dists = zeros((numrows, numrows), "d")
+
     sqrt_grand_sum = sqrt(sum(datamtx))
     rowsums, colsums = sum(datamtx, axis=1), sum(datamtx, axis=0)
-    if not colsums.all():
-        for i in range(len(colsums)):
-            if colsums[i] == 0.0:
-                colsums[i] = 1.0
-    for i in range(numrows):
-        r1 = datamtx[i]
-        r1sum = rowsums[i]
-        for j in range(i):
-            r2 = datamtx[j]
-            r2sum = rowsums[j]
-            if r1sum == 0.0 or r2sum == 0.0:
-                if r1sum == 0.0 and r2sum == 0.0:
-                    dist = 0.0
-                else:
-                    dist = 1.0
-            else:
-                dist = sqrt_grand_sum * sqrt(
-                    sum(multiply((1.0 / colsums), square(r1 / r1sum - r2 / r2sum)))
-                )
-            dists[i, j] = dists[j, i] = dist
-    return dists
+    colsums[colsums == 0.0] = 1.0
+    weights = 1.0 / colsums
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        profiles = datamtx / rowsums[:, None]
+    empty = rowsums == 0.0
+
+    def func(i, j):
+        diffs = square(profiles[i, None] - profiles[None, j])
+        dists = sqrt_grand_sum * sqrt((weights * diffs).sum(axis=2))
+        return _set_empty_rows(dists, empty[i], empty[j])
+
+    return _pairwise(datamtx, func)
 
 
 def dist_chord(datamtx, strict=True):
@@ -471,23 +475,17 @@ def dist_chord(datamtx, strict=True):
 
     if numrows == 0 or numcols == 0:
         return zeros((0, 0), "d")
-    dists = zeros((numrows, numrows), "d")
-    for i in range(numrows):
-        r1 = datamtx[i]  # cache here
-        r1norm = norm(r1)
-        for j in range(i):
-            r2 = datamtx[j]
-            r2norm = norm(r2)
-            if r1norm == 0.0 or r2norm == 0.0:
-                if r1norm == 0.0 and r2norm == 0.0:
-                    dist = 0.0
-                else:
-                    dist = 1.0
-            else:
-                dist = norm(r1 / r1norm - r2 / r2norm)
-            dists[i, j] = dists[j, i] = dist
 
-    return dists
+    norms = norm(datamtx, axis=1)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        normed = datamtx / norms[:, None]
+    empty = norms == 0.0
+
+    def func(i, j):
+        dists = norm(normed[i, None] - normed[None, j], axis=2)
+        return _set_empty_rows(dists, empty[i], empty[j])
+
+    return _pairwise(datamtx, func)
 
 
 def dist_euclidean(datamtx, strict=True):
@@ -520,13 +518,13 @@ def dist_euclidean(datamtx, strict=True):
 
     if numrows == 0 or numcols == 0:
         return zeros((0, 0), "d")
-    dists = zeros((numrows, numrows), "d")
-    for r in range(numrows):
-        for c in range(r):
-            dist = norm(datamtx[r] - datamtx[c])
-            if isnan(dist):
-                raise RuntimeError("ERROR: overflow when computing euclidean distance")
-            dists[r, c] = dists[c, r] = dist
+
+    def func(i, j):
+        return norm(datamtx[i, None] - datamtx[None, j], axis=2)
+
+    dists = _pairwise(datamtx, func)
+    if isnan(dists).any():
+        raise RuntimeError("ERROR: overflow when computing euclidean distance")
 
     return dists
 
@@ -567,21 +565,14 @@ def dist_gower(datamtx, strict=True):
 
     if numrows == 0 or numcols == 0:
         return zeros((0, 0), "d")
-    dists = zeros((numrows, numrows), "d")
+
     coldiffs = datamtx.max(axis=0) - datamtx.min(axis=0)
-    for i in range(numcols):
-        if coldiffs[i] == 0.0:
-            coldiffs[i] = 1.0  # numerator will be zero anyway
-
-    for i in range(numrows):
-        r1 = datamtx[i]
-        for j in range(i):
-            r2 = datamtx[j]
-            rowdiff = r2 - r1
-            dist = sum(abs(r1 - r2) / coldiffs)
-            dists[i, j] = dists[j, i] = dist
+    coldiffs[coldiffs == 0.0] = 1.0  # numerator will be zero anyway
 
-    return dists
+    def func(i, j):
+        return (numpy.abs(datamtx[i, None] - datamtx[None, j]) / coldiffs).sum(axis=2)
+
+    return _pairwise(datamtx, func)
 
 
 def dist_hellinger(datamtx, strict=True):
@@ -616,23 +607,17 @@ def dist_hellinger(datamtx, strict=True):
 
     if numrows == 0 or numcols == 0:
         return zeros((0, 0), "d")
-    dists = zeros((numrows, numrows), "d")
-    for i in range(numrows):
-        r1 = datamtx[i]
-        r1sum = sum(r1)
-        for j in range(i):
-            r2 = datamtx[j]
-            r2sum = sum(r2)
-            if r1sum == 0.0 or r2sum == 0.0:
-                if r1sum == 0.0 and r2sum == 0.0:
-                    dist = 0.0
-                else:
-                    dist = 1.0
-            else:
-                dist = norm(sqrt(r1 / r1sum) - sqrt(r2 / r2sum))
-            dists[i, j] = dists[j, i] = dist
 
-    return dists
+    rowsums = datamtx.sum(axis=1)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        roots = sqrt(datamtx / rowsums[:, None])
+    empty = rowsums == 0.0
+
+    def func(i, j):
+        dists = norm(roots[i, None] - roots[None, j], axis=2)
+        return _set_empty_rows(dists, empty[i], empty[j])
+
+    return _pairwise(datamtx, func)
 
 
 def dist_kulczynski(datamtx, strict=True):
@@ -671,25 +656,19 @@ def dist_kulczynski(datamtx, strict=True):
 
     if numrows == 0 or numcols == 0:
         return zeros((0, 0), "d")
-    dists = zeros((numrows, numrows), "d")
+
     rowsums = datamtx.sum(axis=1)
-    # rowsum: the sum of elements in a row
-    # cache to avoid recalculating for each pair
-    for i in range(numrows):
-        irowsum = rowsums[i]
-        r1 = datamtx[i]
-        for j in range(i):
-            r2 = datamtx[j]
-            jrowsum = rowsums[j]
-            rowminsum = float(sum(where(r1 < r2, r1, r2)))
-            if irowsum == 0.0 and jrowsum == 0.0:
-                cur_d = 0.0  # => two rows of zeros
-            elif irowsum == 0.0 or jrowsum == 0.0:
-                cur_d = 1.0  # one row zeros, one not all zeros
-            else:
-                cur_d = 1.0 - (((rowminsum / irowsum) + (rowminsum / jrowsum)) / 2.0)
-            dists[i][j] = dists[j][i] = cur_d
-    return dists
+    empty = rowsums == 0.0
+
+    def func(i, j):
+        rowminsums = numpy.minimum(datamtx[i, None], datamtx[None, j]).sum(axis=2)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            dists = 1.0 - (
+                (rowminsums / rowsums[i, None] + rowminsums / rowsums[None, j]) / 2.0
+            )
+        return _set_empty_rows(dists, empty[i], empty[j])
+
+    return _pairwise(datamtx, func)
 
 
 def dist_manhattan(datamtx, strict=True):
@@ -730,19 +709,18 @@ def dist_manhattan(datamtx, strict=True):
 
     if numrows == 0 or numcols == 0:
         return zeros((0, 0), "d")
-    dists = zeros((numrows, numrows), "d")
 
     if datamtx.dtype == "bool":
-        diff = bool_diff
+
+        def func(i, j):
+            return (datamtx[i, None] ^ datamtx[None, j]).sum(axis=2)
+
     else:
-        diff = number_diff
 
-    for i in range(numrows):
-        r1 = datamtx[i]  # cache here
-        for j in range(i):
-            dists[i, j] = dists[j, i] = diff(r1, datamtx[j])
+        def func(i, j):
+            return numpy.abs(datamtx[i, None] - datamtx[None, j]).sum(axis=2)
 
-    return dists
+    return _pairwise(datamtx, func)
 
 
 def dist_abund_jaccard(datamtx, strict=True):
@@ -787,34 +765,23 @@ def dist_abund_jaccard(datamtx, strict=True):
 
     if numrows == 0 or numcols == 0:
         return zeros((0, 0), "d")
-    dists = zeros((numrows, numrows), "d")
 
     rowsums = datamtx.sum(axis=1, dtype="float")
+    present = (datamtx != 0).astype(float)
+    empty = rowsums == 0.0
 
-    for i in range(numrows):
-        row1 = datamtx[i]
-        N1 = rowsums[i]
-
-        for j in range(i):
-            row2 = datamtx[j]
-            N2 = rowsums[j]
-
-            if N1 == 0.0 and N2 == 0.0:
-                similarity = 1.0
-            elif N1 == 0.0 or N2 == 0.0:
-                similarity = 0.0
-            else:
-                shared = logical_and(row1, row2)
-                u = sum(row1[shared]) / N1
-                v = sum(row2[shared]) / N2
-                # Verified by graphical inspection
-                if u == 0.0 and v == 0.0:
-                    similarity = 0.0
-                else:
-                    similarity = (u * v) / (u + v - (u * v))
-
-            dists[i][j] = dists[j][i] = 1 - similarity
-    return dists
+    def func(i, j):
+        # relative abundances of the species shared with the other row
+        u = numpy.dot(datamtx[i], present[j].T)
+        v = numpy.dot(present[i], datamtx[j].T)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            u = u / rowsums[i, None]
+            v = v / rowsums[None, j]
+            similarity = (u * v) / (u + v - (u * v))
+        similarity[logical_and(u == 0.0, v == 0.0)] = 0.0
+        return _set_empty_rows(1 - similarity, empty[i], empty[j])
+
+    return _pairwise(datamtx, func)
 
 
 def dist_morisita_horn(datamtx, strict=True):
@@ -853,34 +820,27 @@ def dist_morisita_horn(datamtx, strict=True):
 
     if numrows == 0 or numcols == 0:
         return zeros((0, 0), "d")
-    dists = zeros((numrows, numrows), "d")
 
     rowsums = datamtx.sum(axis=1, dtype="float")
     row_ds = (datamtx ** 2).sum(axis=1, dtype="float")  # these are d_a, etc
-
-    for i in range(numrows):
-        if row_ds[i] != 0.0:
-            row_ds[i] = row_ds[i] / rowsums[i] ** 2
+    nonzero = row_ds != 0.0
+    row_ds[nonzero] = row_ds[nonzero] / rowsums[nonzero] ** 2
     # this leaves row_ds zero if actually 0/0
-    for i in range(numrows):
-        row1 = datamtx[i]
-        N1 = rowsums[i]
-        d1 = row_ds[i]
-        for j in range(i):
-            row2 = datamtx[j]
-            N2 = rowsums[j]
-            d2 = row_ds[j]
-            if N2 == 0.0 and N1 == 0.0:
-                dist = 0.0
-            elif N2 == 0.0 or N1 == 0.0:
-                dist = 1.0
-            else:
-                # d's zero only if N's zero, and we already checked for that
-                similarity = 2 * sum(row1 * row2)
-                similarity = similarity / ((d1 + d2) * N1 * N2)
-                dist = 1 - similarity
-            dists[i][j] = dists[j][i] = dist
-    return dists
+    empty = rowsums == 0.0
+    values = asarray(datamtx, "d")
+
+    def func(i, j):
+        # d's zero only if N's zero, which are set after
+        similarity = 2 * numpy.dot(values[i], values[j].T)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            similarity = similarity / (
+                (row_ds[i, None] + row_ds[None, j])
+                * rowsums[i, None]
+                * rowsums[None, j]
+            )
+        return _set_empty_rows(1 - similarity, empty[i], empty[j])
+
+    return _pairwise(datamtx, func)
 
 
 def dist_pearson(datamtx, strict=True):
@@ -925,35 +885,18 @@ def dist_pearson(datamtx, strict=True):
     if numrows == 0 or numcols == 0:
         return zeros((0, 0), "d")
 
-    rowmeans = mean(datamtx, axis=1)
-    rowstds = std(datamtx, axis=1)
+    devs = datamtx - mean(datamtx, axis=1)[:, None]
+    sumsqs = (devs ** 2).sum(axis=1)
+    flat = sumsqs == 0.0
 
-    dists = zeros((numrows, numrows), "d")
-    n = float(numrows)
-
-    for i in range(numrows):
-        r1 = datamtx[i, :]
-        r1m = rowmeans[i]
-        r1dev = r1 - r1m
-        for j in range(i):
-            r2 = datamtx[j, :]
-            r2m = rowmeans[j]
-            r2dev = r2 - r2m
-            top = sum(r1dev * r2dev)
-            sum1 = sum(r1dev ** 2)
-            sum2 = sum(r2dev ** 2)
-
-            if sum1 == 0.0 and sum2 == 0.0:
-                r = 1.0
-            elif sum1 == 0.0 or sum2 == 0.0:
-                r = 0.0
-            else:
-                bottom = sqrt(sum1 * sum2)
-                r = top / bottom
-
-            dists[i][j] = dists[j][i] = 1.0 - r
+    def func(i, j):
+        top = numpy.dot(devs[i], devs[j].T)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            r = top / sqrt(sumsqs[i, None] * sumsqs[None, j])
+        # flat rows have r of 1 with each other, 0 with other rows
+        return _set_empty_rows(1.0 - r, flat[i], flat[j])
 
-    return dists
+    return _pairwise(datamtx, func)
 
 
 def dist_soergel(datamtx, strict=True):
@@ -991,19 +934,16 @@ def dist_soergel(datamtx, strict=True):
 
     if numrows == 0 or numcols == 0:
         return zeros((0, 0), "d")
-    dists = zeros((numrows, numrows), "d")
-    for i in range(numrows):
-        r1 = datamtx[i, :]
-        for j in range(i):
-            r2 = datamtx[j, :]
-            top = float(sum(abs(r1 - r2)))
-            bot = float(sum(where(r1 > r2, r1, r2)))
-            if bot <= 0.0:
-                cur_d = 0.0
-            else:
-                cur_d = top / bot
-            dists[i][j] = dists[j][i] = cur_d
-    return dists
+
+    def func(i, j):
+        r1, r2 = datamtx[i, None], datamtx[None, j]
+        top = numpy.abs(r1 - r2).sum(axis=2)
+        bot = numpy.maximum(r1, r2).sum(axis=2)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            dists = top / bot
+        return where(bot <= 0.0, 0.0, dists)
+
+    return _pairwise(datamtx, func)
 
 
 def dist_spearman_approx(datamtx, strict=True):
@@ -1044,23 +984,18 @@ def dist_spearman_approx(datamtx, strict=True):
 
     if numrows == 0 or numcols == 0:
         return zeros((0, 0), "d")
-    dists = zeros((numrows, numrows), "d")
 
     if numcols < 2:
-        return dists  # formula fails for < 2 elements per row
-
-    for i in range(numrows):
-        r1 = datamtx[i, :]
-        rank1 = _rankdata(r1)
-        for j in range(i):
-            r2 = datamtx[j, :]
-            rank2 = _rankdata(r2)
-            rankdiff = rank1 - rank2
-            dsqsum = sum((rankdiff) ** 2)
-            dist = 6 * dsqsum / float(numcols * (numcols ** 2 - 1))
-
-            dists[i][j] = dists[j][i] = dist
-    return dists
+        return zeros((numrows, numrows), "d")  # formula fails for < 2 elements per row
+
+    ranks = array([_rankdata(row) for row in datamtx])
+    denom = float(numcols * (numcols ** 2 - 1))
+
+    def func(i, j):
+        dsqsums = square(ranks[i, None] - ranks[None, j]).sum(axis=2)
+        return 6 * dsqsums / denom
+
+    return _pairwise(datamtx, func)
 
 
 def dist_specprof(datamtx, strict=True):
@@ -1095,23 +1030,17 @@ def dist_specprof(datamtx, strict=True):
 
     if numrows == 0 or numcols == 0:
         return zeros((0, 0), "d")
-    dists = zeros((numrows, numrows), "d")
-    for i in range(numrows):
-        r1 = datamtx[i]
-        r1sum = sum(r1)
-        for j in range(i):
-            r2 = datamtx[j]
-            r2sum = sum(r2)
-            if r1sum == 0.0 or r2sum == 0.0:
-                if r1sum == 0.0 and r2sum == 0.0:
-                    dist = 0.0
-                else:
-                    dist = 1.0
-            else:
-                dist = norm((r1 / r1sum) - (r2 / r2sum))
-            dists[i, j] = dists[j, i] = dist
 
-    return dists
+    rowsums = datamtx.sum(axis=1)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        profiles = datamtx / rowsums[:, None]
+    empty = rowsums == 0.0
+
+    def func(i, j):
+        dists = norm(profiles[i, None] - profiles[None, j], axis=2)
+        return _set_empty_rows(dists, empty[i], empty[j])
+
+    return _pairwise(datamtx, func)
 
 
 def binary_dist_otu_gain(otumtx):
@@ -1122,17 +1051,10 @@ def binary_dist_otu_gain(otumtx):
     each other sample.
 
     """
-    result = []
-    for i in otumtx:
-        row = []
-        for j in otumtx:
-            gain = 0
-            for i_val, j_val in zip(i, j):
-                if i_val > 0 and j_val == 0:
-                    gain += 1
-            row.append(gain)
-        result.append(row)
-    return array(result)
+    otumtx = asarray(otumtx)
+    present = (otumtx > 0).astype(int)
+    absent = (otumtx == 0).astype(int)
+    return numpy.dot(present, absent.T)
 
 
 def binary_dist_chisq(datamtx, strict=True):
@@ -1201,19 +1123,17 @@ def binary_dist_sorensen_dice(datamtx, strict=True):
 
     if numrows == 0 or numcols == 0:
         return zeros((0, 0), "d")
-    dists = zeros((numrows, numrows), "d")
+
     rowsums = datamtx.sum(axis=1)
 
-    for i in range(numrows):
-        row1 = datamtx[i]
-        for j in range(i):
-            row2 = datamtx[j]
-            bottom = float(rowsums[i] + rowsums[j])
-            cur_d = 0.0
-            if bottom:
-                cur_d = 1 - (2 * logical_and(row1, row2).sum() / bottom)
-            dists[i][j] = dists[j][i] = cur_d
-    return dists
+    def func(i, j):
+        bottom = rowsums[i, None] + rowsums[None, j]
+        shared = numpy.dot(datamtx[i], datamtx[j].T)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            dists = 1 - (2 * shared / bottom)
+        return where(bottom == 0, 0.0, dists)
+
+    return _pairwise(datamtx, func)
 
 
 def binary_dist_euclidean(datamtx, strict=True):
@@ -1270,19 +1190,14 @@ def binary_dist_hamming(datamtx, strict=True):
 
     if numrows == 0 or numcols == 0:
         return zeros((0, 0), "d")
-    dists = zeros((numrows, numrows), "d")
+
     rowsums = datamtx.sum(axis=1)
 
-    for i in range(numrows):
-        first = datamtx[i]
-        a = rowsums[i]
-        for j in range(i):
-            second = datamtx[j]
-            b = rowsums[j]
-            c = float(logical_and(first, second).sum())
-            dist = a + b - (2.0 * c)
-            dists[i][j] = dists[j][i] = dist
-    return dists
+    def func(i, j):
+        shared = numpy.dot(datamtx[i], datamtx[j].T)
+        return rowsums[i, None] + rowsums[None, j] - (2.0 * shared)
+
+    return _pairwise(datamtx, func)
 
 
 def binary_dist_jaccard(datamtx, strict=True):
@@ -1329,22 +1244,17 @@ def binary_dist_jaccard(datamtx, strict=True):
 
     if numrows == 0 or numcols == 0:
         return zeros((0, 0), "d")
-    dists = zeros((numrows, numrows), "d")
 
     rowsums = datamtx.sum(axis=1)
-    for i in range(numrows):
-        first = datamtx[i]
-        a = rowsums[i]
-        for j in range(i):
-            second = datamtx[j]
-            b = rowsums[j]
-            c = float(logical_and(first, second).sum())
-            if a == 0.0 and b == 0.0:
-                dist = 0.0
-            else:
-                dist = 1.0 - (c / (a + b - c))
-            dists[i][j] = dists[j][i] = dist
-    return dists
+
+    def func(i, j):
+        a, b = rowsums[i, None], rowsums[None, j]
+        c = numpy.dot(datamtx[i], datamtx[j].T)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            dists = 1.0 - (c / (a + b - c))
+        return where(logical_and(a == 0.0, b == 0.0), 0.0, dists)
+
+    return _pairwise(datamtx, func)
 
 
 def binary_dist_lennon(datamtx, strict=True):
@@ -1391,24 +1301,18 @@ def binary_dist_lennon(datamtx, strict=True):
 
     if numrows == 0 or numcols == 0:
         return zeros((0, 0), "d")
-    dists = zeros((numrows, numrows), "d")
 
     rowsums = datamtx.sum(axis=1)
-    for i in range(numrows):
-        first = datamtx[i]
-        a = rowsums[i]
-        for j in range(i):
-            second = datamtx[j]
-            b = rowsums[j]
-            c = float(logical_and(first, second).sum())
-            if a == 0.0 and b == 0.0:
-                dist = 0.0
-            elif c == 0.0:
-                dist = 1.0
-            else:
-                dist = 1.0 - (c / (c + min([a - c, b - c])))
-            dists[i][j] = dists[j][i] = dist
-    return dists
+
+    def func(i, j):
+        a, b = rowsums[i, None], rowsums[None, j]
+        c = numpy.dot(datamtx[i], datamtx[j].T)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            dists = 1.0 - (c / (c + numpy.minimum(a - c, b - c)))
+        dists[c == 0.0] = 1.0
+        return where(logical_and(a == 0.0, b == 0.0), 0.0, dists)
+
+    return _pairwise(datamtx, func)
 
 
 def binary_dist_ochiai(datamtx, strict=True):
@@ -1455,24 +1359,17 @@ def binary_dist_ochiai(datamtx, strict=True):
 
     if numrows == 0 or numcols == 0:
         return zeros((0, 0), "d")
-    dists = zeros((numrows, numrows), "d")
+
     rowsums = datamtx.sum(axis=1)
+    empty = rowsums == 0.0
 
-    for i in range(numrows):
-        first = datamtx[i]
-        a = rowsums[i]
-        for j in range(i):
-            second = datamtx[j]
-            b = rowsums[j]
-            c = float(logical_and(first, second).sum())
-            if a == 0.0 and b == 0.0:
-                dist = 0.0
-            elif a == 0.0 or b == 0.0:
-                dist = 1.0
-            else:
-                dist = 1.0 - (c / sqrt(a * b))
-            dists[i][j] = dists[j][i] = dist
-    return dists
+    def func(i, j):
+        c = numpy.dot(datamtx[i], datamtx[j].T)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            dists = 1.0 - (c / sqrt(rowsums[i, None] * rowsums[None, j]))
+        return _set_empty_rows(dists, empty[i], empty[j])
+
+    return _pairwise(datamtx, func)
 
 
 def binary_dist_pearson(datamtx, strict=True):
@@ -74,6 +74,24 @@ class CategoryCounter(MutableMapping, SummaryStatBase):
             else:
                 self.update_from_series(data)
 
+    @classmethod
+    def from_counts(cls, data):
+        """returns a new instance holding counts
+
+        Parameters
+        ----------
+        data
+            dict or series of (key, count) pairs, keys must be distinct
+
+        Notes
+        -----
+        Counts are stored without accumulating them one key at a time, which
+        matters for the millions of keys produced by k-mer counting.
+        """
+        new = cls()
+        new.__dict__.update(data)
+        return new
+
     def update_from_counts(self, data):
         """updates values of self using counts dict"""
         for k, v in data.items():
@@ -6,6 +6,7 @@ __all__ = [
     "least_squares",
     "maximum_likelihood",
     "nj",
+    "tree_distance",
     "tree_space",
     "util",
 ]
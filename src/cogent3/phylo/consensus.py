@@ -3,7 +3,6 @@
 import warnings
 
 from collections import defaultdict
-from itertools import product
 
 from cogent3 import make_tree
 from cogent3.core.tree import TreeBuilder
@@ -85,28 +84,115 @@ def weighted_majority_rule(
         raise ValueError('method must be "rooted" or "unrooted"')
 
 
+def _tip_masks(names):
+    """returns {name: bit} for names in sorted order"""
+    return {name: 1 << i for i, name in enumerate(sorted(names))}
+
+
+def _mask_names(mask, names):
+    """returns the names corresponding to the set bits of mask"""
+    return [name for i, name in enumerate(names) if mask >> i & 1]
+
+
+def _is_tip_mask(mask):
+    return mask & (mask - 1) == 0
+
+
+def _edge_masks(tree, tip_masks):
+    """returns [(mask, edge), ...] in postorder, where mask is the bitwise or
+    of the tips descended from edge"""
+    masks = {}
+    result = []
+    for edge in tree.postorder(include_self=True):
+        if edge.is_tip():
+            mask = tip_masks[edge.name]
+        else:
+            mask = 0
+            for child in edge.children:
+                mask |= masks[id(child)]
+        masks[id(edge)] = mask
+        result.append((mask, edge))
+    return result
+
+
+def _split_masks(tree, tip_masks):
+    """returns {split: length} for the unrooted tree
+
+    Notes
+    -----
+    Each split is represented by the mask of the side not containing the
+    first tip. The lengths of edges defining the same split, such as the two
+    edges at a bifurcating root, are summed. Lengths are None if any of those
+    edges has no length.
+    """
+    all_tips = sum(tip_masks.values())
+    splits = {}
+    for mask, edge in _edge_masks(tree, tip_masks):
+        if edge.is_root():
+            continue
+        if mask & 1:
+            mask ^= all_tips
+        length = edge.length
+        if mask in splits:
+            prior = splits[mask]
+            length = None if length is None or prior is None else length + prior
+        splits[mask] = length
+    return splits
+
+
+def _build_clades(masks, names, tree_build):
+    """returns {mask: node} for the subtrees assembled from compatible
+    clades
+
+    Parameters
+    ----------
+    masks
+        {clade mask: params} for a compatible set of clades
+    names
+        tip names in bit order
+    """
+    nodes = {}
+    for mask in sorted(masks, key=lambda m: bin(m).count("1")):
+        params = masks[mask]
+        if _is_tip_mask(mask):
+            nodes[mask] = tree_build([], names[mask.bit_length() - 1], params)
+            continue
+        children = sorted(m for m in nodes if m & mask == m)
+        nodes[mask] = tree_build([nodes.pop(m) for m in children], None, params)
+    return nodes
+
+
+def _compatible(mask, accepted):
+    """whether clade mask is nested within, or disjoint from, every accepted
+    clade"""
+    for other in accepted:
+        shared = mask & other
+        if shared and shared != mask and shared != other:
+            return False
+    return True
+
+
 @extend_docstring_from(weighted_majority_rule)
 def weighted_rooted_majority_rule(weighted_trees, strict=False, attr="support"):
+    # tips are assigned bits as they are encountered
+    tip_masks = {}
     cladecounts = {}
     edgelengths = {}
     total = 0
     for (weight, tree) in weighted_trees:
         total += weight
-        edges = tree.get_edge_vector()
-        for edge in edges:
-            tips = edge.get_tip_names(includeself=True)
-            tips = frozenset(tips)
-            if tips not in cladecounts:
-                cladecounts[tips] = 0
-            cladecounts[tips] += weight
+        for name in tree.get_tip_names():
+            tip_masks.setdefault(name, 1 << len(tip_masks))
+        for clade, edge in _edge_masks(tree, tip_masks):
+            cladecounts[clade] = cladecounts.get(clade, 0) + weight
             length = edge.length and edge.length * weight
-            if edgelengths.get(tips, None):
-                edgelengths[tips] += length
+            if edgelengths.get(clade, None):
+                edgelengths[clade] += length
             else:
-                edgelengths[tips] = length
-    cladecounts = [(count, clade) for (clade, count) in list(cladecounts.items())]
-    cladecounts.sort()
-    cladecounts.reverse()
+                edgelengths[clade] = length
+    cladecounts = sorted(
+        [(count, clade) for (clade, count) in cladecounts.items()], reverse=True
+    )
 
     if strict:
         # Remove any with support < 50%
@@ -116,49 +202,17 @@ def weighted_rooted_majority_rule(weighted_trees, strict=False, attr="support"):
                 break
 
     # Remove conflicts
-    accepted_clades = set()
-    counts = {}
+    accepted_clades = {}
     for (count, clade) in cladecounts:
-        for accepted_clade in accepted_clades:
-            if clade.intersection(accepted_clade) and not (
-                clade.issubset(accepted_clade) or clade.issuperset(accepted_clade)
-            ):
-                break
-        else:
-            accepted_clades.add(clade)
-            counts[clade] = count
+        if _compatible(clade, accepted_clades):
             weighted_length = edgelengths[clade]
-            edgelengths[clade] = weighted_length and weighted_length / count
-
-    nodes = {}
-    queue = []
-    tree_build = TreeBuilder().create_edge
-    for clade in accepted_clades:
-        if len(clade) == 1:
-            tip_name = next(iter(clade))
-            params = {"length": edgelengths[clade], attr: counts[clade]}
-            nodes[tip_name] = tree_build([], tip_name, params)
-        else:
-            queue.append(((len(clade), clade)))
-
-    while queue:
-        queue.sort()
-        (size, clade) = queue.pop(0)
-        new_queue = []
-        for (size2, ancestor) in queue:
-            if clade.issubset(ancestor):
-                new_ancestor = (ancestor - clade) | frozenset([clade])
-                counts[new_ancestor] = counts.pop(ancestor)
-                edgelengths[new_ancestor] = edgelengths.pop(ancestor)
-                ancestor = new_ancestor
-            new_queue.append((len(ancestor), ancestor))
-        children = [nodes.pop(c) for c in clade]
-        assert len([children])
-        nodes[clade] = tree_build(
-            children, None, {attr: counts[clade], "length": edgelengths[clade]}
-        )
-        queue = new_queue
+            accepted_clades[clade] = {
+                attr: count,
+                "length": weighted_length and weighted_length / count,
+            }
 
+    names = sorted(tip_masks, key=tip_masks.get)
+    nodes = _build_clades(accepted_clades, names, TreeBuilder().create_edge)
     for root in list(nodes.values()):
         root.name = "root"  # Yuk
 
@@ -170,19 +224,21 @@ def weighted_unrooted_majority_rule(weighted_trees, strict=False, attr="support"
     # Calculate raw split lengths and weights
     split_weights = defaultdict(float)
     split_lengths = defaultdict(float)
-    tips = None
+    tip_masks = None
     for (weight, tree) in weighted_trees:
-        for split, params in list(get_splits(tree).items()):
+        # Check that all trees have the same taxa
+        names = tree.get_tip_names()
+        if tip_masks is None:
+            tip_masks = _tip_masks(names)
+        elif len(names) != len(tip_masks) or not all(n in tip_masks for n in names):
+            raise NotImplementedError("all trees must have the same taxa")
+
+        for split, length in _split_masks(tree, tip_masks).items():
             split_weights[split] += weight
-            if params["length"] is None:
+            if length is None or split_lengths[split] is None:
                 split_lengths[split] = None
             else:
-                split_lengths[split] += weight * params["length"]
-        # Check that all trees have the same taxa
-        if tips is None:
-            tips = frozenset.union(*split)
-        elif tips != frozenset.union(*split):
-            raise NotImplementedError("all trees must have the same taxa")
+                split_lengths[split] += weight * length
 
     # Normalise split lengths by split weight and split weights by total weight
     for split in split_lengths:
@@ -192,22 +248,17 @@ def weighted_unrooted_majority_rule(weighted_trees, strict=False, attr="support"
     weighted_splits = [(w / total_weight, s) for s, w in list(split_weights.items())]
     weighted_splits.sort(reverse=True)
 
-    # Remove conflicts and any with support < 50% if strict
+    # Remove conflicts and any with support < 50% if strict. As splits exclude
+    # the first tip, the other sides of two splits always intersect.
     accepted_splits = {}
     for weight, split in weighted_splits:
         if strict and weight <= 0.5:
             break
 
-        for accepted_split in accepted_splits:
-            for s, a in product(split, accepted_split):
-                if s.isdisjoint(a):
-                    break
-            else:
-                break
-        else:
+        if _compatible(split, accepted_splits):
             accepted_splits[split] = {attr: weight, "length": split_lengths[split]}
 
-    return [get_tree(accepted_splits)]
+    return [_tree_from_split_masks(accepted_splits, sorted(tip_masks))]
 
 
 def get_splits(tree):
@@ -217,27 +268,30 @@ def get_splits(tree):
     if len(tree.children) < 3:
         warnings.warn("tree is rooted - will return splits for unrooted tree")
 
-    def getTipsAndSplits(tree):
-        if tree.is_tip():
-            return ({frozenset([tree.name]): {"length": tree.length}}, [tree.name])
-
-        splits = defaultdict(lambda: {"length": 0.0})
-        tips = []
-        for child in tree.children:
-            s, t = getTipsAndSplits(child)
-            splits.update(s)
-            tips.extend(t)
-        if not tree.is_root():
-            split = frozenset([t for s in splits for t in s])
-            if tree.length is None:
-                splits[split] = {"length": None}
-            else:
-                splits[split] = {"length": tree.length + splits[split]["length"]}
-        return splits, tips
+    tip_masks = _tip_masks(tree.get_tip_names())
+    names = sorted(tip_masks)
+    all_tips = frozenset(names)
+    result = {}
+    for split, length in _split_masks(tree, tip_masks).items():
+        half = frozenset(_mask_names(split, names))
+        result[frozenset([all_tips - half, half])] = {"length": length}
+    return result
 
-    splits, tips = getTipsAndSplits(tree)
-    tips = frozenset(tips)
-    return {frozenset([tips - s, s]): params for s, params in list(splits.items())}
+
+def _tree_from_split_masks(splits, names):
+    """returns the tree from {split mask: params}, with split masks as
+    produced by _split_masks for tips in names"""
+    tree_build = TreeBuilder().create_edge
+    # the edge to the first tip is the split of all other tips
+    first_tip = (1 << len(names)) - 2
+    splits = splits.copy()
+    first_params = splits.pop(first_tip, {})
+    nodes = _build_clades(splits, names, tree_build)
+    children = [nodes[m] for m in sorted(nodes)]
+    children.insert(0, tree_build([], names[0], first_params))
+    tree = tree_build(children, "root", {})
+    # Balance the tree for the sake of reproducibility
+    return tree.balanced()
 
 
 def get_tree(splits):
@@ -245,51 +299,15 @@ def get_tree(splits):
     The dict values should be dicts appropriate for the params input to
     TreeBuilder.create_edge.
     """
-    Edge = TreeBuilder().create_edge
-
-    # Create a star from the tips
-    tips = []
-    the_rest = []
-    for split, params in list(splits.items()):
-        small, big = sorted(split, key=len)
-        if len(small) == 1:
-            for name in small:
-                tip = Edge(None, name, params)
-            tip.Split = small
-            tips.append(tip)
-        else:
-            the_rest.append((split, params))
-    tree = Edge(tips, "root", {})
-
-    # Add the rest of the splits, one by one
-    def addHalfSplit(edge, half, params):
-        included = []
-        test_half = frozenset([])
-        for child in edge.children:
-            if child.Split > half:  # This is not the droid you are looking for
-                return addHalfSplit(child, half, params)
-            if child.Split <= half:
-                included.append(child)
-                test_half = test_half.union(child.Split)
-
-        if test_half == half:  # Found it
-            split = Edge(included, None, params)
-            split.Split = half
-            for moved in included:
-                edge.remove_node(moved)
-            edge.append(split)
-            return True
-
-        return False
-
-    for split, params in the_rest:
+    names = sorted(frozenset().union(*next(iter(splits))))
+    tip_masks = _tip_masks(names)
+    masks = {}
+    for split, params in splits.items():
         for half in split:
-            if addHalfSplit(tree, half, params):
+            if names[0] not in half:
+                masks[sum(tip_masks[n] for n in half)] = params
                 break
-
-    # Balance the tree for the sake of reproducibility
-    tree = tree.balanced()
-    return tree
+    return _tree_from_split_masks(masks, names)
 
 
 if __name__ == "__main__":
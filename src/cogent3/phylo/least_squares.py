@@ -41,6 +41,86 @@ def _ancestry2paths(A):
     return numpy.array(paths)
 
 
+def _triangular_to_square(values, num):
+    """symmetric num x num matrix, with zero diagonal, from 1D triangular
+    form"""
+    (second, first) = numpy.tril_indices(num, -1)
+    result = numpy.zeros((num, num))
+    result[second, first] = values
+    return result + result.T
+
+
+class _WLSTreeScorer(object):
+    """(err, lengths) for ancestry matrices, picklable so trees can be scored
+    in parallel"""
+
+    def __init__(self, dists, weights):
+        # dists and weights are 1D forms of triangular tip x tip matrices
+        # The order of the tip-to-tip paths is the same for dists, weights and
+        # A
+        self.dists = dists
+        self.weights = weights
+        num = int(round((1 + numpy.sqrt(1 + 8 * len(dists))) / 2))
+        self._dists = _triangular_to_square(dists, num)
+        self._weights = _triangular_to_square(weights, num)
+        self._weights_dists = self._weights * self._dists
+
+    def __call__(self, ancestry, lengths=None):
+        if lengths is None:
+            return self.evaluate_many([ancestry])[0]
+        A = _ancestry2paths(ancestry)
+        diffs = numpy.dot(A, lengths) - self.dists
+        err = numpy.sum(diffs ** 2)
+        return (err, lengths)
+
+    def evaluate_many(self, ancestries):
+        """[(err, lengths), ...] for ancestry matrices of the same size,
+        fitted with one stacked solve
+
+        Notes
+        -----
+        The normal equations are formed from the tip x edge matrix D, D[i, e]
+        iff tip i is below edge e, without the path x edge matrix. Summed
+        over paths, the weights of those crossing edges e and f are
+        r[e] - G[e, f] if f is an ancestor of e and G[e, f] if neither is an
+        ancestor of the other, where G = D' W D and r = D' W 1 for the square
+        weights matrix W.
+        """
+        A = numpy.array(ancestries)
+        num_trees = A.shape[0]
+        # tips are the edges that are only their own ancestor, the number of
+        # edges per tip varies with polytomies
+        is_tip = A.sum(axis=1) == 1
+        num_tips = is_tip.sum(axis=1)
+        if (num_tips != len(self._dists)).any():
+            raise ValueError(f"ancestries must have {len(self._dists)} tips")
+        tips = numpy.nonzero(is_tip)[1].reshape(num_trees, len(self._dists))
+        trees = numpy.arange(num_trees)[:, numpy.newaxis]
+        D = A[trees, tips].astype(float)
+        Dt = D.transpose(0, 2, 1)
+
+        DtW = numpy.matmul(Dt, self._weights)
+        G = numpy.matmul(DtW, D)
+        r = DtW.sum(axis=2)
+        ancestor = A.astype(bool)
+        X = numpy.where(
+            ancestor,
+            r[:, :, numpy.newaxis] - G,
+            numpy.where(ancestor.transpose(0, 2, 1), r[:, numpy.newaxis, :] - G, G),
+        )
+        DtWD = numpy.matmul(Dt, self._weights_dists)
+        y = DtWD.sum(axis=2) - (DtWD * Dt).sum(axis=2)
+        lengths = solve_linear_equations(X, y[..., numpy.newaxis])[..., 0]
+        lengths = numpy.maximum(lengths, 0.0)
+
+        # tip to tip distances from the fitted lengths
+        below = numpy.matmul(D, lengths[..., numpy.newaxis])
+        shared = numpy.matmul(D * lengths[:, numpy.newaxis, :], Dt)
+        fitted = below + below.transpose(0, 2, 1) - 2 * shared
+        errs = numpy.sum((fitted - self._dists) ** 2, axis=(1, 2)) / 2
+        return list(zip(errs, lengths))
+
+
 class WLS(TreeEvaluator):
     """(err, best_tree) = WLS(dists).trex()"""
 
@@ -63,33 +143,7 @@ class WLS(TreeEvaluator):
     def make_tree_scorer(self, names):
         dists = distance_dict_and_names_to_1D(self.dists, names)
         weights = distance_dict_and_names_to_1D(self.weights, names)
-        # dists and weights are 1D forms of triangular tip x tip matrices
-        # The order of the tip-to-tip paths is the same for dists, weights and
-        # A
-        weights_dists = weights * dists
-
-        def evaluate(
-            ancestry,
-            lengths=None,
-            sum=sum,
-            _ancestry2paths=_ancestry2paths,
-            dot=numpy.dot,
-            maximum=numpy.maximum,
-            transpose=numpy.transpose,
-            solve=solve_linear_equations,
-        ):
-            A = _ancestry2paths(ancestry)
-            if lengths is None:
-                At = transpose(A)
-                X = dot(weights * At, A)
-                y = dot(At, weights_dists)
-                lengths = solve(X, y)
-                lengths = maximum(lengths, 0.0)
-            diffs = dot(A, lengths) - dists
-            err = sum(diffs ** 2)
-            return (err, lengths)
-
-        return evaluate
+        return _WLSTreeScorer(dists, weights)
 
     def result2output(self, err, ancestry, lengths, names):
         return (err, ancestry2tree(ancestry, lengths, names))
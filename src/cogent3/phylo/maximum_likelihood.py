@@ -17,6 +17,41 @@ __email__ = "pm67nz@gmail.com"
 __status__ = "Production"
 
 
+def _fake_wls(ancestry):
+    return (None, None)
+
+
+def _fake_wls_scorer(names):
+    return _fake_wls
+
+
+class _MLTreeScorer(object):
+    """(err, annotated_tree) for ancestry matrices, picklable so trees can be
+    scored in parallel"""
+
+    def __init__(self, lf_factory, alignment, wls_eval, names, opt_args):
+        self.lf_factory = lf_factory
+        self.alignment = alignment
+        self.wls_eval = wls_eval
+        self.names = names
+        self.opt_args = opt_args
+
+    def __call__(self, ancestry, lengths=None):
+        if lengths is None:
+            (wls_err, init_lengths) = self.wls_eval(ancestry)
+        else:
+            init_lengths = lengths
+        tree = ancestry2tree(ancestry, init_lengths, self.names)
+        lf = self.lf_factory(tree)
+        lf.set_alignment(self.alignment)
+        if lengths is not None:
+            lf.set_param_rule("length", is_constant=True)
+        lf.optimise(show_progress=False, **self.opt_args)
+        err = -1.0 * lf.get_log_likelihood()
+        tree = lf.get_annotated_tree()
+        return (err, tree)
+
+
 class ML(TreeEvaluator):
     """(err, best_tree) = ML(model, alignment, [dists]).trex()
 
@@ -30,14 +65,13 @@ class ML(TreeEvaluator):
         self.names = alignment.names
         self.alignment = alignment
         if hasattr(model, "make_likelihood_function"):
-            self.lf_factory = lambda tree: model.make_likelihood_function(tree)
+            self.lf_factory = model.make_likelihood_function
         else:
             self.lf_factory = model
         if dists:
             self.wlsMakeTreeScorer = WLS(dists).make_tree_scorer
         else:
-            fake_wls = lambda a: (None, None)
-            self.wlsMakeTreeScorer = lambda n: fake_wls
+            self.wlsMakeTreeScorer = _fake_wls_scorer
 
     def evaluate_tree(self, tree):
         names = tree.get_tip_names()
@@ -49,23 +83,7 @@ class ML(TreeEvaluator):
     def make_tree_scorer(self, names):
         subalign = self.alignment.take_seqs(names)
         wls_eval = self.wlsMakeTreeScorer(names)
-
-        def evaluate(ancestry, lengths=None):
-            if lengths is None:
-                (wls_err, init_lengths) = wls_eval(ancestry)
-            else:
-                init_lengths = lengths
-            tree = ancestry2tree(ancestry, init_lengths, names)
-            lf = self.lf_factory(tree)
-            lf.set_alignment(subalign)
-            if lengths is not None:
-                lf.set_param_rule("length", is_constant=True)
-            lf.optimise(show_progress=False, **self.opt_args)
-            err = -1.0 * lf.get_log_likelihood()
-            tree = lf.get_annotated_tree()
-            return (err, tree)
-
-        return evaluate
+        return _MLTreeScorer(self.lf_factory, subalign, wls_eval, names, self.opt_args)
 
     def result2output(self, err, ancestry, annotated_tree, names):
         return (-1.0 * err, annotated_tree)
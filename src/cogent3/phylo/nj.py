@@ -290,3 +290,67 @@ def nj(dists, show_progress=True):
     (result,) = gnj(dists, keep=1, show_progress=show_progress)
     (score, tree) = result
     return tree
+
+
+@UI.display_wrap
+def fast_nj(dists, ui=None):
+    """neighbour joining tree from a condensed distance matrix
+
+    Parameters
+    ----------
+    dists
+        a CondensedDistanceMatrix, or a DistanceMatrix which is converted to one
+
+    Returns
+    -------
+    PhyloNode, unrooted with 3 children at the root
+
+    Notes
+    -----
+    Unlike gnj, which keeps the distances as a square array and copies it at
+    every join, this updates the condensed distances in place and maintains
+    the row sums incrementally, so memory is n(n-1)/2 values and each join
+    costs O(n^2) with small constants. Use gnj when alternate trees are
+    required. Negative branch lengths are set to 0.0.
+    """
+    from cogent3.phylo.nj_numba import (
+        condensed_index,
+        join_pair,
+        min_join_pair,
+        row_sums,
+    )
+
+    if hasattr(dists, "to_condensed"):
+        dists = dists.to_condensed()
+
+    names = list(dists.names)
+    num = len(names)
+    if num < 3:
+        raise ValueError(f"{num} names is too few to build a tree")
+
+    # working copy, the distances are overwritten as nodes are joined
+    work = numpy.array(dists.dists, dtype=float)
+    sums = row_sums(work, num)
+    active = numpy.arange(num)
+    constructor = TreeBuilder().create_edge
+    nodes = [constructor([], name, {}) for name in names]
+    for size in range(num, 3, -1):
+        ui.display(msg=f" size {size}/{num}", progress=(num - size) / (num - 3))
+        i, j = min_join_pair(work, num, active, sums)
+        dist_ij = work[condensed_index(i, j, num)]
+        diff = (sums[i] - sums[j]) / (size - 2.0)
+        nodes[i].length = max(0.0, 0.5 * (dist_ij + diff))
+        nodes[j].length = max(0.0, 0.5 * (dist_ij - diff))
+        join_pair(work, num, active, sums, i, j)
+        nodes[i] = constructor([nodes[i], nodes[j]], None, {})
+        nodes[j] = None
+        active = active[active != j]
+
+    a, b, c = active
+    dist_ab = work[condensed_index(a, b, num)]
+    dist_ac = work[condensed_index(a, c, num)]
+    dist_bc = work[condensed_index(b, c, num)]
+    nodes[a].length = max(0.0, 0.5 * (dist_ab + dist_ac - dist_bc))
+    nodes[b].length = max(0.0, 0.5 * (dist_ab + dist_bc - dist_ac))
+    nodes[c].length = max(0.0, 0.5 * (dist_ac + dist_bc - dist_ab))
+    return constructor([nodes[a], nodes[b], nodes[c]], "root", {})
@@ -0,0 +1,86 @@
+import numpy
+
+from numba import njit, prange
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.7.2a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "Gavin.Huttley@anu.edu.au"
+__status__ = "Production"
+
+
+@njit(cache=True)
+def condensed_index(i, j, num):
+    """returns the position of (i, j) in a condensed distance vector"""
+    if i > j:
+        i, j = j, i
+    return i * num - i * (i + 1) // 2 + j - i - 1
+
+
+@njit(cache=True)
+def row_sums(dists, num):
+    """returns the sum of each row of the square matrix for condensed dists"""
+    result = numpy.zeros(num)
+    pos = 0
+    for i in range(num - 1):
+        for j in range(i + 1, num):
+            result[i] += dists[pos]
+            result[j] += dists[pos]
+            pos += 1
+    return result
+
+
+@njit(parallel=True, cache=True)
+def min_join_pair(dists, num, active, sums):
+    """returns the pair of active nodes minimising the neighbour joining
+    criterion
+
+    Parameters
+    ----------
+    dists
+        condensed distances between num nodes
+    active
+        increasing indices of the nodes still to be joined
+    sums
+        row sums of the distances between active nodes
+    """
+    size = active.shape[0]
+    denom = size - 2.0
+    best = numpy.full(size, numpy.inf)
+    best_j = numpy.zeros(size, dtype=numpy.int64)
+    for a in prange(size - 1):
+        i = active[a]
+        start = i * num - i * (i + 1) // 2 - i - 1
+        row_sum = sums[i]
+        for b in range(a + 1, size):
+            j = active[b]
+            score = dists[start + j] - (row_sum + sums[j]) / denom
+            if score < best[a]:
+                best[a] = score
+                best_j[a] = j
+    a = numpy.argmin(best)
+    return active[a], best_j[a]
+
+
+@njit(cache=True)
+def join_pair(dists, num, active, sums, i, j):
+    """replaces node i with the join of nodes i and j, updating the
+    distances and row sums of the active nodes"""
+    dist_ij = dists[condensed_index(i, j, num)]
+    total = 0.0
+    for k in active:
+        if k == i or k == j:
+            continue
+        ik = condensed_index(i, k, num)
+        dist_ik = dists[ik]
+        dist_jk = dists[condensed_index(j, k, num)]
+        dist_uk = 0.5 * (dist_ik + dist_jk - dist_ij)
+        dists[ik] = dist_uk
+        sums[k] += dist_uk - dist_ik - dist_jk
+        total += dist_uk
+    sums[i] = total
+    sums[j] = 0.0
@@ -0,0 +1,119 @@
+"""Distances between trees with the same tips."""
+from functools import partial
+
+import numpy
+
+from cogent3.phylo.consensus import _split_masks, _tip_masks
+from cogent3.util import parallel as PAR
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.7.2a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "Gavin.Huttley@anu.edu.au"
+__status__ = "Production"
+
+# maximum number of elements in the tree by split matrix blocks
+_BLOCK_ELEMENTS = 2 ** 24
+
+
+def _nontrivial_splits(tree, tip_masks):
+    """returns the non-trivial splits of the unrooted tree as bitmasks"""
+    names = tree.get_tip_names()
+    if len(names) != len(tip_masks) or not all(n in tip_masks for n in names):
+        raise ValueError("all trees must have the same tips")
+    all_tips = (1 << len(tip_masks)) - 1
+    first_tip = all_tips ^ 1
+    return [
+        split
+        for split in _split_masks(tree, tip_masks)
+        if split & (split - 1) and split != first_tip
+    ]
+
+
+def rf_distance_matrix(
+    trees, names=None, normalise=False, parallel=False, max_workers=None
+):
+    """returns the Robinson-Foulds distances between all pairs of trees
+
+    Parameters
+    ----------
+    trees
+        series of trees, all with the same tips and treated as unrooted
+    names
+        labels for the trees, defaults to their positions as strings
+    normalise
+        if True, distances are divided by the total number of non-trivial
+        splits in the two trees
+    parallel
+        whether the splits of each tree are computed in parallel
+    max_workers
+        maximum number of parallel workers
+
+    Returns
+    -------
+    DistanceMatrix of the number of splits present in only one of each pair
+
+    Notes
+    -----
+    Splits are encoded once per tree as integer bitmasks over a shared tip
+    order. Each distinct split is assigned a column of a tree by split
+    indicator matrix, whose product with its transpose gives the numbers of
+    shared splits. Splits in only one tree, or in all trees, contribute
+    nothing to the differences so are excluded from the product.
+    """
+    from cogent3.evolve.fast_distance import DistanceMatrix
+    from cogent3.util.dict_array import DictArrayTemplate
+
+    trees = list(trees)
+    num = len(trees)
+    if num < 2:
+        raise ValueError("at least 2 trees are required")
+    if names is None:
+        names = [str(i) for i in range(num)]
+    elif len(names) != num:
+        raise ValueError(f"{len(names)} names != {num} trees")
+
+    tip_masks = _tip_masks(trees[0].get_tip_names())
+    get_splits = partial(_nontrivial_splits, tip_masks=tip_masks)
+    if parallel:
+        split_sets = PAR.map(get_splits, trees, max_workers=max_workers)
+    else:
+        split_sets = [get_splits(tree) for tree in trees]
+
+    # hash each split to an integer column
+    columns = {}
+    rows, cols = [], []
+    for row, splits in enumerate(split_sets):
+        rows.extend([row] * len(splits))
+        cols.extend(columns.setdefault(split, len(columns)) for split in splits)
+    rows = numpy.array(rows, dtype=numpy.int64)
+    cols = numpy.array(cols, dtype=numpy.int64)
+    sizes = numpy.array([len(s) for s in split_sets], dtype=float)
+
+    counts = numpy.bincount(cols, minlength=len(columns))
+    shared = numpy.zeros((num, num), dtype=float)
+    shared += (counts == num).sum()
+    informative = (counts > 1) & (counts < num)
+    new_cols = numpy.cumsum(informative) - 1
+    keep = informative[cols]
+    rows, cols = rows[keep], new_cols[cols[keep]]
+    order = numpy.argsort(cols, kind="stable")
+    rows, cols = rows[order], cols[order]
+
+    width = max(_BLOCK_ELEMENTS // num, 1)
+    for start in range(0, informative.sum(), width):
+        lo, hi = numpy.searchsorted(cols, [start, start + width])
+        block = numpy.zeros((num, width), dtype=numpy.float32)
+        block[rows[lo:hi], cols[lo:hi] - start] = 1
+        shared += block @ block.T
+
+    dists = sizes[:, None] + sizes[None, :] - 2 * shared
+    if normalise:
+        total = sizes[:, None] + sizes[None, :]
+        dists = numpy.divide(dists, total, out=numpy.zeros_like(dists), where=total > 0)
+    numpy.fill_diagonal(dists, 0)
+    return DistanceMatrix(DictArrayTemplate(names, names).wrap(dists))
@@ -2,6 +2,8 @@
 
 import itertools
 
+from functools import partial
+
 import numpy
 
 from cogent3.core.tree import TreeBuilder
@@ -20,6 +22,10 @@ __email__ = "pm67nz@gmail.com"
 __status__ = "Production"
 
 
+# bounds the number of candidate trees scored together
+_BATCH_WORK = 2 ** 21
+
+
 def ismallest(data, size):
     """There are many ways to get the k smallest items from an N sequence, and
     which one performs best depends on k, N and k/N.  This algorithm appears to
@@ -125,8 +131,33 @@ def grown(B, split_edge):
     return A
 
 
+def _score_grown(evaluate, spec):
+    """(err, tree_ordinal, split_edge, lengths, ancestry) for the tree grown
+    from the ancestry in spec. Module level so it can be sent to workers."""
+    (tree_ordinal, old_ancestry, split_edge) = spec
+    ancestry = grown(old_ancestry, split_edge)
+    (err, lengths) = evaluate(ancestry)
+    return (err, tree_ordinal, split_edge, lengths, ancestry)
+
+
+def _score_grown_many(evaluate_many, specs):
+    """as for _score_grown, for a list of specs scored together"""
+    ancestries = [
+        grown(old_ancestry, split_edge) for (_, old_ancestry, split_edge) in specs
+    ]
+    return [
+        (err, tree_ordinal, split_edge, lengths, ancestry)
+        for ((tree_ordinal, _, split_edge), ancestry, (err, lengths)) in zip(
+            specs, ancestries, evaluate_many(ancestries)
+        )
+    ]
+
+
 class TreeEvaluator(object):
-    """Subclass must provide make_tree_scorer and result2output"""
+    """Subclass must provide make_tree_scorer and result2output. For parallel
+    evaluation the scorers from make_tree_scorer must be picklable. Scorers
+    with an evaluate_many method, taking a list of same sized ancestry
+    matrices, are given the candidates in batches."""
 
     def results2output(self, results):
         return ScoredTreeCollection(results)
@@ -171,6 +202,8 @@ class TreeEvaluator(object):
         return_all=False,
         filename=None,
         interval=None,
+        parallel=False,
+        par_kw=None,
         show_progress=False,
         ui=None,
     ):
@@ -180,6 +213,11 @@ class TreeEvaluator(object):
         'start' is an optional list of initial trees.  Each of the trees must
         contain the same tips.
         'filename' and 'interval' control checkpointing.
+        'parallel' scores the candidate trees of each size in a process pool,
+        'par_kw' being passed to cogent3.util.parallel.imap. The scorer from
+        make_tree_scorer, and so the alignment or distances, is sent once per
+        chunk of candidates. Results arrive in the serial order, so the trees
+        kept are the same as for a serial run.
 
         Advanced step-wise addition algorithm
         M. J. Wolf, S. Easteal, M. Kahn, B. D. McKay, and L. S. Jermiin.
@@ -244,19 +282,19 @@ class TreeEvaluator(object):
         # For each tree size, grow at each edge of each tree. Keep best k.
         for n in range(init_tree_size + 1, tree_size + 1):
             evaluate = self.make_tree_scorer(names[:n])
-
-            def grown_tree(spec):
-                (tree_ordinal, tree, split_edge) = spec
-                (old_err, old_lengths, old_ancestry) = tree
-                ancestry = grown(old_ancestry, split_edge)
-                (err, lengths) = evaluate(ancestry)
-                return (err, tree_ordinal, split_edge, lengths, ancestry)
-
             specs = [
-                (i, tree, edge)
-                for (i, tree) in enumerate(trees)
+                (i, ancestry, edge)
+                for (i, (err, lengths, ancestry)) in enumerate(trees)
                 for edge in range(n * 2 - 5)
             ]
+            evaluate_many = getattr(evaluate, "evaluate_many", None)
+            if evaluate_many is None:
+                grown_tree = partial(_score_grown, evaluate)
+            else:
+                # batches with a bounded amount of work, which is O(n**3)
+                size = max(_BATCH_WORK // n ** 3, 1)
+                specs = [specs[i : i + size] for i in range(0, len(specs), size)]
+                grown_tree = partial(_score_grown_many, evaluate_many)
 
             candidates = ui.imap(
                 grown_tree,
@@ -264,7 +302,11 @@ class TreeEvaluator(object):
                 noun=("%s leaf tree" % n),
                 start=work_done[n - 1] / total_work,
                 end=work_done[n] / total_work,
+                parallel=parallel,
+                par_kw=par_kw,
             )
+            if evaluate_many is not None:
+                candidates = itertools.chain.from_iterable(candidates)
 
             best = ismallest(candidates, k)
 
@@ -49,6 +49,8 @@ def deserialise_tabular(data):
         array = data.pop("array")
         template = klass(*named_dims)
         result = template.wrap(array)
+    elif "condensed" in type_.lower():
+        result = klass(**data)
     else:  # DistanceMatrix
         # dists is a list of simple dists from which we reconstruct a 1D dict
         dists = {}
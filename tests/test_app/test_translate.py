@@ -72,6 +72,12 @@ class TestTranslatable(TestCase):
         ex["rc"] = data["a"]
         self.assertEqual(tr.to_dict(), ex)
 
+        # sequences shorter than a codon are excluded
+        seqs = make_unaligned_seqs(data=dict(a=data["a"], b="AT"), moltype=DNA)
+        tr = select_translatable(allow_rc=False)(seqs)
+        self.assertEqual(tr.names, ["a"])
+        self.assertEqual(tr.info["translation_errors"][0][0], "b")
+
         # if seqs not translatable returns NotCompletedResult
         data = dict(a="TAATTGATTAA", b="GCAGTTTATTA")
         seqs = make_unaligned_seqs(data=data, moltype=DNA)
@@ -14,7 +14,9 @@ from cogent3.cluster.UPGMA import (
     condense_node_order,
     find_smallest_index,
     inputs_from_dict_array,
+    nn_chain_merges,
     upgma,
+    upgma_condensed,
 )
 from cogent3.core.tree import PhyloNode
 from cogent3.util.dict_array import DictArray, DictArrayTemplate, convert2DDict
@@ -177,6 +179,51 @@ class UPGMATests(TestCase):
         assert_allclose(matrix_array[0][2], 0.92)
         assert_allclose(matrix_array[1][0], 0.86)
 
+    def test_nn_chain_merges(self):
+        """nearest neighbour chain finds the UPGMA merges"""
+        dists = self.matrix[numpy.triu_indices(5, k=1)]
+        got = sorted(nn_chain_merges(dists, 5), key=lambda x: x[-1])
+        self.assertEqual(got, [(0, 1, 1.0), (3, 4, 2.0), (0, 2, 4.5), (0, 3, 16.25)])
+        with self.assertRaises(ValueError):
+            nn_chain_merges(dists[:-1], 5)
+
+    def test_upgma_condensed(self):
+        """upgma_condensed matches upgma"""
+        from cogent3.evolve.fast_distance import CondensedDistanceMatrix
+
+        names = list("abcde")
+        dists = self.matrix[numpy.triu_indices(5, k=1)]
+        got = upgma_condensed(dists, names)
+        self.assertEqual(
+            str(got),
+            "(((a:0.5,b:0.5)edge.1:1.75,c:2.25)edge.0:5.875,(d:1.0,e:1.0)edge.2:7.125)root;",
+        )
+        got = upgma(CondensedDistanceMatrix(names, dists))
+        self.assertEqual(
+            str(got),
+            "(((a:0.5,b:0.5)edge.1:1.75,c:2.25)edge.0:5.875,(d:1.0,e:1.0)edge.2:7.125)root;",
+        )
+
+        rng = numpy.random.RandomState(3)
+        names = [f"t{i}" for i in range(20)]
+        matrix = rng.random_sample((20, 20))
+        matrix += matrix.T
+        pairwise = {
+            (n1, n2): matrix[i, j]
+            for i, n1 in enumerate(names)
+            for j, n2 in enumerate(names)
+            if i != j
+        }
+        expect = upgma(pairwise)
+        got = upgma_condensed(matrix[numpy.triu_indices(20, k=1)], names)
+        self.assertTrue(got.same_topology(expect))
+        expect = expect.get_distances()
+        got = got.get_distances()
+        for pair in expect:
+            assert_allclose(got[pair], expect[pair])
+        with self.assertRaises(ValueError):
+            upgma_condensed([], ["a"])
+
 
 # run if called from command line
 if __name__ == "__main__":
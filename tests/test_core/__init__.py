@@ -13,6 +13,7 @@ __all__ = [
     "test_moltype",
     "test_profile",
     "test_sequence",
+    "test_sketch",
     "test_tree",
 ]
 
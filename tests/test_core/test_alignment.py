@@ -183,6 +183,27 @@ class alignment_tests(TestCase):
         self.assertRaises(ValueError, aln_from_empty, "xyz")
 
 
+def _pairwise_identical_sets(seqs, names):
+    """reference implementation of masked comparison of all pairs"""
+    canonical = set("ACGT")
+    result = []
+    seen = set()
+    for i, n1 in enumerate(names):
+        if n1 in seen:
+            continue
+        group = set()
+        for n2 in names[i + 1 :]:
+            if n2 in seen:
+                continue
+            s1, s2 = seqs[n1], seqs[n2]
+            if all(a == b for a, b in zip(s1, s2) if a in canonical and b in canonical):
+                seen.add(n2)
+                group.update([n1, n2])
+        if group:
+            result.append(group)
+    return frozenset(frozenset(g) for g in result)
+
+
 class SequenceCollectionBaseTests(object):
     """base class for testing the SequenceCollection object.
 
@@ -572,6 +593,17 @@ class SequenceCollectionBaseTests(object):
         # should be able to negate
         self.assertEqual(srp.take_seqs_if(is_med, negate=True), {"b": "AAA---"})
 
+    def test_comparison(self):
+        """collections are ordered by their str"""
+        first = self.Class(data={"a": "AC", "b": "GG"}, moltype=DNA)
+        second = self.Class(data={"a": "AC", "b": "GT"}, moltype=DNA)
+        self.assertTrue(first <= second)
+        self.assertTrue(second > first)
+        self.assertFalse(first > second)
+        self.assertTrue(first <= first)
+        self.assertFalse(first > first)
+        self.assertFalse(first != first)
+
     def test_get_identical_sets(self):
         """correctly identify sets of identical sequences"""
         # for DNA
@@ -639,6 +671,41 @@ class SequenceCollectionBaseTests(object):
         got = frozenset(frozenset(s) for s in got)
         self.assertEqual(got, expect)
 
+    def test_get_identical_sets_many(self):
+        """identical sets from binning match pairwise comparisons"""
+        rng = numpy.random.RandomState(11)
+        bases = numpy.array(list("ACGT"))
+        templates = ["".join(rng.choice(bases, 12)) for _ in range(4)]
+        data = {}
+        for i in range(40):
+            seq = list(templates[i % 4])
+            for pos in rng.choice(12, rng.randint(0, 3), replace=False):
+                seq[pos] = rng.choice(list("N-RY"))
+            data[f"s{i}"] = "".join(seq)
+        seqs = self.Class(data=data, moltype=DNA)
+        got = seqs.get_identical_sets(mask_degen=True)
+        got = frozenset(frozenset(s) for s in got)
+        self.assertEqual(got, _pairwise_identical_sets(data, seqs.names))
+        # no name occurs in more than one set
+        self.assertEqual(sum(map(len, got)), len(set().union(*got)))
+
+    def test_get_identical_sets_scattered(self):
+        """identical sets are found when degenerate characters are in most
+        columns"""
+        rng = numpy.random.RandomState(7)
+        templates = rng.choice(list("ACGT"), size=(5, 60))
+        data = {}
+        for i in range(50):
+            seq = templates[i % 5].copy()
+            seq[rng.random_sample(60) < 0.1] = "N"
+            seq[rng.randint(60)] = "-"
+            data[f"s{i}"] = "".join(seq)
+        seqs = self.Class(data=data, moltype=DNA)
+        got = seqs.get_identical_sets(mask_degen=True)
+        got = frozenset(frozenset(s) for s in got)
+        self.assertEqual(got, _pairwise_identical_sets(data, seqs.names))
+        self.assertEqual(len(got), 5)
+
     def test_get_similar(self):
         """SequenceCollection get_similar should get all sequences close to target seq"""
         aln = self.many
@@ -1084,6 +1151,21 @@ class SequenceCollectionBaseTests(object):
         with self.assertRaises(AlphabetError):
             got = alignment.get_translation(incomplete_ok=False)
 
+    def test_get_translation_errors(self):
+        """get_translation reports the first untranslatable codon"""
+        alignment = self.Class(
+            data={"seq1": "ATGTTT", "seq2": "ATGTAA", "seq3": "ATGTG-"}, moltype=DNA
+        )
+        with self.assertRaisesRegex(AlphabetError, "TAA"):
+            alignment.get_translation(incomplete_ok=True)
+        alignment = self.Class(
+            data={"seq1": "ATGTTT", "seq2": "ATG---", "seq3": "ATGTG-"}, moltype=DNA
+        )
+        with self.assertRaisesRegex(AlphabetError, "TG-"):
+            alignment.get_translation()
+        got = alignment.get_translation(incomplete_ok=True)
+        self.assertEqual(got.to_dict(), {"seq1": "MF", "seq2": "M-", "seq3": "M?"})
+
     def test_get_seq(self):
         """SequenceCollection.get_seq should return specified seq"""
         aln = self.Class({"seq1": "GATTTT", "seq2": "GATC??"})
@@ -1468,6 +1550,24 @@ class SequenceCollectionBaseTests(object):
         e = 0.81127812445913283  # sum(p log_2 p) for p = 0.25, 0.75
         assert_allclose(entropy, array([e, 1.5]))
 
+    def test_kmer_counts(self):
+        """kmer_counts per sequence matches sequence kmer_counts"""
+        data = {"a": "AAAA??????", "b": "CCCGGG--NN", "c": "CCGGTTCCAA"}
+        coll = self.Class(data=data, moltype="dna")
+        got = coll.kmer_counts(2)
+        self.assertEqual(got.shape, (3, 16))
+        for name in coll.names:
+            expect = coll.get_seq(name).kmer_counts(2)
+            assert_equal(got[name].array, expect.array)
+        self.assertEqual(got["a", "AA"], 3)
+        self.assertEqual(got["b"].array.sum(), 5)
+        got = coll.kmer_counts(2, step=2, include_ambiguity=True)
+        self.assertEqual(got["b", "NN"], 1)
+        self.assertEqual(got["a"].array.sum(), 2)
+        got = coll.kmer_counts(9)
+        self.assertEqual(dict(got["c"]), {"CCGGTTCCA": 1, "CGGTTCCAA": 1})
+        self.assertEqual(dict(got["a"]), {})
+
     def test_write_to_json(self):
         # test writing to json file
         aln = self.Class([("a", "AAAA"), ("b", "TTTT"), ("c", "CCCC")])
@@ -2656,6 +2756,48 @@ class AlignmentBaseTests(SequenceCollectionBaseTests):
         aln = self.Class(data)
         logo = aln.seqlogo()
 
+    def test_window_stats(self):
+        """window_stats matches statistics computed per sliding window"""
+        data = {
+            "seq1": "CAGGTCGACCTCGGC---------CACGAC",
+            "seq2": "CAGATCGACCTCGGC---------CACGAC",
+            "seq3": "CAGATCGACCTCGGT---------CACGAT",
+            "seq4": "CAGATCGACCTCGGCGAACACGGCCATGAT",
+            "seq5": "CCGATCGACATGGGCN--------CACGAT",
+        }
+        aln = self.Class(data, moltype=DNA)
+        got = aln.window_stats(10, 4)
+        windows = list(aln.sliding_windows(10, 4))
+        self.assertEqual(got.shape[0], len(windows))
+        for i, win in enumerate(windows):
+            counts = win.counts()
+            for base in "ACGT":
+                self.assertEqual(got[i, base], counts[base])
+            gc = (counts["G"] + counts["C"]) / counts.array.sum()
+            assert_allclose(got[i, "gc"], gc)
+            gaps = win.count_gaps_per_pos().array.sum()
+            assert_allclose(got[i, "gap_frac"], gaps / (10 * win.num_seqs))
+            entropy = win.entropy_per_pos()
+            assert_allclose(got[i, "entropy"], numpy.nanmean(entropy))
+            variable = (win.counts_per_pos().array > 0).sum(axis=1) > 1
+            self.assertEqual(got[i, "variable"], variable.sum())
+
+        got = aln.window_stats(10, 4, stats="gc", start=4, end=10)
+        self.assertEqual(got.header, ("start", "end", "gc"))
+        assert_equal(got.columns["start"], [4, 8])
+        with self.assertRaises(ValueError):
+            aln.window_stats(10, 4, stats=["gc", "other"])
+        aa = self.Class({"a": "MKLG", "b": "MKVC"}, moltype=PROTEIN)
+        with self.assertRaises(ValueError):
+            aa.window_stats(3, 1, stats="gc")
+        # the default stats exclude gc for non-nucleic moltypes
+        for moltype in (PROTEIN, "bytes"):
+            other = self.Class({"a": "MKLG", "b": "MKVC"}, moltype=moltype)
+            got = other.window_stats(3, 1)
+            self.assertNotIn("gc", got.header)
+            self.assertIn("entropy", got.header)
+            self.assertEqual(got.shape[0], 2)
+
 
 class ArrayAlignmentTests(AlignmentBaseTests, TestCase):
     Class = ArrayAlignment
@@ -2685,6 +2827,26 @@ class ArrayAlignmentTests(AlignmentBaseTests, TestCase):
 class AlignmentTests(AlignmentBaseTests, TestCase):
     Class = Alignment
 
+    def test_aligned_gap_positions(self):
+        """Aligned gap positions are consistent with the map"""
+        data = {"a": "--AC---GT-", "b": "ACGTACGTAC", "c": "A--------C"}
+        aln = self.Class(data, moltype=DNA)
+        for name, seq in data.items():
+            aligned = aln.named_seqs[name]
+            self.assertIsNotNone(aligned.gap_positions)
+            self.assertEqual(len(aligned), len(seq))
+            self.assertEqual(str(aligned), seq)
+        # sliced alignments refer to a segment of the original sequence
+        sub = aln[3:8]
+        for name, seq in data.items():
+            aligned = sub.named_seqs[name]
+            self.assertIsNotNone(aligned.gap_positions)
+            self.assertEqual(str(aligned), seq[3:8])
+        # reversed maps are not representable, but still work
+        rc = aln.named_seqs["a"].rc()
+        self.assertIsNone(rc.gap_positions)
+        self.assertEqual(str(rc), "-AC---GT--")
+
     def test_sliced_deepcopy(self):
         """correctly deep copy aligned objects in an alignment"""
 
@@ -3314,6 +3476,123 @@ class ArrayAlignmentSpecificTests(TestCase):
         coevo = aln.coevolution(segments=[(4, 6), (11, 13)], show_progress=False)
         self.assertEqual(coevo.template.names[0], [4, 5, 11, 12])
 
+    def test_site_patterns(self):
+        """site_patterns returns distinct columns, cached until data changes"""
+        data = {"a": "ACGACGACG", "b": "ACGTCGACG", "c": "ACGACGTCG"}
+        aln = ArrayAlignment(data=data, moltype="dna")
+        got = aln.site_patterns()
+        self.assertIs(aln.site_patterns(), got)
+        self.assertEqual(got.unique_columns.shape, (3, 5))
+        self.assertEqual(got.counts.sum(), len(aln))
+        assert_equal(got.unique_columns[:, got.column_index], aln.array_seqs)
+        self.assertEqual(sorted(got.counts), [1, 1, 1, 3, 3])
+        # the cached arrays are read-only
+        with self.assertRaises(ValueError):
+            got.counts[0] = 10
+        # the alignment is not frozen, in-place changes invalidate the cache
+        aln.counts_per_pos()
+        aln.array_seqs[0, 1] = aln.array_seqs[1, 3]
+        self.assertFalse(aln.is_view)
+        changed = aln.site_patterns()
+        self.assertIsNot(changed, got)
+        self.assertEqual(sorted(changed.counts), [1, 1, 1, 1, 2, 3])
+        assert_equal(changed.unique_columns[:, changed.column_index], aln.array_seqs)
+        self.assertIs(aln.site_patterns(), changed)
+        aln.array_seqs[0, 1] = aln.array_seqs[0, 4]
+        self.assertEqual(sorted(aln.site_patterns().counts), [1, 1, 1, 3, 3])
+        aln.array_seqs = aln.array_seqs[:, 1:4]
+        self.assertEqual(aln.site_patterns().counts.tolist(), [1, 1, 1])
+        # counts_per_pos is derived from the patterns
+        counts = aln.counts_per_pos()
+        self.assertEqual(counts.motifs, ("T", "C", "A", "G"))
+        self.assertEqual(
+            counts.array.tolist(), [[0, 3, 0, 0], [0, 0, 0, 3], [1, 0, 2, 0]]
+        )
+
+    def test_bootstrap_weights(self):
+        """bootstrap_weights are reproducible multinomial pattern counts"""
+        data = {"a": "ACGACGACG", "b": "ACGTCGACG", "c": "ACGACGTCG"}
+        aln = ArrayAlignment(data=data, moltype="dna")
+        weights = aln.bootstrap_weights(100, seed=3)
+        self.assertEqual(weights.shape, (100, 5))
+        assert_equal(weights.sum(axis=1), len(aln))
+        assert_equal(weights, aln.bootstrap_weights(100, seed=3))
+        # common patterns are sampled more often
+        counts = aln.site_patterns().counts
+        self.assertGreater(
+            weights[:, counts == 3].mean(), weights[:, counts == 1].mean()
+        )
+        self.assertEqual(aln[:0].bootstrap_weights(2).shape, (2, 0))
+
+    def test_slice_is_view(self):
+        """slicing, take_seqs and take_positions share data when possible"""
+        data = {"a": "ACGACGACG", "b": "ACGTCGACG", "c": "ACGACGTCG"}
+        aln = ArrayAlignment(data=data, moltype="dna")
+        self.assertFalse(aln.is_view)
+        for sub in (
+            aln[2:5],
+            aln[::3],
+            aln[4],
+            aln.take_positions(range(0, 9, 2)),
+            aln.take_seqs(["a", "c"]),
+            aln.get_sub_alignment(seqs=[1, 2], pos=[1, 2, 3]),
+        ):
+            self.assertTrue(sub.is_view)
+            self.assertTrue(numpy.shares_memory(sub.array_seqs, aln.array_seqs))
+            self.assertEqual(sub.moltype, aln.moltype)
+        self.assertEqual(aln[4].to_dict(), {"a": "C", "b": "C", "c": "C"})
+        self.assertEqual(aln[-1].to_dict(), {"a": "G", "b": "G", "c": "G"})
+        with self.assertRaises(IndexError):
+            _ = aln[9]
+
+        # views cannot modify the parent
+        sub = aln[2:5]
+        with self.assertRaises(ValueError):
+            sub.array_seqs[0, 0] = 0
+        # and are independent once copied
+        copied = sub.deepcopy()
+        self.assertFalse(copied.is_view)
+        self.assertEqual(copied.to_dict(), sub.to_dict())
+
+    def test_getitem_bool_mask(self):
+        """boolean column masks select the True positions"""
+        aln = ArrayAlignment(data={"a": "ACGTACGTG", "b": "TCGTACGTA"}, moltype="dna")
+        mask = numpy.array([True, False, True, False, False, False, False, False, True])
+        self.assertEqual(aln[mask].to_dict(), {"a": "AGG", "b": "TGA"})
+        self.assertEqual(aln[mask.tolist()].to_dict(), {"a": "AGG", "b": "TGA"})
+        # an evenly spaced selection is a view
+        mask = numpy.arange(9) % 4 == 0
+        self.assertEqual(aln[mask].to_dict(), {"a": "AAG", "b": "TAA"})
+        self.assertTrue(aln[mask].is_view)
+        self.assertEqual(aln[numpy.zeros(9, dtype=bool)].seq_len, 0)
+        with self.assertRaises(IndexError):
+            _ = aln[numpy.ones(5, dtype=bool)]
+
+    def test_take_copies_uneven(self):
+        """irregular selections copy only the selected data"""
+        data = {"a": "ACGACGACG", "b": "ACGTCGACG", "c": "ACGACGTCG"}
+        aln = ArrayAlignment(data=data, moltype="dna")
+        sub = aln.take_positions([0, 1, 5])
+        self.assertFalse(numpy.shares_memory(sub.array_seqs, aln.array_seqs))
+        self.assertEqual(sub.to_dict(), {"a": "ACG", "b": "ACG", "c": "ACG"})
+        sub = aln.take_positions([0, 1, 5], negate=True)
+        self.assertEqual(sub.to_dict(), {"a": "GACACG", "b": "GTCACG", "c": "GACTCG"})
+        sub = aln.take_seqs(["c", "a"])
+        self.assertEqual(sub.names, ["c", "a"])
+        self.assertEqual(sub.to_dict(), {"a": data["a"], "c": data["c"]})
+        sub = aln.take_seqs(["b"], negate=True)
+        self.assertEqual(sub.names, ["a", "c"])
+        with self.assertRaises(IndexError):
+            aln.take_positions([0, 20])
+
+    def test_sliding_windows_views(self):
+        """sliding_windows yields alignments sharing parent data"""
+        aln = load_aligned_seqs("data/brca1.fasta", moltype="dna", array_align=True)
+        for window in aln.sliding_windows(100, 50, end=500):
+            self.assertTrue(window.is_view)
+            self.assertEqual(len(window), 100)
+            self.assertEqual(window.num_seqs, aln.num_seqs)
+
 
 class IntegrationTests(TestCase):
     """Test for integration between regular and model seqs and alns"""
@@ -166,6 +166,89 @@ class TestAnnotations(unittest.TestCase):
         with self.assertRaises(AssertionError):
             _ = annot.copy_annotations_to(seq[:-2])
 
+    def test_annotation_index(self):
+        """annotation queries and slicing use an index kept in sync"""
+        seq = DNA.make_seq("ACGT" * 25, name="x")
+        for i in range(20):
+            seq.add_feature("gene" if i % 2 else "exon", f"f{i}", [(i * 5, i * 5 + 7)])
+        genes = seq.get_annotations_matching("gene")
+        self.assertEqual([g.name for g in genes], [f"f{i}" for i in range(1, 20, 2)])
+        self.assertEqual(
+            [a.name for a in seq.get_annotations_matching("*", name="f1*")],
+            ["f1"] + [f"f{i}" for i in range(10, 20)],
+        )
+        self.assertEqual(seq.get_annotations_matching("exon", name="f1"), [])
+        index = seq._get_annotation_index()
+        self.assertEqual(index.overlapping(9, 12), [1, 2])
+        self.assertEqual(index.overlapping(103, 110), [])
+        sub = seq[9:12]
+        self.assertEqual([a.name for a in sub.annotations], ["f1", "f2"])
+        # the index is refreshed when annotations change
+        seq.detach_annotations(genes)
+        self.assertEqual(seq.get_annotations_matching("gene"), [])
+        self.assertEqual([a.name for a in seq[9:12].annotations], ["f2"])
+        exon = seq.get_annotations_matching("exon", name="f0")[0]
+        exon.add_feature("gene", "nested", [(0, 2)])
+        got = seq.get_annotations_matching("gene", extend_query=True)
+        self.assertEqual([a.name for a in got], ["nested"])
+
+    def test_annotation_index_long_feature(self):
+        """a long feature does not hide or widen overlap queries"""
+        seq = DNA.make_seq("ACGT" * 250, name="x")
+        seq.add_feature("region", "long", [(0, 1000)])
+        for i in range(100):
+            seq.add_feature("exon", f"e{i}", [(i * 10, i * 10 + 3)])
+        index = seq._get_annotation_index()
+        self.assertEqual(index.overlapping(502, 508), [0, 51])
+        self.assertEqual(index.overlapping(995, 1000), [0])
+        expect = [
+            i
+            for i, a in enumerate(seq.annotations)
+            if a.map.start < 508 and a.map.end > 495
+        ]
+        self.assertEqual(index.overlapping(495, 508), expect)
+
+    def test_annotation_index_in_place_changes(self):
+        """the index is rebuilt after any change to the annotations"""
+        seq = DNA.make_seq("ACGT" * 25, name="x")
+        for i in range(4):
+            seq.add_feature("exon", f"e{i}", [(i * 10, i * 10 + 5)])
+        self.assertEqual(len(seq.get_annotations_matching("exon")), 4)
+        # replace an annotation in place, keeping the list length
+        other = seq.annotations[0].__class__(seq, [(50, 60)], type="gene", name="g")
+        seq.annotations[1] = other
+        self.assertEqual(seq.get_annotations_matching("gene"), [other])
+        self.assertEqual(seq._get_annotation_index().overlapping(52, 53), [1])
+        # remove then add, keeping the list length
+        seq.annotations.pop(0)
+        seq.annotations.append(other.__class__(seq, [(0, 5)], type="exon", name="new"))
+        got = seq.get_annotations_matching("exon")
+        self.assertEqual([a.name for a in got], ["e2", "e3", "new"])
+        self.assertEqual([a.name for a in seq[0:3].annotations], ["new"])
+        # the list can be rebound, or modified by other list methods
+        seq.annotations = seq.annotations[1:]
+        self.assertEqual(len(seq.get_annotations_matching("exon")), 3)
+        del seq.annotations[0]
+        seq.annotations += [other]
+        got = seq.get_annotations_matching("*")
+        self.assertEqual([a.name for a in got], ["e3", "new", "g"])
+        seq.annotations.reverse()
+        self.assertEqual(seq._get_annotation_index().overlapping(52, 53), [0])
+
+    def test_annotation_literal_pattern(self):
+        """literal patterns match the same keys as fnmatch"""
+        from fnmatch import filter as fnmatch_filter
+
+        seq = DNA.make_seq("ACGT" * 25, name="x")
+        for name in ("abc", "ABC", "Abc"):
+            seq.add_feature("Gene", name, [(0, 5)])
+        for pattern in ("abc", "ABC", "aBc"):
+            got = [a.name for a in seq.get_annotations_matching("*", name=pattern)]
+            self.assertEqual(got, fnmatch_filter(["abc", "ABC", "Abc"], pattern))
+        for pattern in ("Gene", "gene", "GENE"):
+            got = seq.get_annotations_matching(pattern)
+            self.assertEqual(len(got), len(fnmatch_filter(["Gene"], pattern)) * 3)
+
     def test_reverse_complement(self):
         """test correct translation of annotations on reverse complement."""
         aln_expecteds = {
@@ -0,0 +1,232 @@
+import os
+
+from io import StringIO
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+import numpy
+
+from numpy.testing import assert_allclose, assert_equal
+
+from cogent3 import make_tree
+from cogent3.core.array_tree import ArrayTree, LCAIndex, SubtreeExtractor
+from cogent3.core.tree import PhyloNode, TreeError, TreeNode, write_trees
+from cogent3.util.misc import open_
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.7.2a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "Gavin.Huttley@anu.edu.au"
+__status__ = "Production"
+
+
+class ArrayTreeTests(TestCase):
+    def setUp(self):
+        self.tree = make_tree(
+            treestring="((a:1,b:2)ab:3,(c:4,(d:5,e:6)de:7)cde:8,f:9);"
+        )
+        self.tree.get_node_matching_name("ab").params["support"] = 0.9
+        self.array = self.tree.to_array_tree()
+
+    def test_construction(self):
+        """arrays are in preorder and read only"""
+        names = [n.name for n in self.tree.preorder()]
+        self.assertEqual(list(self.array.names), names)
+        self.assertEqual(len(self.array), len(names))
+        self.assertEqual(self.array.num_tips, 6)
+        assert_equal(self.array.parents, [-1, 0, 1, 1, 0, 4, 4, 6, 6, 0])
+        assert_equal(self.array.sizes, [10, 3, 1, 1, 5, 1, 3, 1, 1, 1])
+        self.assertTrue(numpy.isnan(self.array.lengths[0]))
+        with self.assertRaises(ValueError):
+            self.array.lengths[1] = 2
+        with self.assertRaises(ValueError):
+            ArrayTree([-1, 2, 0], list("abc"))
+        with self.assertRaises(ValueError):
+            ArrayTree([-1, 0], list("abc"))
+
+    def test_nodes(self):
+        """node relationships"""
+        array = self.array
+        cde = array.index("cde")
+        assert_equal(array.children(cde), [array.index("c"), array.index("de")])
+        self.assertEqual(array.tip_names(cde), ["c", "d", "e"])
+        self.assertEqual(array.tip_names(), self.tree.get_tip_names())
+        assert_equal(array.descendants(cde), numpy.arange(cde, cde + 5))
+        assert_equal(array.num_children(), [3, 2, 0, 0, 2, 0, 2, 0, 0, 0])
+        self.assertEqual(array.params(array.index("ab")), {"support": 0.9})
+        with self.assertRaises(ValueError):
+            array.index("missing")
+
+    def test_traversal(self):
+        """postorder matches that of the tree"""
+        expect = [n.name for n in self.tree.postorder()]
+        self.assertEqual([self.array.names[i] for i in self.array.postorder()], expect)
+        assert_equal(self.array.depths, [0, 1, 2, 2, 1, 2, 2, 3, 3, 1])
+
+    def test_root_distances(self):
+        """sum of lengths from the root"""
+        got = self.array.root_distances()
+        for node in self.tree.preorder(include_self=False):
+            expect = node.distance(self.tree)
+            assert_allclose(got[self.array.index(node.name)], expect)
+        self.assertEqual(got[0], 0)
+
+    def test_tip_to_tip_distances(self):
+        """distances between tips match those of the tree"""
+        names = self.array.tip_names()
+        expect = self.tree.get_distances()
+        got = self.array.tip_to_tip_distances()
+        for i, name1 in enumerate(names):
+            for j, name2 in enumerate(names):
+                if i != j:
+                    assert_allclose(got[i, j], expect[name1, name2])
+        assert_equal(got.diagonal(), 0)
+
+        # a subset, in arbitrary order with duplicates
+        subset = ["e", "a", "d", "a"]
+        indices = [self.array.index(n) for n in subset]
+        sub = self.array.tip_to_tip_distances(indices)
+        order = [names.index(n) for n in subset]
+        assert_allclose(sub, got[numpy.ix_(order, order)])
+        condensed = self.array.tip_to_tip_distances(indices, condensed=True)
+        assert_allclose(condensed, sub[numpy.triu_indices(4, k=1)])
+
+        condensed = self.array.tip_to_tip_distances(condensed=True, dtype=numpy.float32)
+        self.assertEqual(condensed.dtype, numpy.float32)
+        assert_allclose(condensed, got[numpy.triu_indices(6, k=1)])
+
+        # undefined lengths
+        tree = make_tree(treestring="((a,b:2),c:1);").to_array_tree()
+        assert_equal(tree.tip_to_tip_distances(default_length=3)[0], [0, 5, 7])
+        with self.assertRaises(ValueError):
+            tree.tip_to_tip_distances([0, 2])
+
+    def test_lca_index(self):
+        """lowest common ancestors match those from the tree"""
+        index = self.tree.lca_index()
+        self.assertIsInstance(index, LCAIndex)
+        names = index.tree.names
+        nodes = {n.name: n for n in self.tree.preorder()}
+        for name1 in names[1:]:
+            for name2 in names[1:]:
+                expect = nodes[name1].last_common_ancestor(nodes[name2])
+                self.assertEqual(names[index.pairwise(name1, name2)], expect.name)
+        # vectorised over indices
+        first = numpy.arange(len(names))
+        got = index.pairwise(first, index.tree.index("d"))
+        assert_equal(got, [0, 0, 0, 0, 4, 4, 6, 7, 6, 0])
+        self.assertEqual(names[index.common_ancestor(["d", "e", "c"])], "cde")
+        self.assertEqual(names[index.common_ancestor(["a"])], "a")
+        self.assertEqual(index.common_ancestor(["a", "d"]), 0)
+
+    def test_subtree_extractor(self):
+        """sub trees match those from get_sub_tree"""
+        extractor = self.tree.subtree_extractor()
+        self.assertIsInstance(extractor, SubtreeExtractor)
+        for names in (["a", "b", "e"], ["e", "c"], ["a", "d", "f"], ["ab", "e"]):
+            expect = self.tree.get_sub_tree(names)
+            got = extractor.get_sub_tree(names)
+            self.assertIsInstance(got, PhyloNode)
+            self.assertEqual(str(got), str(expect))
+            self.assertTrue(got.same_topology(expect))
+        # params other than length are retained
+        got = extractor.get_sub_tree(["a", "b", "d", "e", "f"])
+        self.assertEqual(got.get_node_matching_name("ab").params["support"], 0.9)
+        # the original tree is unchanged
+        self.assertEqual(self.tree.get_node_matching_name("de").length, 7)
+
+        with self.assertRaises(ValueError):
+            extractor.get_sub_tree(["a", "missing"])
+        got = extractor.get_sub_tree(["a", "b", "missing"], ignore_missing=True)
+        self.assertEqual(got.get_tip_names(), ["a", "b"])
+        with self.assertRaises(TreeError):
+            extractor.get_sub_tree(["a"])
+
+    def test_round_trip(self):
+        """conversion to and from a tree is lossless"""
+        got = self.array.to_tree()
+        self.assertIsInstance(got, PhyloNode)
+        self.assertEqual(str(got), str(self.tree))
+        self.assertEqual(
+            [n.params for n in got.preorder()], [n.params for n in self.tree.preorder()]
+        )
+        tree = TreeNode(name="r", children=[TreeNode(name="a", params={"x": 1})])
+        got = tree.to_array_tree().to_tree()
+        self.assertIs(type(got), TreeNode)
+        self.assertEqual(got.children[0].params, {"x": 1})
+
+    def test_round_trip_treenode_lengths(self):
+        """lengths of TreeNode instances are kept"""
+        from cogent3.parse.tree import DndParser
+
+        tree = DndParser("((a:1,b:2)x:3,c:4);", TreeNode)
+        array = ArrayTree.from_tree(tree)
+        assert_equal(array.lengths, [numpy.nan, 3, 1, 2, 4])
+        got = array.to_tree()
+        self.assertIs(type(got), TreeNode)
+        self.assertFalse(hasattr(got, "length"))
+        self.assertEqual(
+            [n.length for n in got.preorder(include_self=False)], [3, 1, 2, 4]
+        )
+        self.assertEqual([n.params for n in got.preorder()], [{}] * 5)
+
+    def test_get_newick(self):
+        """newick strings match those from the tree"""
+        for kwargs in (
+            {},
+            dict(with_distances=True),
+            dict(with_distances=True, with_node_names=True),
+            dict(semicolon=False),
+        ):
+            self.assertEqual(
+                self.array.get_newick(**kwargs), self.tree.get_newick(**kwargs)
+            )
+        tree = make_tree(treestring="(a,'b c');")
+        self.assertEqual(tree.to_array_tree().get_newick(), tree.get_newick())
+        tree = make_tree(treestring="(a:0.123456789,b);").to_array_tree()
+        self.assertEqual(
+            tree.get_newick(with_distances=True, length_format="%.3f"),
+            "(a:0.123,b);",
+        )
+        self.assertEqual(make_tree(treestring="a;").to_array_tree().get_newick(), "a;")
+
+    def test_write_newick(self):
+        """writing newick to a file in chunks"""
+        handle = StringIO()
+        self.array.write_newick(handle, chunk_size=3)
+        self.assertEqual(handle.getvalue(), self.tree.get_newick(with_distances=True))
+
+    def test_write_newick_chunk_sizes(self):
+        """written newick matches get_newick for any chunk size"""
+        for treestring in ("a;", "(((a,b)x,c)y,(d,(e,f)z));", "((a,(b,(c,d))),e);"):
+            tree = make_tree(treestring=treestring)
+            array = tree.to_array_tree()
+            expect = array.get_newick(with_distances=True, with_node_names=True)
+            for chunk_size in (1, 2, 3, len(array) + 1):
+                writes = []
+                handle = StringIO()
+                handle.write = lambda text: writes.append(text)
+                array.write_newick(handle, with_node_names=True, chunk_size=chunk_size)
+                self.assertEqual("".join(writes), expect)
+                # one write per chunk plus the semicolon
+                self.assertEqual(len(writes), -(-len(array) // chunk_size) + 1)
+
+    def test_write_trees(self):
+        """writes one newick string per line"""
+        trees = [self.tree, make_tree(treestring="(x:1,y:2,z:3);")]
+        with TemporaryDirectory(dir=".") as dirname:
+            path = os.path.join(dirname, "trees.nwk")
+            write_trees(trees + [trees[1].to_array_tree()], path)
+            with open_(path) as infile:
+                got = [make_tree(treestring=l) for l in infile]
+        self.assertEqual(len(got), 3)
+        for tree, expect in zip(got, trees + trees[1:]):
+            self.assertEqual(str(tree), str(expect))
+
+
+if __name__ == "__main__":
+    main()
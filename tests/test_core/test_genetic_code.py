@@ -6,6 +6,7 @@ from unittest import TestCase, main
 from cogent3 import DNA, RNA
 from cogent3.core.genetic_code import (
     DEFAULT,
+    CodonTranslator,
     GeneticCode,
     GeneticCodeInitError,
     GeneticCodes,
@@ -320,6 +321,40 @@ class GeneticCodeTests(TestCase):
         self.assertEqual(
             sgc.sixframes(test_rna), ["MLT*", "C*HK", "ANI", "FMLA", "LC*H", "YVS"]
         )
+        # too short to translate
+        self.assertEqual(sgc.sixframes(RNA.make_seq("")), [""] * 6)
+        for seq in ("A", "AC"):
+            with self.assertRaises(ValueError):
+                sgc.sixframes(RNA.make_seq(seq))
+
+    def test_sixframes_many(self):
+        """sixframes_many matches sixframes applied to each sequence"""
+        sgc = GeneticCode(self.SGC)
+        seqs = ["AUGCUAACAUAAA", "", "A", "AC", "ACGNNRTTAA", "atg-TGA"]
+        seqs = [RNA.make_seq(seqs[0])] + seqs[1:]
+        got = sgc.sixframes_many(seqs)
+        self.assertEqual(got[0], ["MLT*", "C*HK", "ANI", "FMLA", "LC*H", "YVS"])
+        self.assertEqual(got[1], [""] * 6)
+        self.assertEqual(got[-1], ["MX", "X*", "X", "SX", "XH", "X"])
+        # sequences too short for sixframes have empty frames
+        self.assertEqual(got[2], [""] * 6)
+        self.assertEqual(got[3], [""] * 6)
+        for seq, frames in zip(seqs, got):
+            if len(seq) >= 3:
+                expect = sgc.sixframes(DNA.make_seq(seq, check=False))
+                self.assertEqual(frames, expect)
+
+    def test_get_codon_translator(self):
+        """codon translators are cached per alphabet and incomplete_ok"""
+        sgc = GeneticCode(self.SGC)
+        translator = sgc.get_codon_translator(DNA)
+        self.assertIsInstance(translator, CodonTranslator)
+        self.assertIs(sgc.get_codon_translator(DNA), translator)
+        self.assertIsNot(sgc.get_codon_translator(DNA, incomplete_ok=True), translator)
+        self.assertIsNot(sgc.get_codon_translator(RNA), translator)
+        aa, failed = translator.translate(translator.encode("ATGNNNTTY"))
+        self.assertEqual("".join(aa), "MXF")
+        self.assertFalse(failed.any())
 
     def test_stop_indexes(self):
         """should return stop codon indexes for a specified frame"""
@@ -2,9 +2,21 @@
 
 """Unit tests for Range, Span and Point classes.
 """
+import re
+
 from unittest import TestCase, main
 
-from cogent3.core.location import Map, Range, RangeFromString, Span
+import numpy
+
+from numpy.testing import assert_equal
+
+from cogent3.core.location import (
+    GapPositions,
+    Map,
+    Range,
+    RangeFromString,
+    Span,
+)
 
 
 __author__ = "Rob Knight"
@@ -528,6 +540,100 @@ class MapTests(TestCase):
         coords = map.get_coordinates()
         self.assertEqual(coords, spans)
 
+    def test_many_spans(self):
+        """array operations on maps with many spans match span operations"""
+        locations = [(i * 10, i * 10 + 5) for i in range(50)]
+        locations[10] = (105, 100)
+        map = Map(locations, parent_length=500)
+        self.assertEqual(len(map), 250)
+        self.assertEqual((map.start, map.end, map.reverse), (0, 495, None))
+
+        def remapped(slice_map):
+            spans = []
+            for span in slice_map.spans:
+                spans.extend(span.remap_with(map))
+            return Map(spans=spans, parent_length=500)
+
+        for slice_map in (
+            Map([(3, 60)], parent_length=250),
+            Map([(60, 3), (100, 255)], parent_length=250),
+            Map([(0, 250)], parent_length=250).inverse()[-5:40],
+        ):
+            got = map[slice_map]
+            expect = remapped(slice_map)
+            self.assertEqual(str(got), str(expect))
+            self.assertEqual(got.offsets, expect.offsets)
+            self.assertEqual(got.reverse, expect.reverse)
+
+        inverse = map.inverse()
+        self.assertEqual(len(inverse), 500)
+        self.assertEqual(inverse.parent_length, 250)
+        self.assertEqual(inverse.inverse().get_coordinates(), map.get_coordinates())
+        self.assertEqual(str(inverse.spans[:3]), "[0:5, -5-, 5:10]")
+
+        reversed = map.nucleic_reversed()
+        self.assertEqual(str(reversed.spans[:2]), "[500:495, 490:485]")
+        self.assertEqual(
+            reversed.nucleic_reversed().get_coordinates(), map.get_coordinates()
+        )
+        with self.assertRaises(ValueError):
+            (map + map).inverse()
+
+        zeroed = map[100:].zeroed()
+        self.assertEqual((zeroed.start, zeroed.parent_length), (0, 295))
+        self.assertEqual(zeroed.spans[0].start, 0)
+
+
+class GapPositionsTests(TestCase):
+    """tests of the GapPositions class"""
+
+    def test_from_gapped_seq(self):
+        """correctly records gap positions and lengths"""
+        gaps, ungapped = GapPositions.from_gapped_seq("--AC---GT-")
+        self.assertEqual(ungapped, "ACGT")
+        assert_equal(gaps.gap_pos, [0, 2, 4])
+        assert_equal(gaps.gap_lengths, [2, 3, 1])
+        self.assertEqual(len(gaps), 10)
+        self.assertEqual(gaps.gapped(ungapped), "--AC---GT-")
+        gaps, ungapped = GapPositions.from_gapped_seq("ACGT")
+        self.assertEqual(len(gaps.gap_pos), 0)
+        self.assertEqual(gaps.gapped(ungapped), "ACGT")
+        gaps, ungapped = GapPositions.from_gapped_seq("")
+        self.assertEqual(len(gaps), 0)
+
+    def test_map_conversion(self):
+        """round trips with the equivalent Map"""
+        for seq in ("--AC---GT-", "ACGT", "A-C", "----"):
+            segments = [m.span() for m in re.finditer("[^-]+", seq)]
+            expect = Map(segments, parent_length=len(seq)).inverse()
+            gaps, _ = GapPositions.from_gapped_seq(seq)
+            got = gaps.to_map()
+            self.assertEqual(str(got), str(expect))
+            self.assertEqual(len(got), len(expect))
+            back = GapPositions.from_map(expect)
+            assert_equal(back.gap_pos, gaps.gap_pos)
+            assert_equal(back.gap_lengths, gaps.gap_lengths)
+
+        # a map onto a segment of a longer parent
+        map = Map([(0, 2), (4, 6)], parent_length=6).inverse()[1:5]
+        gaps = GapPositions.from_map(map)
+        self.assertEqual((gaps.start, gaps.seq_length), (1, 2))
+        self.assertEqual(str(gaps.to_map()), str(map))
+
+        # reversed maps cannot be represented
+        with self.assertRaises(ValueError):
+            GapPositions.from_map(Map([(4, 0)], parent_length=4))
+
+    def test_coordinate_conversion(self):
+        """mapping between aligned and sequence coordinates"""
+        gaps, _ = GapPositions.from_gapped_seq("--AC---GT-")
+        assert_equal(gaps.seq_to_aligned([0, 1, 2, 3]), [2, 3, 7, 8])
+        self.assertEqual(gaps.seq_to_aligned(2), 7)
+        got = gaps.aligned_to_seq(numpy.arange(10))
+        assert_equal(got, [0, 0, 0, 1, 2, 2, 2, 2, 3, 4])
+        expect = [c == "-" for c in "--AC---GT-"]
+        assert_equal(gaps.gap_mask(), expect)
+
 
 # run the following if invoked from command-line
 if __name__ == "__main__":
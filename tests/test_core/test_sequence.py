@@ -899,6 +899,32 @@ class SequenceTests(TestCase):
         expect.update({"-": 1, "N": 1, "?": 1})
         self.assertEqual(dict(got), expect)
 
+    def test_kmer_counts(self):
+        """count overlapping k-mers, +/- ambiguities"""
+        seq = self.DNA("AACCGGTTAN-TAAC")
+        got = seq.kmer_counts(2)
+        self.assertEqual(len(got.motifs), 16)
+        expect = dict(AA=2, AC=2, CC=1, CG=1, GG=1, GT=1, TT=1, TA=2)
+        self.assertEqual({m: c for m, c in got.to_dict().items() if c}, expect)
+        # non-overlapping
+        got = seq.kmer_counts(2, step=2)
+        expect = dict(AA=2, CC=1, GG=1, TT=1)
+        self.assertEqual({m: c for m, c in got.to_dict().items() if c}, expect)
+        # ambiguities included, gaps never are
+        got = seq.kmer_counts(2, include_ambiguity=True)
+        self.assertEqual(len(got.motifs), 15 ** 2)
+        self.assertEqual(got["AN"], 1)
+        self.assertEqual(got.array.sum(), 12)
+        # large k gives counts of observed k-mers only
+        got = self.DNA("ACGTACGTACGTACG").kmer_counts(9)
+        self.assertEqual(
+            dict(got), {"ACGTACGTA": 2, "CGTACGTAC": 2, "GTACGTACG": 2, "TACGTACGT": 1}
+        )
+        got = self.DNA("NNNN").kmer_counts(2)
+        self.assertEqual(got.array.sum(), 0)
+        with self.assertRaises(ValueError):
+            seq.kmer_counts(0)
+
     def test_strand_symmetry(self):
         """correctly compute test of strand symmetry"""
         from cogent3 import get_moltype
@@ -0,0 +1,99 @@
+from unittest import TestCase, main
+
+import numpy
+
+from numpy.testing import assert_allclose, assert_equal
+
+from cogent3 import make_aligned_seqs, make_unaligned_seqs
+from cogent3.core.sketch import MinHashSketch, min_hashes
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.7.2a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "Gavin.Huttley@anu.edu.au"
+__status__ = "Production"
+
+
+def _random_seq(rng, length):
+    return "".join(rng.choice(list("ACGT"), size=length))
+
+
+def _mutated(rng, seq, prob):
+    seq = numpy.array(list(seq))
+    changed = rng.random_sample(len(seq)) < prob
+    seq[changed] = rng.choice(list("ACGT"), size=changed.sum())
+    return "".join(seq)
+
+
+class MinHashTests(TestCase):
+    def setUp(self):
+        rng = numpy.random.RandomState(13)
+        base = _random_seq(rng, 3000)
+        self.seqs = {
+            "a": base,
+            "b": _mutated(rng, base, 0.01),
+            "c": _mutated(rng, base, 0.1),
+            "d": _random_seq(rng, 3000),
+            "e": "NNNNNNNN",
+        }
+        self.coll = make_unaligned_seqs(self.seqs, moltype="dna")
+
+    def test_min_hashes(self):
+        """signatures depend on the k-mer set and seed"""
+        codes = numpy.arange(100, dtype=numpy.uint64)
+        got = min_hashes(codes, 16)
+        self.assertEqual(got.shape, (16,))
+        self.assertEqual(got.dtype, numpy.uint32)
+        # duplicates and order don't matter
+        assert_equal(min_hashes(numpy.tile(codes[::-1], 2), 16), got)
+        self.assertFalse((min_hashes(codes, 16, seed=1) == got).all())
+        assert_equal(min_hashes([], 4), [2 ** 32 - 1] * 4)
+
+    def test_sketch(self):
+        """estimated Jaccard similarities approximate the observed"""
+        k = 12
+        sketch = self.coll.sketch(k, n_hashes=256)
+        self.assertIsInstance(sketch, MinHashSketch)
+        self.assertEqual(sketch.signatures.shape, (5, 256))
+        kmers = {
+            n: {s[i : i + k] for i in range(len(s) - k + 1)}
+            for n, s in self.seqs.items()
+        }
+        jaccard = sketch.jaccard()
+        for name in "bcd":
+            expect = len(kmers["a"] & kmers[name]) / len(kmers["a"] | kmers[name])
+            assert_allclose(jaccard["a", name], expect, atol=0.1)
+        # a sequence with no k-mers is similar to nothing
+        assert_equal(jaccard["e"].array, [0, 0, 0, 0, 1])
+
+        dists = sketch.mash_distance()
+        assert_equal(dists.array.diagonal(), 0)
+        self.assertLess(dists["a", "b"], dists["a", "c"])
+        self.assertEqual(dists["a", "d"], 1)
+        assert_equal(dists.array, dists.array.T)
+
+    def test_sketch_alignment(self):
+        """sketches of alignments match those of sequence collections"""
+        seqs = {n: s for n, s in self.seqs.items() if n in "abc"}
+        got = make_aligned_seqs(seqs, moltype="dna").sketch(10, n_hashes=32)
+        expect = make_unaligned_seqs(seqs, moltype="dna").sketch(10, n_hashes=32)
+        assert_equal(got.signatures, expect.signatures)
+
+    def test_candidate_pairs(self):
+        """LSH banding identifies similar pairs"""
+        sketch = self.coll.sketch(12, n_hashes=128)
+        self.assertEqual(sketch.candidate_pairs(32), [("a", "b")])
+        # more bands finds less similar pairs
+        got = sketch.candidate_pairs(128)
+        self.assertIn(("a", "c"), got)
+        self.assertNotIn(("a", "d"), got)
+        with self.assertRaises(ValueError):
+            sketch.candidate_pairs(3)
+
+
+if __name__ == "__main__":
+    main()
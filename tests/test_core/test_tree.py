@@ -813,6 +813,27 @@ class TreeNodeTests(TestCase):
         list(t0.traverse(self_before=False, self_after=True))
         list(t0.traverse(self_before=True, self_after=True))
 
+    def test_tip_to_tip_distances_lengths(self):
+        """TreeNode tip_to_tip_distances uses branch lengths where defined"""
+        t = DndParser("((a:1,b:2)x:3,c:4);", TreeNode)
+        dists, order = t.tip_to_tip_distances()
+        self.assertEqual([n.name for n in order], ["a", "b", "c"])
+        assert_equal(dists, [[0, 3, 8], [3, 0, 9], [8, 9, 0]])
+
+        t = DndParser("((a:1,b)x,c:4,(d:2,e:0.5):1);", TreeNode)
+        dists, order = t.tip_to_tip_distances(default_length=2)
+        self.assertEqual([n.name for n in order], ["a", "b", "c", "d", "e"])
+        assert_equal(
+            dists,
+            [
+                [0, 3, 7, 6, 4.5],
+                [3, 0, 8, 7, 5.5],
+                [7, 8, 0, 7, 5.5],
+                [6, 7, 7, 0, 2.5],
+                [4.5, 5.5, 5.5, 2.5, 0],
+            ],
+        )
+
     def test_levelorder(self):
         t = DndParser("(((A,B)C,(D,E)F,(G,H)I)J,(K,L)M)N;")
         exp = ["N", "J", "M", "C", "F", "I", "K", "L", "A", "B", "D", "E", "G", "H"]
@@ -18,6 +18,7 @@ from cogent3 import (
 )
 from cogent3.evolve.distance import EstimateDistances
 from cogent3.evolve.fast_distance import (
+    CondensedDistanceMatrix,
     DistanceMatrix,
     HammingPair,
     JC69Pair,
@@ -28,7 +29,14 @@ from cogent3.evolve.fast_distance import (
     _calculators,
     _fill_diversity_matrix,
     _hamming,
+    _hamming_from_matrices,
+    _jc69_from_matrices,
     _jc69_from_matrix,
+    _logdet,
+    _logdet_from_matrices,
+    _paralinear,
+    _paralinear_from_matrices,
+    _tn93_from_matrices,
     _tn93_from_matrix,
     available_distances,
     get_distance_calculator,
@@ -36,6 +44,7 @@ from cogent3.evolve.fast_distance import (
     seq_to_indices,
 )
 from cogent3.evolve.models import F81, HKY85, JC69
+from cogent3.evolve.pairwise_distance_numba import fill_diversity_matrices
 from cogent3.evolve.pairwise_distance_numba import (
     fill_diversity_matrix as numba_fill_diversity_matrix,
 )
@@ -133,6 +142,48 @@ class TestPair(TestCase):
         numba_fill_diversity_matrix(matrix2, s1, s2)
         assert_allclose(matrix1, matrix2)
 
+    def test_fill_diversity_matrices(self):
+        """diversity matrices for many pairs match those of single pairs"""
+        seqs = numpy.array(
+            [
+                seq_to_indices(s, self.dna_char_indices)
+                for s in ("RACGTACGTACN", "AGTGTACGTACA", "TTTTACGTAC--")
+            ]
+        )
+        rows = numpy.array([0, 0, 1])
+        cols = numpy.array([1, 2, 2])
+        matrices = numpy.zeros((3, 4, 4), float)
+        fill_diversity_matrices(matrices, seqs, rows, cols)
+        for k in range(3):
+            expect = numpy.zeros((4, 4), float)
+            _fill_diversity_matrix(expect, seqs[rows[k]], seqs[cols[k]])
+            assert_equal(matrices[k], expect)
+
+    def test_block_stats_match_pairwise(self):
+        """stats from a series of matrices match those from single matrices"""
+        calc = TN93Pair(DNA)
+        rng = numpy.random.RandomState(11)
+        matrices = rng.randint(0, 5, size=(40, 4, 4)).astype(float)
+        # identical, empty and saturated pairs are invalid for some
+        matrices[0] = numpy.diag([3.0, 2, 0, 1])
+        matrices[1] = 0
+        matrices[2] = 1 - numpy.eye(4)
+        funcs = [
+            (_hamming, _hamming_from_matrices, []),
+            (_jc69_from_matrix, _jc69_from_matrices, []),
+            (_tn93_from_matrix, _tn93_from_matrices, calc._func_args),
+            (_paralinear, _paralinear_from_matrices, []),
+            (_logdet, _logdet_from_matrices, [True]),
+            (_logdet, _logdet_from_matrices, [False]),
+        ]
+        for func, block_func, args in funcs:
+            got = numpy.array(block_func(matrices.copy(), *args)).T
+            for k, matrix in enumerate(matrices):
+                expect = [
+                    numpy.nan if v is None else v for v in func(matrix.copy(), *args)
+                ]
+                assert_allclose(got[k], expect)
+
     def test_hamming_from_matrix(self):
         """compute hamming from diversity matrix"""
         s1 = seq_to_indices("ACGTACGTAC", self.dna_char_indices)
@@ -202,6 +253,18 @@ class TestPair(TestCase):
         calc.run(self.diff_alignment, show_progress=False)
         self.assertTrue(calc.dists["s1", "s2"] != 0.2326161962)
 
+    def test_invalid_stats_tables(self):
+        """tables of stats display pairs that could not be calculated"""
+        aln = make_aligned_seqs(
+            data={"s0": "AATTT", "s1": "AAT-T", "s2": "AATTT", "s3": "AATAT"},
+            moltype=DNA,
+        )
+        calc = TN93Pair(DNA, alignment=aln)
+        calc.run(show_progress=False)
+        for table in (calc.variances, calc.stderr):
+            self.assertTrue(numpy.isnan(table["s0", "s3"]))
+            self.assertIn("nan", str(table))
+
     def test_tn93_from_matrix(self):
         """compute TN93 distances"""
         calc = TN93Pair(DNA, alignment=self.alignment)
@@ -343,7 +406,9 @@ class TestPair(TestCase):
         aln = make_aligned_seqs(data=data, moltype=DNA)
         logdet_calc = LogDetPair(moltype=DNA, alignment=aln)
         logdet_calc.run(use_tk_adjustment=True, show_progress=False)
-        self.assertEqual(logdet_calc.variances[1, 1], None)
+        # invalid values are nan in tables
+        self.assertTrue(numpy.isnan(logdet_calc.variances[1, 1]))
+        self.assertIn("nan", str(logdet_calc.variances))
 
         index = dict(list(zip("ACGT", list(range(4)))))
         J = numpy.zeros((4, 4))
@@ -494,7 +559,7 @@ class TestPair(TestCase):
         logdet_calc = LogDetPair(moltype=DNA, alignment=aln)
         logdet_calc.run(show_progress=False)
         self.assertEqual(logdet_calc.dists[1, 1], paralinear_calc.dists[1, 1])
-        self.assertEqual(paralinear_calc.variances[1, 1], logdet_calc.variances[1, 1])
+        assert_equal(paralinear_calc.variances[1, 1], logdet_calc.variances[1, 1])
 
     def test_duplicated(self):
         """correctly identifies duplicates"""
@@ -746,6 +811,171 @@ class TestDistanceMatrix(TestCase):
         self.assertEqual(set(darr.names), names)
 
 
+class TestCondensedDistanceMatrix(TestCase):
+    data = {
+        ("ABAYE2984", "Atu3667"): 0.25,
+        ("ABAYE2984", "Avin_42730"): 0.638,
+        ("ABAYE2984", "BAA10469"): None,
+        ("Atu3667", "ABAYE2984"): 0.25,
+        ("Atu3667", "Avin_42730"): 2.368,
+        ("Atu3667", "BAA10469"): 0.25,
+        ("Avin_42730", "ABAYE2984"): 0.638,
+        ("Avin_42730", "Atu3667"): 2.368,
+        ("Avin_42730", "BAA10469"): 1.85,
+        ("BAA10469", "ABAYE2984"): None,
+        ("BAA10469", "Atu3667"): 0.25,
+        ("BAA10469", "Avin_42730"): 1.85,
+    }
+
+    def test_round_trip(self):
+        """condensed matrices have the same distances as dense"""
+        dense = DistanceMatrix(self.data)
+        for dtype in (numpy.float32, numpy.float64):
+            condensed = dense.to_condensed(dtype=dtype)
+            self.assertEqual(condensed.dtype, dtype)
+            self.assertEqual(condensed.shape, dense.shape)
+            self.assertEqual(condensed.dists.shape, (6,))
+            assert_allclose(condensed.to_dense().array, dense.array, rtol=1e-6)
+            assert_allclose(condensed["Atu3667", "Avin_42730"], 2.368, rtol=1e-6)
+            assert_allclose(condensed["Atu3667"], dense.array[1], rtol=1e-6)
+            self.assertEqual(condensed["Atu3667", "Atu3667"], 0)
+        with self.assertRaises(ValueError):
+            dense.to_condensed(dtype=int)
+
+    def test_memmap(self):
+        """distances can be memory-mapped"""
+        from tempfile import TemporaryDirectory
+
+        dense = DistanceMatrix(self.data)
+        with TemporaryDirectory() as dirname:
+            path = os.path.join(dirname, "dists.dat")
+            condensed = dense.to_condensed(path=path)
+            self.assertIsInstance(condensed.dists, numpy.memmap)
+            got = condensed.take_dists("BAA10469", negate=True)
+            expect = dense.take_dists("BAA10469", negate=True)
+            assert_allclose(got.to_dense().array, expect.array)
+            del condensed
+
+    def test_take_dists_drop_invalid(self):
+        """subsets and drop_invalid match those of DistanceMatrix"""
+        dense = DistanceMatrix(self.data)
+        condensed = dense.to_condensed()
+        got = condensed.take_dists(["Avin_42730", "ABAYE2984", "Atu3667"])
+        self.assertEqual(got.names, ["ABAYE2984", "Atu3667", "Avin_42730"])
+        expect = dense.take_dists(["ABAYE2984", "Atu3667", "Avin_42730"])
+        assert_allclose(got.to_dense().array, expect.array)
+        self.assertIsNone(condensed.take_dists("Atu3667"))
+
+        got = condensed.drop_invalid()
+        self.assertEqual(got.names, ["Atu3667", "Avin_42730"])
+        assert_allclose(got.dists, [2.368])
+
+        table = condensed.to_table()
+        self.assertEqual(table.shape, (4, 5))
+        assert_allclose(table["Atu3667", "Avin_42730"], 2.368)
+
+    def test_from_calculator(self):
+        """calculators produce condensed matrices, including duplicates"""
+        aln = make_aligned_seqs(
+            data={
+                "a": "ACGTACGTAC",
+                "b": "ACGTACGTAC",
+                "c": "ACGTTCGTAA",
+                "d": "TCGTTCGAAA",
+            },
+            moltype="dna",
+        )
+        for name in ("tn93", "percent"):
+            calc = get_distance_calculator(name)
+            calc.run(aln, show_progress=False)
+            for include in (True, False):
+                dense = calc.get_pairwise_distances(include_duplicates=include)
+                got = calc.get_pairwise_distances(
+                    include_duplicates=include, condensed=True
+                )
+                self.assertEqual(list(got.names), list(dense.names))
+                assert_allclose(got.to_dense().array, dense.array)
+
+    def test_condensed_duplicates(self):
+        """condensed distances of duplicates match dense, for any dtype"""
+        aln = make_aligned_seqs(
+            data={"a": "ACGTACGTAA", "b": "ACGTNNNNAA", "c": "ACCTACCTAA"},
+            moltype="dna",
+        )
+        calc = get_distance_calculator("jc69")
+        calc.run(aln, show_progress=False)
+        self.assertEqual(calc.duplicated, {"a": ["b"]})
+        dense = calc.get_pairwise_distances()
+        for dtype in (None, numpy.float64, numpy.float32):
+            got = calc.get_pairwise_distances(condensed=True, dtype=dtype)
+            assert_allclose(got.to_dense().array, dense.array, rtol=1e-6)
+            self.assertEqual(got["a", "b"], 0)
+        assert_allclose(dense["b", "c"], dense["a", "c"])
+
+    def test_run_distances_only(self):
+        """run can store only the distances, as float32 or memory-mapped"""
+        from tempfile import TemporaryDirectory
+
+        aln = make_aligned_seqs(
+            data={
+                "a": "ACGTACGTAC",
+                "b": "ACGTACGTAC",
+                "c": "ACGTTCGTAA",
+                "d": "TCGTTCGAAA",
+            },
+            moltype="dna",
+        )
+        for name in ("tn93", "percent"):
+            calc = get_distance_calculator(name)
+            calc.run(aln, show_progress=False)
+            expect = calc.get_pairwise_distances(condensed=True).dists
+            with TemporaryDirectory() as dirname:
+                path = os.path.join(dirname, "dists.dat")
+                calc.run(aln, stats=False, dtype=numpy.float32, path=path)
+                # the distances are written to the memory-mapped file
+                self.assertEqual(os.path.getsize(path), 6 * 4)
+                got = calc.get_pairwise_distances(condensed=True)
+                self.assertEqual(got.dtype, numpy.float32)
+                assert_allclose(got.dists, expect, rtol=1e-6)
+                self.assertEqual(calc.duplicated, {"a": ["b"]})
+                dense = calc.get_pairwise_distances(include_duplicates=False)
+                self.assertEqual(dense.names, ["a", "c", "d"])
+                self.assertIsNone(calc.lengths)
+                self.assertIsNone(calc.variances)
+                self.assertIsNone(calc.stderr)
+                if name == "tn93":
+                    self.assertIsNone(calc.proportions)
+                else:
+                    self.assertIsNotNone(calc.proportions)
+                # release the memory-mapped file
+                del got
+                calc.run(aln, show_progress=False)
+
+    def test_quick_tree(self):
+        """builds a NJ tree"""
+        from cogent3 import make_tree
+
+        names = ["DogFaced", "FlyingFox", "FreeTaile", "LittleBro", "TombBat"]
+        dists = [0.05, 0.14, 0.16, 0.15, 0.12, 0.13, 0.14, 0.09, 0.1, 0.12]
+        condensed = CondensedDistanceMatrix(names, dists)
+        got = condensed.quick_tree()
+        expect = make_tree(
+            treestring="((TombBat,(DogFaced,FlyingFox)),LittleBro,FreeTaile)"
+        )
+        self.assertTrue(expect.same_topology(got))
+        self.assertEqual(condensed["FreeTaile", "FlyingFox"], 0.12)
+
+    def test_deserialise(self):
+        """round trip via json"""
+        from cogent3.util.deserialise import deserialise_object
+
+        condensed = DistanceMatrix(self.data).to_condensed(dtype=numpy.float32)
+        got = deserialise_object(condensed.to_json())
+        self.assertIsInstance(got, CondensedDistanceMatrix)
+        self.assertEqual(got.dtype, numpy.float32)
+        assert_equal(got.dists, condensed.dists)
+
+
 class DistancesTests(TestCase):
     def setUp(self):
         self.al = make_aligned_seqs(
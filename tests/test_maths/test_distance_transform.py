@@ -536,6 +536,29 @@ class functionTests(TestCase):
             ),
         )
 
+    def test_blocked_rows(self):
+        """distances do not depend on the number of rows compared at once"""
+        from cogent3.maths import distance_transform
+
+        data = numpy.random.RandomState(7).poisson(1.5, size=(11, 6)).astype(float)
+        data[3] = 0
+        data[5] = data[0]
+        funcs = [
+            getattr(distance_transform, name)
+            for name in dir(distance_transform)
+            if name.startswith(("dist_", "binary_dist_")) and "gain" not in name
+        ]
+        expect = [func(data) for func in funcs]
+        orig = distance_transform._BLOCK_ELEMENTS
+        distance_transform._BLOCK_ELEMENTS = 20
+        try:
+            for func, exp in zip(funcs, expect):
+                got = func(data)
+                assert_allclose(got, exp, atol=1e-12, err_msg=func.__name__)
+                assert_allclose(got, got.T)
+        finally:
+            distance_transform._BLOCK_ELEMENTS = orig
+
     # def test_no_dupes(self):
     # """ here we check all distance functions in distance_transform for
     # duplicate
@@ -44,6 +44,17 @@ class TestNumber(TestCase):
         self.assertEqual(got["A"], 20)
         self.assertEqual(got.to_dict(), data)
 
+    def test_from_counts(self):
+        """construction from precomputed counts"""
+        data = {"A": 20, "Q": 30, "X": 20}
+        got = number.CategoryCounter.from_counts(data)
+        self.assertIsInstance(got, number.CategoryCounter)
+        self.assertEqual(got.to_dict(), data)
+        got = number.CategoryCounter.from_counts(zip(["AC", "GT"], [3, 1]))
+        self.assertEqual(got.to_dict(), {"AC": 3, "GT": 1})
+        self.assertEqual(got["TT"], 0)
+        self.assertEqual(len(got), 4)
+
     def test_add(self):
         """allow adding elements, or series"""
         nums = number.CategoryCounter("AAAACCCGGGGT")
@@ -6,19 +6,22 @@ import warnings
 
 from tempfile import TemporaryDirectory
 
+import numpy
+
 from numpy import exp, log
 
 from cogent3 import get_model, load_aligned_seqs, load_tree, make_tree
 from cogent3.phylo.consensus import get_splits, get_tree, majority_rule
 from cogent3.phylo.least_squares import wls
 from cogent3.phylo.maximum_likelihood import ML
-from cogent3.phylo.nj import gnj, nj
+from cogent3.phylo.nj import fast_nj, gnj, nj
 from cogent3.phylo.tree_collection import (
     LogLikelihoodScoredTreeCollection,
     ScoredTreeCollection,
     WeightedTreeCollection,
     make_trees,
 )
+from cogent3.phylo.tree_distance import rf_distance_matrix
 from cogent3.util.misc import remove_files
 
 
@@ -411,6 +414,46 @@ class ConsensusTests(unittest.TestCase):
         tree = load_tree(os.path.join(data_path, "murphy.tree"))
         self.assertTrue(tree.same_topology(get_tree(get_splits(tree))))
 
+    def test_get_splits_rooted(self):
+        """edges either side of a bifurcating root are one split"""
+        tree = Tree("((a:1,b:2):3,(c:4,d:5):6);")
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            splits = get_splits(tree)
+        self.assertEqual(len(splits), 5)
+        ab = frozenset([frozenset("ab"), frozenset("cd")])
+        self.assertEqual(splits[ab]["length"], 9)
+        self.assertEqual(
+            splits[frozenset([frozenset("a"), frozenset("bcd")])]["length"], 1
+        )
+        got = get_tree(splits)
+        self.assertTrue(got.same_topology(Tree("((a,b),c,d);")))
+
+    def test_rf_distance_matrix(self):
+        """Robinson-Foulds distances count the splits unique to each tree"""
+        trees = [
+            Tree("((a,b),c,(d,e));"),
+            Tree("(((a,b),c),(d,e));"),
+            Tree("((a,c),b,(d,e));"),
+            Tree("((a,d),(b,c),e);"),
+            Tree("(a,b,c,d,e);"),
+        ]
+        got = rf_distance_matrix(trees)
+        self.assertEqual(got.names, ["0", "1", "2", "3", "4"])
+        expect = [
+            [0, 0, 2, 4, 2],
+            [0, 0, 2, 4, 2],
+            [2, 2, 0, 4, 2],
+            [4, 4, 4, 0, 2],
+            [2, 2, 2, 2, 0],
+        ]
+        numpy.testing.assert_equal(got.array, expect)
+        got = rf_distance_matrix(trees[:3], names="xyz", normalise=True)
+        self.assertEqual(got["x", "z"], 0.5)
+        self.assertEqual(got["x", "y"], 0)
+        with self.assertRaises(ValueError):
+            rf_distance_matrix([trees[0], Tree("((a,b),c,(d,f));")])
+
     def test_consensus_tree_branch_lengths(self):
         """consensus trees should average branch lengths properly"""
 
@@ -520,6 +563,33 @@ class TreeReconstructionTests(unittest.TestCase):
         reconstructed = nj(self.dists, show_progress=False)
         self.assertTreeDistancesEqual(self.tree, reconstructed)
 
+    def test_fast_nj(self):
+        """fast_nj matches nj"""
+        from cogent3.evolve.fast_distance import DistanceMatrix
+        from cogent3.util.dict_array import DictArrayTemplate
+
+        dists = DistanceMatrix(self.dists)
+        reconstructed = fast_nj(dists.to_condensed(), show_progress=False)
+        self.assertTreeDistancesEqual(self.tree, reconstructed)
+        self.assertEqual(reconstructed.name, "root")
+        # a DistanceMatrix is accepted
+        reconstructed = fast_nj(dists, show_progress=False)
+        self.assertTreeDistancesEqual(self.tree, reconstructed)
+
+        rng = numpy.random.RandomState(3)
+        data = rng.random_sample((12, 12))
+        data = data + data.T
+        numpy.fill_diagonal(data, 0)
+        names = list("abcdefghijkl")
+        dists = DistanceMatrix(DictArrayTemplate(names, names).wrap(data))
+        expect = nj(dists.to_dict(), show_progress=False)
+        got = fast_nj(dists, show_progress=False)
+        self.assertTrue(got.same_topology(expect))
+        self.assertTreeDistancesEqual(got, expect)
+
+        with self.assertRaises(ValueError):
+            fast_nj(dists.take_dists(["a", "b"]))
+
     def test_gnj(self):
         """testing gnj"""
         results = gnj(self.dists, keep=1, show_progress=False)
@@ -557,6 +627,64 @@ class TreeReconstructionTests(unittest.TestCase):
         reconstructed = wls(self.dists, a=4, show_progress=False)
         self.assertTreeDistancesEqual(self.tree, reconstructed)
 
+    def test_wls_scorer_pickle(self):
+        """tree scorers can be pickled for parallel evaluation"""
+        import pickle
+
+        from cogent3.phylo.least_squares import WLS
+        from cogent3.phylo.tree_space import tree2ancestry
+
+        ancestry, names, _ = tree2ancestry(self.tree)
+        scorer = WLS(self.dists).make_tree_scorer(names)
+        err, lengths = scorer(ancestry)
+        got_err, got_lengths = pickle.loads(pickle.dumps(scorer))(ancestry)
+        self.assertEqual(got_err, err)
+        numpy.testing.assert_equal(got_lengths, lengths)
+
+    def test_wls_evaluate_many(self):
+        """batched fits match solving the path matrix normal equations"""
+        from cogent3.phylo.least_squares import WLS, _ancestry2paths
+        from cogent3.phylo.tree_space import tree2ancestry
+
+        names = list("abcdef")
+        scorer = WLS(self.dists).make_tree_scorer(names)
+        ancestries = [
+            tree2ancestry(make_tree(treestring=t), order=names)[0]
+            for t in (
+                "((a,b),(c,d),(e,f))",
+                "((a,c),b,(d,(e,f)))",
+                "(a,b,(c,(d,(e,f))))",
+            )
+        ]
+        got = scorer.evaluate_many(ancestries)
+        for ancestry, (err, lengths) in zip(ancestries, got):
+            A = _ancestry2paths(ancestry)
+            At = A.T * scorer.weights
+            expect = numpy.linalg.solve(At.dot(A), At.dot(scorer.dists))
+            numpy.testing.assert_allclose(lengths, numpy.maximum(expect, 0))
+            expect_err = ((A.dot(lengths) - scorer.dists) ** 2).sum()
+            numpy.testing.assert_allclose(err, expect_err, atol=1e-8)
+
+    def test_wls_polytomy(self):
+        """trees with polytomies can be scored, with or without lengths"""
+        from cogent3.phylo.least_squares import WLS, _ancestry2paths
+        from cogent3.phylo.tree_space import tree2ancestry
+
+        tree = make_tree(treestring="((a:1,b:2,c:1):1,d:3,(e:1,f:2):1);")
+        wls = WLS(tree.get_distances())
+        self.assertEqual(wls.evaluate_tree(tree), 0.0)
+
+        ancestry, names, _ = tree2ancestry(tree)
+        scorer = wls.make_tree_scorer(names)
+        ((err, lengths),) = scorer.evaluate_many([ancestry])
+        A = _ancestry2paths(ancestry)
+        self.assertEqual(A.shape, (15, 8))
+        At = A.T * scorer.weights
+        expect = numpy.linalg.solve(At.dot(A), At.dot(scorer.dists))
+        numpy.testing.assert_allclose(lengths, numpy.maximum(expect, 0))
+        numpy.testing.assert_allclose(err, 0, atol=1e-8)
+        numpy.testing.assert_allclose(scorer(ancestry)[1], lengths)
+
     def test_truncated_wls(self):
         """testing wls with order option"""
         order = ["e", "b", "c", "d"]